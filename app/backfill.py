@@ -0,0 +1,197 @@
+"""
+Resumable historical backfill of the earnings calendar.
+
+    python -m app.backfill --start 2025-01-01 --end 2025-03-31 --max-workers 8
+
+Days are fetched concurrently through one shared session and adaptive
+scheduler. Every finished day lands in the per-day calendar cache
+(``cache/calendar_days/``), and a checkpoint under ``cache/backfill/`` records
+which days are done, so an interrupted run picks up where it stopped and days
+already cached are never refetched. The assembled range is written as
+``cache/yahoo_earnings_<start>_<end>.json`` for ``app.generate`` and the
+ticker index.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .cache import CACHE_DIR, cache_path, load_calendar_day, load_cache, write_cache, write_calendar_day
+from .http import add_http_cache_args, build_session, configure_from_args
+from .metrics import METRICS, add_metrics_args, configure_metrics_from_args, write_metrics
+from .output import atomic_write_bytes, serialize
+from .refresh import DEFAULT_MAX_WORKERS, NO_EARNINGS_ERROR, error_day_payload, fetch_day_payload, get_api_key
+from .scheduler import AdaptiveScheduler
+from .utils import date_sequence, now_sgt, parse_start_date
+
+LOGGER = logging.getLogger("app.backfill")
+logging.basicConfig(level=logging.INFO)
+
+BACKFILL_DIRNAME = "backfill"
+DEFAULT_MAX_WORKERS_BACKFILL = 2 * DEFAULT_MAX_WORKERS
+CHECKPOINT_EVERY = 10  # days completed between checkpoint writes
+
+
+def days_per_minute(days: int, elapsed: float) -> float:
+    return days / elapsed * 60 if elapsed > 0 else 0.0
+
+
+def checkpoint_path(start: date, end: date) -> Path:
+    return CACHE_DIR / BACKFILL_DIRNAME / f"{start.isoformat()}_{end.isoformat()}.json"
+
+
+class Checkpoint:
+    """Days of one backfill range that are done (cached) or failed in the last attempt."""
+
+    def __init__(self, path: Path, done: Optional[List[str]] = None, failed: Optional[Dict[str, str]] = None) -> None:
+        self.path = path
+        self.done = set(done or ())
+        self.failed: Dict[str, str] = dict(failed or {})
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint":
+        data = load_cache(path) if path.exists() else None
+        if not data:
+            return cls(path)
+        return cls(path, data.get("done"), data.get("failed"))
+
+    def record(self, day: Dict[str, Any]) -> None:
+        with self._lock:
+            if day["error"] in (None, NO_EARNINGS_ERROR):
+                self.done.add(day["day"])
+                self.failed.pop(day["day"], None)
+            else:
+                self.failed[day["day"]] = day["error"]
+            self._pending += 1
+            if self._pending >= CHECKPOINT_EVERY:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        payload = {
+            "updated_at": now_sgt().isoformat(),
+            "done": sorted(self.done),
+            "failed": dict(sorted(self.failed.items())),
+        }
+        atomic_write_bytes(self.path, serialize(payload, compact=True))
+        self._pending = 0
+
+
+def backfill(
+    api_key: str,
+    start: date,
+    end: date,
+    max_workers: int = DEFAULT_MAX_WORKERS_BACKFILL,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """
+    Fetch every day in ``start..end`` not already cached and return the assembled payload.
+
+    Days that fail stay listed in the checkpoint's ``failed`` map (and carry
+    their ``error`` in the payload); rerunning the command retries only those.
+    """
+    if end < start:
+        raise ValueError(f"Backfill end {end} is before start {start}")
+    dates = date_sequence(start, (end - start).days + 1)
+    checkpoint = Checkpoint.load(checkpoint_path(start, end))
+
+    days: Dict[date, Dict[str, Any]] = {}
+    todo: List[date] = []
+    for current in dates:
+        cached = load_calendar_day(current)
+        if cached is not None:
+            days[current] = cached
+            checkpoint.done.add(current.isoformat())
+        else:
+            if current.isoformat() in checkpoint.done:
+                LOGGER.warning("%s is checkpointed but missing from the day cache; refetching", current)
+                checkpoint.done.discard(current.isoformat())
+            todo.append(current)
+    METRICS.cache("calendar_days", hits=len(dates) - len(todo), misses=len(todo))
+    LOGGER.info("Backfill %s..%s: %s day(s) cached, %s to fetch", start, end, len(dates) - len(todo), len(todo))
+
+    workers = max(1, min(max_workers, len(todo) or 1))
+    scheduler = AdaptiveScheduler(max_concurrency=workers)
+    started = time.perf_counter()
+    fetched_at = now_sgt()
+    try:
+        with METRICS.stage("fetch"), build_session(pool_size=workers) as session:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as executor:
+                futures = {
+                    executor.submit(fetch_day_payload, session, api_key, current, scheduler, stream): current
+                    for current in todo
+                }
+                try:
+                    for completed, future in enumerate(as_completed(futures), start=1):
+                        current = futures[future]
+                        day = future.result()
+                        if day["error"] in (None, NO_EARNINGS_ERROR):
+                            write_calendar_day(current, day, fetched_at)
+                        checkpoint.record(day)
+                        days[current] = day
+                        if completed % CHECKPOINT_EVERY == 0 or completed == len(todo):
+                            rate = days_per_minute(completed, time.perf_counter() - started)
+                            LOGGER.info("Backfilled %s/%s day(s), %.1f days/min", completed, len(todo), rate)
+                except BaseException:
+                    # Ctrl-C: drop queued days instead of fetching them on the way out.
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+    finally:
+        checkpoint.save()
+
+    elapsed = time.perf_counter() - started
+    METRICS.incr("days_fetched", len(todo))
+    METRICS.incr("throttled", scheduler.stats.throttled)
+    METRICS.incr("retries", scheduler.stats.retries)
+    LOGGER.info("Calendar requests: %s", scheduler.summary())
+    if todo:
+        LOGGER.info("Fetched %s day(s) in %.1fs (%.1f days/min)", len(todo), elapsed, days_per_minute(len(todo), elapsed))
+    if checkpoint.failed:
+        LOGGER.warning("%s day(s) failed; rerun to retry: %s", len(checkpoint.failed), ", ".join(sorted(checkpoint.failed)))
+
+    return {
+        "params": {"start_day": start.isoformat(), "end_day": end.isoformat()},
+        "updated_at": now_sgt().isoformat(),
+        "source": "Yahoo Finance (RapidAPI)",
+        "days": [days.get(current) or error_day_payload(current, "Not fetched") for current in dates],
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill historical earnings calendars into cache/")
+    parser.add_argument("--start", required=True, help="First day YYYY-MM-DD")
+    parser.add_argument("--end", help="Last day YYYY-MM-DD (default: today)")
+    parser.add_argument("--api-key", help="RapidAPI key (optional, fallback to RAPIDAPI_KEY env)")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS_BACKFILL, help="Days fetched concurrently")
+    parser.add_argument("--stream", action="store_true", help="Parse calendar responses incrementally")
+    add_http_cache_args(parser)
+    add_metrics_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    configure_from_args(args)
+    configure_metrics_from_args(args, "backfill")
+    start = parse_start_date(args.start)
+    end = parse_start_date(args.end)
+    payload = backfill(get_api_key(args.api_key), start, end, max_workers=args.max_workers, stream=args.stream)
+    output_path = cache_path(start.isoformat(), end.isoformat())
+    write_cache(output_path, payload)
+    LOGGER.info("Wrote %s", output_path)
+    write_metrics()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -4,18 +4,60 @@ Cache helpers for storing and retrieving scraped earnings data.
 
 from __future__ import annotations
 
+import hashlib
 import json
-from datetime import date, datetime, timedelta
+import os
+from datetime import date, datetime, time, timedelta
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, TypedDict
 
-from .utils import now_sgt
+from . import codec
+from .output import atomic_write_bytes, serialize
+from .rows import as_record
+from .storage import ENRICH_PREFIX, StorageBackend, has_metrics, open_backend
+from .utils import US_EASTERN_TZ, now_sgt
 
 CACHE_DIR = Path("./cache")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 CACHE_MAX_AGE = timedelta(hours=24)
-ENRICH_PREFIX = "yahoo_enriched_"
+ENRICH_TTL = timedelta(hours=24)
+HTTP_CACHE_DIR = CACHE_DIR / "http"
+CALENDAR_DAY_DIRNAME = "calendar_days"
+# (max days ahead of today, ttl) for per-day calendar entries; anything further
+# out uses CALENDAR_DAY_TTL_FAR. Past days fetched after they ended never expire.
+CALENDAR_DAY_TTLS = (
+    (1, timedelta(hours=1)),
+    (7, timedelta(hours=6)),
+    (30, timedelta(hours=24)),
+)
+CALENDAR_DAY_TTL_FAR = timedelta(days=3)
+# A day is final once fetched this long after it began in US Eastern time
+# (06:00 ET the next day): after-close reports and their actuals are in by then.
+CALENDAR_DAY_SETTLED = timedelta(days=1, hours=6)
+STORAGE_BACKEND = os.getenv("EARNINGS_STORAGE", "json")
+
+
+class CachedDay(TypedDict, total=False):
+    """One stored calendar day; rows stay plain dicts until ``as_record`` builds them."""
+
+    day: str
+    url: str
+    count: int
+    rows: List[Dict[str, Any]]
+    error: Optional[str]
+
+
+class CalendarDayRecord(TypedDict):
+    """Shape of a ``cache/calendar_days/<day>.json`` file (typed decode target)."""
+
+    fetched_at: str
+    payload: CachedDay
+
+
+def get_backend() -> StorageBackend:
+    """Return the storage backend selected by ``EARNINGS_STORAGE`` (json or sqlite)."""
+    return open_backend(STORAGE_BACKEND, CACHE_DIR)
 
 
 def cache_path(start: str, end: str) -> Path:
@@ -36,32 +78,194 @@ def is_cache_fresh(path: Path, max_age: timedelta = CACHE_MAX_AGE) -> bool:
 
 
 def load_cache(path: Path) -> dict[str, Any] | None:
-    """Load JSON cache from disk if it exists."""
-    if not path.exists():
-        return None
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
+    """Load a cached payload if it exists."""
+    return get_backend().load(path)
 
 
 def write_cache(path: Path, payload: Mapping[str, Any]) -> None:
-    """Persist payload to disk as JSON."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as fp:
-        json.dump(payload, fp, ensure_ascii=False, indent=2)
+    """Atomically persist payload to disk as JSON (and index it, for the sqlite backend)."""
+    get_backend().write(path, payload)
+
+
+def index_cache(path: Path, payload: Mapping[str, Any]) -> None:
+    """Register a payload that was written to ``path`` by other means (e.g. a hard link)."""
+    get_backend().index(path, payload)
 
 
 def latest_enrichment_path() -> Path | None:
-    files = sorted(CACHE_DIR.glob(f"{ENRICH_PREFIX}*.json"), reverse=True)
-    return files[0] if files else None
+    return get_backend().latest_enrichment_path()
 
 
 def load_latest_enrichment() -> dict[str, Any] | None:
     path = latest_enrichment_path()
-    if not path or not path.exists():
+    if not path:
         return None
-    with path.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
+    return load_cache(path)
+
+
+def load_latest_quotes(symbols: Iterable[str]) -> dict[str, Any]:
+    """Newest successful quote per symbol, stamped with ``fetched_at`` (indexed with the sqlite backend)."""
+    return get_backend().latest_quotes(symbols)
 
 
 def enrichment_cache_path_for(day: date) -> Path:
     return CACHE_DIR / f"{ENRICH_PREFIX}{day.isoformat()}.json"
+
+
+def calendar_day_path(day: date) -> Path:
+    return CACHE_DIR / CALENDAR_DAY_DIRNAME / f"{day.isoformat()}.json"
+
+
+def calendar_day_ttl(day: date, fetched_at: datetime, today: date | None = None) -> timedelta | None:
+    """
+    Return how long a calendar day fetched at ``fetched_at`` stays fresh (None: forever).
+
+    A day fetched ``CALENDAR_DAY_SETTLED`` after it began on the exchange's
+    clock is final; otherwise the TTL shrinks as the day approaches, so today
+    and tomorrow (and a just-ended day) are refetched often and far-future
+    days rarely.
+    """
+    if fetched_at >= datetime.combine(day, time(), US_EASTERN_TZ) + CALENDAR_DAY_SETTLED:
+        return None
+    ahead = (day - (today or now_sgt().date())).days
+    for max_ahead, ttl in CALENDAR_DAY_TTLS:
+        if ahead <= max_ahead:
+            return ttl
+    return CALENDAR_DAY_TTL_FAR
+
+
+def load_calendar_day(day: date, now: datetime | None = None) -> dict[str, Any] | None:
+    """Return the cached payload for ``day`` (rows as ``EarningsRow``) unless it is missing or expired."""
+    path = calendar_day_path(day)
+    try:
+        record = codec.load_path(path, CalendarDayRecord)
+    except (OSError, codec.DecodeError):
+        return None
+    fetched_at = _parse_timestamp(record.get("fetched_at"))
+    if fetched_at is None:
+        return None
+    now = now or now_sgt()
+    ttl = calendar_day_ttl(day, fetched_at, today=now.date())
+    if ttl is not None and now - fetched_at >= ttl:
+        return None
+    payload = record.get("payload")
+    if payload and payload.get("rows"):
+        payload["rows"] = [as_record(row) for row in payload["rows"]]
+    return payload
+
+
+def write_calendar_day(day: date, payload: Mapping[str, Any], fetched_at: datetime | None = None) -> Path:
+    """Atomically store one transformed calendar day with its fetch time."""
+    path = calendar_day_path(day)
+    record = {"fetched_at": (fetched_at or now_sgt()).isoformat(), "payload": payload}
+    atomic_write_bytes(path, serialize(record, compact=True))
+    return path
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=now_sgt().tzinfo)
+    return parsed
+
+
+def partition_enrichment(
+    snapshot: Mapping[str, Any] | None,
+    tickers: Iterable[str],
+    ttl: timedelta = ENRICH_TTL,
+    now: datetime | None = None,
+) -> tuple[dict[str, Any], list[str]]:
+    """
+    Split ``tickers`` into cached entries younger than ``ttl`` and symbols to refetch.
+
+    Each ticker entry carries its own ``fetched_at`` stamp; entries from older
+    snapshots without one inherit the snapshot's ``updated_at`` unless every
+    metric is None (a failed lookup), which is always refetched.
+    """
+    now = now or now_sgt()
+    entries = (snapshot or {}).get("tickers", {})
+    default_stamp = _parse_timestamp((snapshot or {}).get("updated_at"))
+    hits: dict[str, Any] = {}
+    misses: list[str] = []
+    for symbol in tickers:
+        entry = entries.get(symbol)
+        fetched_at = _parse_timestamp(entry.get("fetched_at")) if entry else None
+        if fetched_at is None and entry and has_metrics(entry):
+            fetched_at = default_stamp
+        if fetched_at is not None and now - fetched_at < ttl:
+            hits[symbol] = entry
+        else:
+            misses.append(symbol)
+    return hits, misses
+
+
+class ResponseStore:
+    """
+    Content-addressed store of raw API responses.
+
+    Entries are keyed by a hash of the endpoint URL and its query parameters
+    (credentials are never part of the key) and laid out as
+    ``<root>/<hash[:2]>/<hash>.json`` so the directory stays shallow.
+    """
+
+    def __init__(self, root: Path | None = None, ttl: timedelta | None = None) -> None:
+        self.root = root or HTTP_CACHE_DIR
+        self.ttl = ttl
+
+    @staticmethod
+    def key(url: str, params: Mapping[str, Any] | None = None) -> str:
+        material = json.dumps({"url": url, "params": dict(params or {})}, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def load(
+        self, url: str, params: Mapping[str, Any] | None = None, ttl: timedelta | None = None, default: Any = None
+    ) -> Any | None:
+        """
+        Return the stored body, or ``default`` when missing or older than ``ttl``.
+
+        A recorded ``null`` body is returned as None; pass a sentinel
+        ``default`` to tell it apart from a miss.
+        """
+        path = self.path_for(self.key(url, params))
+        if not path.exists():
+            return default
+        try:
+            record = codec.load_path(path)
+        except (OSError, codec.DecodeError):
+            return default
+        ttl = ttl if ttl is not None else self.ttl
+        if ttl is not None:
+            fetched_at = _parse_timestamp(record.get("fetched_at"))
+            if fetched_at is None or now_sgt() - fetched_at >= ttl:
+                return default
+        return record.get("body")
+
+    def save(self, url: str, params: Mapping[str, Any] | None, body: Any) -> Path:
+        """Atomically persist a response body and return its path."""
+        path = self.path_for(self.key(url, params))
+        record = {
+            "url": url,
+            "params": dict(params or {}),
+            "fetched_at": now_sgt().isoformat(),
+            "body": body,
+        }
+        atomic_write_bytes(path, serialize(record, compact=True))
+        return path
+
+    def entries(self, url_prefix: str = "") -> Iterator[dict[str, Any]]:
+        """Yield stored records whose URL starts with ``url_prefix`` (for parser regression runs)."""
+        for path in sorted(self.root.glob("*/*.json")):
+            try:
+                record = codec.load_path(path)
+            except (OSError, codec.DecodeError):
+                continue
+            if str(record.get("url", "")).startswith(url_prefix):
+                yield record
@@ -0,0 +1,179 @@
+"""
+JSON encoding and decoding for cache and output I/O.
+
+One backend is picked at import: msgspec, then orjson, then the stdlib ``json``
+module, whichever is installed first. ``EARNINGS_JSON_CODEC`` (json, orjson or
+msgspec) forces one. Every backend writes UTF-8 with the same layout (2-space
+indent or compact separators, keys in insertion order); the only difference is
+how floats with exponents are spelled (``1e-07`` vs ``1e-7``).
+
+``loads(data, type=...)`` decodes straight into typed targets with msgspec
+(e.g. the ``cache.CalendarDayRecord`` envelope, validated on the way). The
+other backends ignore ``type`` and return plain containers. Rows are always
+decoded as plain dicts and built with ``rows.as_record``, so keys outside the
+schema land in ``extra`` and raw strings are normalized. On encode every
+``EarningsRow`` goes through ``rows.json_default``, whichever backend is active.
+
+The one writer that does not call this module is ``columnar.RowTable.dumps``
+with the stdlib codec active: it fills a per-row template from column-encoded
+cells (same bytes as ``dumps``). With orjson or msgspec active it uses
+``dumps`` like everything else.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .rows import EarningsRow, json_default
+
+try:  # Optional: the fastest available backend is used.
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:  # Optional: fastest encoder, typed decoding of cache envelopes.
+    import msgspec
+except ImportError:  # pragma: no cover - depends on environment
+    msgspec = None
+
+LOGGER = logging.getLogger("app.codec")
+
+PREFERENCE = ("msgspec", "orjson", "json")
+# Raised by ``loads`` for malformed input (and, with msgspec, type mismatches).
+DecodeError = json.JSONDecodeError
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    encode: Callable[[Any, bool], bytes]
+    decode: Callable[[bytes | str, Any], Any]
+
+
+def _json_encode(obj: Any, compact: bool) -> bytes:
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=json_default).encode("utf-8")
+
+
+def _json_decode(data: bytes | str, type: Any = None) -> Any:
+    return json.loads(data)
+
+
+def _orjson_encode(obj: Any, compact: bool) -> bytes:
+    option = orjson.OPT_PASSTHROUGH_DATACLASS | (0 if compact else orjson.OPT_INDENT_2)
+    return orjson.dumps(obj, default=json_default, option=option)
+
+
+def _orjson_decode(data: bytes | str, type: Any = None) -> Any:
+    return orjson.loads(data)
+
+
+def _plain_rows(value: Any) -> Any:
+    """
+    Pass every ``EarningsRow`` in ``value`` through ``json_default``, wherever it sits.
+
+    msgspec encodes dataclasses natively (writing the ``extra`` slot as a key)
+    instead of calling its ``enc_hook``, so rows are swapped for their JSON
+    objects first. Containers without rows are returned as-is, uncopied.
+    """
+    cls = value.__class__
+    if cls is EarningsRow:
+        return json_default(value)
+    if cls is list:
+        copied = None
+        for index, item in enumerate(value):
+            if item.__class__ in _CONTAINERS:
+                plain = _plain_rows(item)
+                if plain is not item:
+                    if copied is None:
+                        copied = value[:]
+                    copied[index] = plain
+        return value if copied is None else copied
+    if cls is dict:
+        copied = None
+        for key, item in value.items():
+            if item.__class__ in _CONTAINERS:
+                plain = _plain_rows(item)
+                if plain is not item:
+                    if copied is None:
+                        copied = dict(value)
+                    copied[key] = plain
+        return value if copied is None else copied
+    return value
+
+
+_CONTAINERS = frozenset((EarningsRow, list, dict))
+
+
+if msgspec is not None:
+    _MSGSPEC_ENCODER = msgspec.json.Encoder(enc_hook=json_default)
+
+
+def _msgspec_encode(obj: Any, compact: bool) -> bytes:
+    data = _MSGSPEC_ENCODER.encode(_plain_rows(obj))
+    return data if compact else msgspec.json.format(data, indent=2)
+
+
+@lru_cache(maxsize=None)
+def _msgspec_decoder(type: Any) -> Any:
+    return msgspec.json.Decoder(Any if type is None else type)
+
+
+def _msgspec_decode(data: bytes | str, type: Any = None) -> Any:
+    try:
+        return _msgspec_decoder(type).decode(data)
+    except msgspec.DecodeError as exc:  # ValidationError included
+        raise DecodeError(str(exc), data if isinstance(data, str) else "", 0) from exc
+
+
+CODECS: Dict[str, Optional[Codec]] = {
+    "json": Codec("json", _json_encode, _json_decode),
+    "orjson": Codec("orjson", _orjson_encode, _orjson_decode) if orjson is not None else None,
+    "msgspec": Codec("msgspec", _msgspec_encode, _msgspec_decode) if msgspec is not None else None,
+}
+
+
+def available_codecs() -> list[str]:
+    return [name for name in PREFERENCE if CODECS[name] is not None]
+
+
+def select_codec(name: str | None = None) -> Codec:
+    """Return the named codec, or the first installed one in ``PREFERENCE`` for None/"auto"."""
+    if name in (None, "", "auto"):
+        return CODECS[available_codecs()[0]]
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec {name!r}; expected one of {', '.join(PREFERENCE)}")
+    codec = CODECS[name]
+    if codec is None:
+        raise ValueError(f"JSON codec {name!r} is not installed")
+    return codec
+
+
+CODEC = select_codec(os.getenv("EARNINGS_JSON_CODEC"))
+
+
+def use_codec(name: str | None) -> Codec:
+    """Switch the process-wide codec (None/"auto": the fastest installed); returns it."""
+    global CODEC
+    CODEC = select_codec(name)
+    LOGGER.debug("JSON codec: %s", CODEC.name)
+    return CODEC
+
+
+def dumps(obj: Any, compact: bool = False) -> bytes:
+    return CODEC.encode(obj, compact)
+
+
+def loads(data: bytes | str, type: Any = None) -> Any:
+    return CODEC.decode(data, type)
+
+
+def load_path(path: Path, type: Any = None) -> Any:
+    """Decode the JSON file at ``path``; ``OSError`` and ``DecodeError`` propagate."""
+    return loads(path.read_bytes(), type)
@@ -0,0 +1,419 @@
+"""
+Columnar form of a window's earnings rows for large merges and rebuilds.
+
+``RowTable.from_days`` splits every day's rows into one column per field: the
+numeric camelCase fields become float64 NumPy arrays (NaN for null, plus a
+mask of which rows carry the key at all) and the text fields plain lists with
+symbols and company names interned. Enrichment merging and numeric
+normalization then run a column at a time, and rows only become JSON again at
+write time: ``dumps`` encodes each column once and fills a fixed per-row
+template, producing the same bytes as ``output.serialize`` without building
+``EarningsRow`` records or running the pure-Python indenting encoder.
+``to_days`` still returns records for callers that need them (e.g. day shards).
+
+That writer only beats the stdlib ``json`` codec. orjson and msgspec encode
+records faster than the table can be filled, so with either one active
+``dumps`` hands the rows to ``codec.dumps`` and ``columnar_preferred`` is
+False (``generate --columnar`` then keeps the dict path).
+
+Rows that do not fit the ``rows.ROW_FIELDS`` shape (missing keys, extra keys,
+non-float numbers) are kept as dicts, updated in place, and encoded one by one
+through ``EarningsRow.from_dict`` so they come out like ``pipeline.augment_rows``
+writes them.
+
+NumPy is optional. Without it numeric columns are lists of ``float``/None and
+the same operations run as plain loops.
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+from json.encoder import encode_basestring
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from . import codec
+from .metrics import METRICS
+from .pipeline import AUGMENT_FIELDS, QUOTE_FIELDS, ChangeSet, row_symbol
+from .rows import NORMALIZE_FIELDS, NUMERIC_FIELDS, ROW_FIELDS, TEXT_FIELDS, EarningsRow
+from .utils import parse_number
+
+try:  # Optional: pure-Python columns are used when NumPy is missing.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+INTERNED_FIELDS = ("symbol", "company")
+SUFFIXES: Tuple[Tuple[str, float], ...] = (("K", 1e3), ("M", 1e6), ("B", 1e9), ("T", 1e12))
+
+_MISSING = object()
+_INF = float("inf")
+_FLOAT_REPR = float.__repr__
+_KNOWN = frozenset(ROW_FIELDS)
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+_ROWS_TOKEN = "\x00rows{}\x00"
+_ROWS_TOKEN_RE = re.compile(r'"\\u0000rows(\d+)\\u0000"')
+# Row objects sit at depth 4 of the payload: {"days": [{"rows": [{...}]}]}.
+_ROW_INDENT = " " * 8
+
+
+def columnar_preferred() -> bool:
+    """True when the columnar merge and writer are faster than the dict path (stdlib codec only)."""
+    return codec.CODEC.name == "json"
+
+
+def parse_number_column(values: Sequence[Any]) -> Any:
+    """
+    ``utils.parse_number`` over a whole column.
+
+    Returns a float64 array with NaN for unparseable values (NumPy) or a list
+    of ``float``/None. With NumPy each distinct string is cleaned once and the
+    K/M/B/T suffixes are applied as array operations.
+    """
+    if np is None:
+        memo: Dict[Any, Optional[float]] = {}
+        parsed: List[Optional[float]] = []
+        for value in values:
+            try:
+                number = memo[value]
+            except KeyError:
+                number = memo[value] = parse_number(value)
+            except TypeError:
+                number = parse_number(value)
+            parsed.append(number)
+        return parsed
+
+    result = np.full(len(values), np.nan)
+    text_positions: List[int] = []
+    texts: List[str] = []
+    for position, value in enumerate(values):
+        if isinstance(value, str):
+            text_positions.append(position)
+            texts.append(value)
+        elif value is not None:
+            number = parse_number(value)
+            if number is not None:
+                result[position] = number
+    if not texts:
+        return result
+
+    distinct, inverse = np.unique(np.array(texts), return_inverse=True)
+    cleaned = np.char.upper(np.char.replace(np.char.strip(distinct), ",", ""))
+    lengths = np.char.str_len(cleaned)
+    multiplier = np.ones(len(cleaned))
+    for suffix, factor in SUFFIXES:
+        multiplier[np.char.endswith(cleaned, suffix)] = factor
+    suffixed = np.nonzero(multiplier != 1)[0]
+    if len(suffixed):
+        # Drop the suffix character in place: a NUL code point ends a NumPy unicode string.
+        codes = np.ascontiguousarray(cleaned).view(np.uint32).reshape(len(cleaned), -1).copy()
+        codes[suffixed, lengths[suffixed] - 1] = 0
+        cleaned = codes.view(cleaned.dtype).ravel()
+    try:
+        numbers = cleaned.astype(np.float64)
+    except ValueError:
+        numbers = np.array([_float_or_nan(text) for text in cleaned.tolist()])
+    numbers[lengths == 0] = np.nan
+    result[np.asarray(text_positions)] = (numbers * multiplier)[inverse]
+    return result
+
+
+def _float_or_nan(text: str) -> float:
+    try:
+        return float(text) if text else float("nan")
+    except ValueError:
+        return float("nan")
+
+
+def _encode_float(value: float) -> str:
+    # ``float.__repr__`` is what the json encoder uses for finite floats.
+    return _FLOAT_REPR(value) if value == value and value not in (_INF, -_INF) else json.dumps(value)
+
+
+def _encode_scalar(value: Any) -> str:
+    """JSON for one scalar, exactly as ``json.dumps(..., ensure_ascii=False)`` writes it."""
+    encoder = _SCALAR_ENCODERS.get(value.__class__)
+    return encoder(value) if encoder is not None else json.dumps(value, ensure_ascii=False)
+
+
+def _encode_text(values: List[Any]) -> List[str]:
+    # Only strings and None are memoized: 1, 1.0 and True hash alike but encode differently.
+    memo = {value: encode_basestring(value) for value in set(values) if value.__class__ is str}
+    memo[None] = "null"
+    return [memo[value] if value.__class__ is str or value is None else _encode_scalar(value) for value in values]
+
+
+def _encode_floats(values: List[Optional[float]]) -> List[str]:
+    """Encode a numeric column, where None and NaN both mean null."""
+    encode = _encode_float if _INF in values or -_INF in values else _FLOAT_REPR
+    return ["null" if value is None or value != value else encode(value) for value in values]
+
+
+_SCALAR_ENCODERS = {
+    str: encode_basestring,
+    type(None): lambda value: "null",
+    bool: lambda value: "true" if value else "false",
+    int: int.__repr__,
+    float: _encode_float,
+}
+
+
+def _row_template(compact: bool) -> str:
+    if compact:
+        return "{" + ",".join(f'"{field}":%s' for field in ROW_FIELDS) + "}"
+    inner = _ROW_INDENT + "  "
+    return _ROW_INDENT + "{\n" + ",\n".join(f'{inner}"{field}": %s' for field in ROW_FIELDS) + "\n" + _ROW_INDENT + "}"
+
+
+class RowTable:
+    """Rows of one or more days stored column-wise; see the module docstring."""
+
+    __slots__ = ("days", "offsets", "text", "numeric", "present", "irregular", "symbols", "codes")
+
+    def __init__(self) -> None:
+        self.days: List[Dict[str, Any]] = []
+        self.offsets: List[int] = [0]
+        self.text: Dict[str, List[Any]] = {}
+        self.numeric: Dict[str, Any] = {}
+        self.present: Dict[str, Any] = {}
+        # position -> the row as a dict (updated in place), for rows not in ROW_FIELDS shape.
+        self.irregular: Dict[int, Dict[str, Any]] = {}
+        self.symbols: List[str] = []
+        self.codes: Any = []
+
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    @classmethod
+    def from_days(cls, days: Iterable[Mapping[str, Any]]) -> "RowTable":
+        table = cls()
+        rows: List[Mapping[str, Any]] = []
+        for day in days:
+            table.days.append({key: None if key == "rows" else value for key, value in day.items()})
+            day_rows = day.get("rows", [])
+            rows.extend(day_rows)
+            table.offsets.append(len(rows))
+
+        for field in TEXT_FIELDS:
+            column = [row.get(field, _MISSING) for row in rows]
+            if field in INTERNED_FIELDS:
+                column = [sys.intern(value) if value.__class__ is str else value for value in column]
+            table.text[field] = column
+        numeric: Dict[str, List[Optional[float]]] = {}
+        present: Dict[str, List[bool]] = {}
+        for field in NUMERIC_FIELDS:
+            values = [row.get(field, _MISSING) for row in rows]
+            present[field] = [value is None or value.__class__ is float for value in values]
+            numeric[field] = [value if value.__class__ is float else None for value in values]
+
+        # Rows with missing or extra keys, nested text values, or an int or
+        # string where a float belongs.
+        irregular = {position for position, row in enumerate(rows) if len(row) != len(ROW_FIELDS) or not _KNOWN.issuperset(row)}
+        for column in table.text.values():
+            irregular.update(position for position, value in enumerate(column) if value.__class__ not in _SCALARS)
+        for flags in present.values():
+            if not all(flags):
+                irregular.update(position for position, ok in enumerate(flags) if not ok)
+        table.irregular = {
+            position: rows[position].to_dict() if rows[position].__class__ is EarningsRow else rows[position]
+            for position in sorted(irregular)
+        }
+        for position in table.irregular:
+            # Irregular rows live in ``irregular`` only; keep the columns encodable.
+            for column in table.text.values():
+                column[position] = None
+
+        symbol_codes: Dict[str, int] = {}
+        codes = []
+        for row in rows:
+            symbol = row_symbol(row)
+            codes.append(symbol_codes.setdefault(symbol, len(symbol_codes)) if symbol else -1)
+        table.symbols = list(symbol_codes)
+        if np is None:
+            table.numeric, table.present, table.codes = numeric, present, codes
+        else:
+            table.numeric = {field: np.array(values, dtype=np.float64) for field, values in numeric.items()}
+            table.present = {field: np.array(values, dtype=bool) for field, values in present.items()}
+            table.codes = np.array(codes, dtype=np.intp)
+        return table
+
+    def value(self, field: str, position: int) -> Any:
+        """Current value of ``field`` in one row (None when absent)."""
+        row = self.irregular.get(position)
+        if row is not None:
+            return row.get(field)
+        if field in self.text:
+            return self.text[field][position]
+        number = self.numeric[field][position]
+        return None if number is None or number != number else float(number)
+
+    def _set_irregular(self, field: str, positions: Iterable[int], values: Iterable[Optional[float]]) -> None:
+        for position, number in zip(positions, values):
+            row = self.irregular.get(position)
+            if row is not None:
+                row[field] = None if number is None or number != number else float(number)
+
+    def merge_quotes(self, ticker_map: Mapping[str, Any], fields: Sequence[Tuple[str, str]] = QUOTE_FIELDS) -> ChangeSet:
+        """Column-wise ``pipeline.merge_quotes``: write only values that differ."""
+        changes = ChangeSet()
+        quotes = [ticker_map.get(symbol) or {} for symbol in self.symbols]
+        touched: Any
+        if np is None:
+            touched = [False] * len(self)
+            for source, target in fields:
+                incoming = [quote.get(source) for quote in quotes]
+                changed = [
+                    position
+                    for position, code in enumerate(self.codes)
+                    if code >= 0 and incoming[code] is not None and self.value(target, position) != incoming[code]
+                ]
+                if not changed:
+                    continue
+                column, present = self.numeric[target], self.present[target]
+                numbers = [float(incoming[self.codes[position]]) for position in changed]
+                for position, number in zip(changed, numbers):
+                    column[position] = number
+                    present[position] = True
+                    touched[position] = True
+                self._set_irregular(target, changed, numbers)
+                changes.fields[target] = len(changed)
+            positions = [position for position, hit in enumerate(touched) if hit]
+        else:
+            touched = np.zeros(len(self), dtype=bool)
+            irregular = np.zeros(len(self), dtype=bool)
+            irregular[list(self.irregular)] = True
+            for source, target in fields:
+                # One slot per symbol plus a trailing NaN for rows without a symbol (code -1).
+                by_symbol = np.array([_as_float(quote.get(source)) for quote in quotes] + [np.nan])
+                incoming = by_symbol[self.codes]
+                column, present = self.numeric[target], self.present[target]
+                changed = ~np.isnan(incoming) & (~present | (column != incoming))
+                for position in np.nonzero(changed & irregular)[0].tolist():
+                    # Irregular rows compare against their verbatim value (e.g. the int 5 equals 5.0).
+                    changed[position] = self.value(target, position) != incoming[position]
+                count = int(changed.sum())
+                if not count:
+                    continue
+                column[changed] = incoming[changed]
+                present |= changed
+                touched |= changed
+                update = np.nonzero(changed & irregular)[0].tolist()
+                self._set_irregular(target, update, incoming[update].tolist())
+                changes.fields[target] = count
+            positions = np.nonzero(touched)[0].tolist()
+        changes.rows = len(positions)
+        changes.symbols = {self.symbols[self.codes[position]] for position in positions}
+        return changes
+
+    def normalize(self) -> None:
+        """Column-wise ``EarningsRow.from_dict`` normalization: fill absent numeric fields from raw strings."""
+        for target, source in NORMALIZE_FIELDS:
+            present = self.present[target]
+            missing = [
+                position
+                for position in range(len(self))
+                if not present[position] and target not in self.irregular.get(position, ())
+            ]
+            if not missing:
+                continue
+            parsed = parse_number_column([self.value(source, position) for position in missing])
+            column = self.numeric[target]
+            if np is None:
+                for position, number in zip(missing, parsed):
+                    column[position] = number
+                    present[position] = True
+            else:
+                index = np.asarray(missing)
+                column[index] = parsed
+                present[index] = True
+                parsed = parsed.tolist()
+            self._set_irregular(target, missing, parsed)
+
+    def _rows(self, start: int, stop: int, text: List[List[Any]], numeric: List[list]) -> List[EarningsRow]:
+        rows = []
+        for position in range(start, stop):
+            row = self.irregular.get(position)
+            if row is not None:
+                rows.append(EarningsRow.from_dict(row))
+                continue
+            values = [column[position] for column in text]
+            values += [None if number is None or number != number else number for number in (column[position] for column in numeric)]
+            rows.append(EarningsRow(*values))
+        return rows
+
+    def to_days(self) -> List[Dict[str, Any]]:
+        """Rebuild the day payloads with ``EarningsRow`` rows."""
+        text = [self.text[field] for field in TEXT_FIELDS]
+        numeric = [_as_list(self.numeric[field]) for field in NUMERIC_FIELDS]
+        days = []
+        for index, meta in enumerate(self.days):
+            day = dict(meta)
+            if "rows" in day:
+                day["rows"] = self._rows(self.offsets[index], self.offsets[index + 1], text, numeric)
+            days.append(day)
+        return days
+
+    def dumps(self, payload: Mapping[str, Any], compact: bool = False) -> bytes:
+        """
+        Serialize ``payload`` with this table as its ``days``.
+
+        The result is byte-for-byte what ``output.serialize`` writes for the
+        equivalent dict payload; unless the stdlib codec is active it is also
+        produced that way (see ``columnar_preferred``).
+        """
+        if not columnar_preferred():
+            with METRICS.stage("serialize"):
+                return codec.dumps({**payload, "days": self.to_days()}, compact=compact)
+        with METRICS.stage("serialize"):
+            columns = [_encode_text(self.text[field]) for field in TEXT_FIELDS]
+            columns += [_encode_floats(_as_list(self.numeric[field])) for field in NUMERIC_FIELDS]
+            template = _row_template(compact)
+            encoded = [template % values for values in zip(*columns)]
+            for position, row in self.irregular.items():
+                encoded[position] = _encode_row(EarningsRow.from_dict(row).to_dict(), compact)
+
+            days = []
+            for index, meta in enumerate(self.days):
+                day = dict(meta)
+                if "rows" in day:
+                    day["rows"] = _ROWS_TOKEN.format(index)
+                days.append(day)
+            shell = json.dumps({**payload, "days": days}, ensure_ascii=False, **_dump_options(compact))
+
+            def rows_block(match: "re.Match[str]") -> str:
+                index = int(match.group(1))
+                block = encoded[self.offsets[index] : self.offsets[index + 1]]
+                if not block:
+                    return "[]"
+                if compact:
+                    return "[" + ",".join(block) + "]"
+                return "[\n" + ",\n".join(block) + "\n" + _ROW_INDENT[:-2] + "]"
+
+            return _ROWS_TOKEN_RE.sub(rows_block, shell).encode("utf-8")
+
+
+def _dump_options(compact: bool) -> Dict[str, Any]:
+    return {"separators": (",", ":")} if compact else {"indent": 2}
+
+
+def _encode_row(row: Mapping[str, Any], compact: bool) -> str:
+    text = json.dumps(row, ensure_ascii=False, **_dump_options(compact))
+    if compact:
+        return text
+    return _ROW_INDENT + text.replace("\n", "\n" + _ROW_INDENT)
+
+
+def _as_float(value: Any) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def _as_list(column: Any) -> list:
+    return column if isinstance(column, list) else column.tolist()
+
+
+def augment_columnar(days: Iterable[Mapping[str, Any]], ticker_map: Mapping[str, Any]) -> Tuple[RowTable, ChangeSet]:
+    """Columnar ``pipeline.augment_rows``; returns the merged table (only irregular rows are edited in place)."""
+    table = RowTable.from_days(days)
+    table.normalize()
+    changes = table.merge_quotes(ticker_map, AUGMENT_FIELDS)
+    return table, changes
@@ -2,28 +2,51 @@
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import os
-import random
-import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import timedelta
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set
 
 import requests
 
-from .cache import CACHE_DIR, enrichment_cache_path_for, latest_enrichment_path
-from .utils import now_sgt, parse_number
+from . import codec
+from .cache import (
+    CACHE_DIR,
+    enrichment_cache_path_for,
+    load_latest_enrichment,
+    load_latest_quotes,
+    partition_enrichment,
+    write_cache,
+)
+from .extract import extract_fields
+from .http import API_BASE_URL, add_http_cache_args, build_session, configure_from_args, get_json, rapidapi_headers, replaying
+from .metrics import METRICS, add_metrics_args, configure_metrics_from_args, write_metrics
+from .output import (
+    SHARD_DIR,
+    SHARDED_CLIENT_LINE,
+    add_output_args,
+    configure_output_from_args,
+    write_day_shards,
+    write_json_outputs,
+)
+from .pipeline import ChangeSet, index_rows, merge_quotes
+from .priority import Budget, prioritize
+from .scheduler import AdaptiveScheduler
+from .ticker_index import TickerIndex, window_from
+from .utils import DateWindow, now_sgt, parse_start_date
 
 LOGGER = logging.getLogger("app.enrich")
 logging.basicConfig(level=logging.INFO)
 
-API_HOST = "yahoo-finance15.p.rapidapi.com"
-QUOTES_URL = f"https://{API_HOST}/api/v1/markets/stock/quotes"
+QUOTES_URL = f"{API_BASE_URL}/api/v1/markets/stock/quotes"
 DEFAULT_API_KEY = "f3ba37d23bmsh7f5f08200423752p124129jsn859ceeb7bbd1"
 DATA_CLIENT_PATH = Path("src/utils/dataClient.js")
-DEFAULT_SLEEP_RANGE: Tuple[float, float] = (0.3, 0.6)
+DEFAULT_MAX_CONCURRENCY = 3
+DEFAULT_RATE_LIMIT = 5.0  # requests per second, shared by all workers
+DEFAULT_BATCH_SIZE = 20  # tickers per quotes request
 ENRICH_MAX_AGE = timedelta(hours=24)
 
 
@@ -40,27 +63,37 @@ def detect_frontend_json_path() -> Path:
     return Path("src/data/earnings_data.json")
 
 
+def data_client_sharded() -> bool:
+    if not DATA_CLIENT_PATH.exists():
+        return False
+    lines = DATA_CLIENT_PATH.read_text(encoding="utf-8").splitlines()
+    return bool(lines) and lines[0].strip() == SHARDED_CLIENT_LINE
+
+
 FRONTEND_JSON = detect_frontend_json_path()
 
 
-def load_cached_tickers() -> Set[str]:
-    tickers: Set[str] = set()
+def load_ticker_index() -> TickerIndex:
+    """Return the persistent ticker index, synced with the frontend JSON and cached calendars."""
     paths = []
     if FRONTEND_JSON.exists():
         paths.append(FRONTEND_JSON)
     paths.extend(sorted(CACHE_DIR.glob("yahoo_earnings_*.json")))
 
-    for file in paths:
-        try:
-            data = json.loads(file.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            continue
-        for day in data.get("days", []):
-            for row in day.get("rows", []):
-                symbol = row.get("symbol") or row.get("ticker")
-                if symbol:
-                    tickers.add(symbol.strip().upper())
-    return tickers
+    index = TickerIndex.load()
+    parsed = index.update(paths)
+    index.save()
+    METRICS.cache("ticker_index", hits=len(paths) - parsed, misses=parsed)
+    LOGGER.info("Ticker index: %s file(s) re-parsed, %s unchanged", parsed, len(paths) - parsed)
+    return index
+
+
+def load_cached_tickers(window: DateWindow | None = None) -> Set[str]:
+    """
+    Collect tickers from the frontend JSON and cached calendars via the persistent
+    ticker index, optionally keeping only those reporting inside ``window``.
+    """
+    return load_ticker_index().tickers(window)
 
 
 def get_api_key(explicit: str | None = None) -> str:
@@ -70,87 +103,24 @@ def get_api_key(explicit: str | None = None) -> str:
     return key
 
 
-def flatten_items(obj):
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            yield key, value
-            yield from flatten_items(value)
-    elif isinstance(obj, list):
-        for item in obj:
-            yield from flatten_items(item)
-
-
 def extract_metrics(entry: dict) -> Dict[str, Optional[float]]:
-    price = None
-    eps = None
-    revenue = None
-    volume = None
-    market_cap = None
-    pe_ratio = None
-    year_high = None
-    year_low = None
-    price_keys = {"regularmarketprice", "marketprice", "lastprice", "price", "regularmarketpreviousclose"}
-    eps_keys = {"epsestimate", "epsforward", "eps", "earningsestimate", "epsquarterly", "epssurprise"}
-    revenue_keys = {"revenuestimate", "revenueforecast", "totalrevenue", "revenue"}
-    volume_keys = {"volume", "regularmarketvolume", "totalvolume", "sharestraded"}
-    market_cap_keys = {"marketcap", "marketcapitalization", "marketcapitalest", "marketcapital"}
-    pe_keys = {"peratio", "trailingpe", "forwardpe", "pe"}
-    high_keys = {"fiftytwo_weekhigh", "52weekhigh", "week52high", "fiftytwo_weekhi"}
-    low_keys = {"fiftytwo_weeklow", "52weeklow", "week52low", "fiftytwo_weeklo"}
-
-    for key, value in flatten_items(entry):
-        if not isinstance(key, str):
-            continue
-        normalized = key.lower()
-        if price is None and normalized in price_keys:
-            price = parse_number(value)
-        elif price is None and "price" in normalized:
-            price = parse_number(value)
-        elif eps is None and normalized in eps_keys:
-            eps = parse_number(value)
-        elif eps is None and "eps" in normalized:
-            eps = parse_number(value)
-        elif revenue is None and normalized in revenue_keys:
-            revenue = parse_number(value)
-        elif revenue is None and "revenue" in normalized:
-            revenue = parse_number(value)
-        elif volume is None and normalized in volume_keys:
-            volume = parse_number(value)
-        elif volume is None and "volume" in normalized:
-            volume = parse_number(value)
-        elif market_cap is None and normalized in market_cap_keys:
-            market_cap = parse_number(value)
-        elif market_cap is None and "marketcap" in normalized:
-            market_cap = parse_number(value)
-        elif pe_ratio is None and normalized in pe_keys:
-            pe_ratio = parse_number(value)
-        elif pe_ratio is None and "pe" in normalized and "peg" not in normalized:
-            pe_ratio = parse_number(value)
-        elif year_high is None and normalized in high_keys:
-            year_high = parse_number(value)
-        elif year_high is None and "52" in normalized and "high" in normalized:
-            year_high = parse_number(value)
-        elif year_low is None and normalized in low_keys:
-            year_low = parse_number(value)
-        elif year_low is None and "52" in normalized and "low" in normalized:
-            year_low = parse_number(value)
-
+    fields = extract_fields(entry)
     return {
-        "price": price,
-        "eps_estimate_curr_q": eps,
-        "revenue_estimate_curr_q": revenue,
-        "volume": volume,
-        "market_cap": market_cap,
-        "pe_ratio": pe_ratio,
-        "year_high": year_high,
-        "year_low": year_low,
+        "price": fields["price"],
+        "eps_estimate_curr_q": fields["eps_estimate"],
+        "revenue_estimate_curr_q": fields["revenue_estimate"],
+        "volume": fields["volume"],
+        "market_cap": fields["market_cap"],
+        "pe_ratio": fields["pe_ratio"],
+        "year_high": fields["year_high"],
+        "year_low": fields["year_low"],
     }
 
 
-def select_entry(symbol: str, payload: dict) -> dict:
+def quote_candidates(payload: dict | list) -> list:
     candidates = []
     if isinstance(payload, dict):
-        for key in ("data", "result", "quotes", "response", "items"):
+        for key in ("data", "result", "quotes", "response", "items", "body"):
             val = payload.get(key)
             if isinstance(val, list):
                 candidates.extend(val)
@@ -160,27 +130,41 @@ def select_entry(symbol: str, payload: dict) -> dict:
             candidates = [payload]
     elif isinstance(payload, list):
         candidates = payload
+    return candidates
+
+
+def entry_symbol(item: dict) -> str:
+    symbol = item.get("symbol") or item.get("ticker") or item.get("instrument")
+    return symbol.strip().upper() if isinstance(symbol, str) else ""
 
+
+def select_entry(symbol: str, payload: dict) -> dict:
+    candidates = quote_candidates(payload)
     upper = symbol.upper()
     for item in candidates:
-        if isinstance(item, dict):
-            entry_symbol = item.get("symbol") or item.get("ticker") or item.get("instrument")
-            if entry_symbol and entry_symbol.upper() == upper:
-                return item
+        if isinstance(item, dict) and entry_symbol(item) == upper:
+            return item
     return candidates[0] if candidates and isinstance(candidates[0], dict) else {}
 
 
-def fetch_quote(session: requests.Session, api_key: str, symbol: str) -> Dict[str, Optional[float]]:
+def index_entries(payload: dict | list) -> Dict[str, dict]:
+    """Index every quote in a (multi-ticker) response by upper-cased symbol."""
+    index: Dict[str, dict] = {}
+    for item in quote_candidates(payload):
+        if isinstance(item, dict):
+            symbol = entry_symbol(item)
+            if symbol and symbol not in index:
+                index[symbol] = item
+    return index
+
+
+def fetch_quote(
+    session: requests.Session, api_key: str, symbol: str, scheduler: AdaptiveScheduler | None = None
+) -> Dict[str, Optional[float]]:
     params = {"ticker": symbol}
-    headers = {
-        "x-rapidapi-key": api_key,
-        "x-rapidapi-host": API_HOST,
-        "accept": "application/json",
-    }
+    headers = rapidapi_headers(api_key)
     try:
-        response = session.get(QUOTES_URL, params=params, headers=headers, timeout=30)
-        response.raise_for_status()
-        payload = response.json()
+        payload = get_json(session, QUOTES_URL, params, headers, timeout=30, scheduler=scheduler)
     except Exception as exc:  # noqa: BLE001
         LOGGER.warning("Failed to fetch quote for %s: %s", symbol, exc)
         return {"price": None, "eps_estimate_curr_q": None, "revenue_estimate_curr_q": None}
@@ -191,106 +175,284 @@ def fetch_quote(session: requests.Session, api_key: str, symbol: str) -> Dict[st
     return metrics
 
 
-def update_frontend_json(ticker_map: Dict[str, Dict[str, Optional[float]]]) -> None:
+def fetch_quote_batch(
+    session: requests.Session, api_key: str, symbols: list[str], scheduler: AdaptiveScheduler | None = None
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Fetch several symbols in one request.
+
+    Only symbols present in the response are returned; callers fall back to
+    ``fetch_quote`` for the rest.
+    """
+    params = {"ticker": ",".join(symbols)}
+    headers = rapidapi_headers(api_key)
+    try:
+        payload = get_json(session, QUOTES_URL, params, headers, timeout=30, scheduler=scheduler)
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.warning("Failed to fetch quote batch %s..%s: %s", symbols[0], symbols[-1], exc)
+        return {}
+
+    index = index_entries(payload)
+    results: Dict[str, Dict[str, Optional[float]]] = {}
+    for symbol in symbols:
+        entry = index.get(symbol.upper())
+        if entry is not None:
+            results[symbol] = extract_metrics(entry)
+    return results
+
+
+def fetch_batch(
+    session: requests.Session,
+    api_key: str,
+    batch: list[str],
+    scheduler: AdaptiveScheduler | None = None,
+    budget: Budget | None = None,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Fetch one batch, requesting symbols the batch response left out one at a time.
+
+    Each request first takes one unit of ``budget``; once it (or the
+    scheduler's request quota) is exhausted the symbols not fetched yet are
+    simply left out of the result.
+    """
+    if (scheduler is not None and scheduler.exhausted) or (budget is not None and not budget.take()):
+        return {}
+    if len(batch) == 1:
+        return {batch[0]: fetch_quote(session, api_key, batch[0], scheduler)}
+    found = fetch_quote_batch(session, api_key, batch, scheduler)
+    missing = [symbol for symbol in batch if symbol not in found]
+    if missing:
+        LOGGER.info("Batch response missed %s ticker(s); falling back to single requests", len(missing))
+    for symbol in missing:
+        if (scheduler is not None and scheduler.exhausted) or (budget is not None and not budget.take()):
+            break
+        found[symbol] = fetch_quote(session, api_key, symbol, scheduler)
+    return found
+
+
+def chunked(items: list[str], size: int) -> list[list[str]]:
+    size = max(1, size)
+    return [items[idx : idx + size] for idx in range(0, len(items), size)]
+
+
+def update_frontend_json(ticker_map: Dict[str, Dict[str, Optional[float]]]) -> ChangeSet:
+    """
+    Merge ``ticker_map`` into the frontend JSON, rewriting it only if a value changed.
+
+    Returns the change set (rows and fields actually modified).
+    """
     frontend_path = detect_frontend_json_path()
     if not frontend_path.exists():
         LOGGER.warning("Frontend JSON %s does not exist; skipping update.", frontend_path)
-        return
+        return ChangeSet()
 
     try:
-        data = json.loads(frontend_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
+        data = codec.load_path(frontend_path)
+    except codec.DecodeError as exc:
         LOGGER.error("Failed to read %s: %s", frontend_path, exc)
-        return
+        return ChangeSet()
 
-    for day in data.get("days", []):
-        for row in day.get("rows", []):
-            symbol = (row.get("symbol") or row.get("ticker") or "").strip().upper()
-            info = ticker_map.get(symbol)
-            if not info:
-                continue
-            if info.get("price") is not None:
-                row["stockPrice"] = info["price"]
-            if info.get("eps_estimate_curr_q") is not None:
-                row["epsEstimate"] = info["eps_estimate_curr_q"]
-            if info.get("revenue_estimate_curr_q") is not None:
-                row["revenueEstimate"] = info["revenue_estimate_curr_q"]
-            if info.get("volume") is not None:
-                row["tradingVolume"] = info["volume"]
-            if info.get("market_cap") is not None:
-                row["marketCap"] = info["market_cap"]
-            if info.get("pe_ratio") is not None:
-                row["peRatio"] = info["pe_ratio"]
-            if info.get("year_high") is not None:
-                row["yearHigh"] = info["year_high"]
-            if info.get("year_low") is not None:
-                row["yearLow"] = info["year_low"]
-            if info.get("volume") is not None:
-                row["tradingVolume"] = info["volume"]
+    with METRICS.stage("merge"):
+        changes = merge_quotes(index_rows(data.get("days", [])), ticker_map)
+    METRICS.incr("rows", changes.rows)
+    LOGGER.info("Frontend merge: %s", changes.summary())
+    if not changes:
+        LOGGER.info("No enrichment values changed; leaving %s untouched", frontend_path)
+        return changes
 
     data["updated_at"] = now_sgt().isoformat()
-    serialized = json.dumps(data, indent=2, ensure_ascii=False)
-    frontend_path.write_text(serialized, encoding="utf-8")
+    canonical = Path("src/data/earnings_data.json")
+    write_json_outputs(data, frontend_path, mirrors=[canonical])
     LOGGER.info("Updated frontend JSON with enrichment data: %s", frontend_path)
+    if data_client_sharded():
+        write_day_shards(data, SHARD_DIR)
+    return changes
+
+
+def fetch_quotes(
+    tickers: list[str],
+    api_key: str,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    session: requests.Session | None = None,
+    scheduler: AdaptiveScheduler | None = None,
+    budget: Budget | None = None,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Fetch quotes for ``tickers`` on a worker pool, returning results in input order.
+
+    Tickers are requested ``batch_size`` at a time; a batch size of 1 issues one
+    request per symbol. Symbols a batch response leaves out are retried singly.
+    Requests go through an ``AdaptiveScheduler`` capped at ``rate_limit``
+    requests/second and ``max_concurrency`` in flight. Long-running callers pass
+    their own warm ``session`` and ``scheduler``.
+
+    Batches are started in input order, so callers pass tickers most important
+    first. With a ``budget`` the result only holds the tickers fetched before it
+    ran out.
+    """
+    workers = max(1, max_concurrency)
+    # Replayed responses come from disk, so there is no quota to protect.
+    scheduler = scheduler or AdaptiveScheduler(max_concurrency=workers, rate=0 if replaying() else rate_limit)
+    throttled, retries = scheduler.stats.throttled, scheduler.stats.retries
+
+    fetched: Dict[str, Dict[str, Optional[float]]] = {}
+    batches = chunked(tickers, batch_size)
+    owned = build_session(pool_size=workers) if session is None else nullcontext(session)
+    with METRICS.stage("fetch"), owned as session:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(fetch_batch, session, api_key, batch, scheduler, budget) for batch in batches]
+            for future in as_completed(futures):
+                fetched.update(future.result())
+                LOGGER.info("Enriched %s/%s tickers", len(fetched), len(tickers))
+    METRICS.incr("throttled", scheduler.stats.throttled - throttled)
+    METRICS.incr("retries", scheduler.stats.retries - retries)
+    LOGGER.info("Quote requests: %s", scheduler.summary())
+    if scheduler.exhausted:
+        LOGGER.warning(
+            "Request quota exhausted; %s of %s ticker(s) left for the next run", len(tickers) - len(fetched), len(tickers)
+        )
+    elif budget is not None and budget.exhausted:
+        LOGGER.warning(
+            "Budget exhausted (%s) after %s request(s); %s of %s ticker(s) left for the next run",
+            budget.reason,
+            budget.requests,
+            len(tickers) - len(fetched),
+            len(tickers),
+        )
+        METRICS.incr("tickers_deferred", len(tickers) - len(fetched))
+    return {symbol: fetched[symbol] for symbol in tickers if symbol in fetched}
+
+
+def merge_fetched(
+    previous: Dict[str, Dict[str, Optional[float]]],
+    fetched: Dict[str, Dict[str, Optional[float]]],
+    fetched_at: str,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """Overlay freshly fetched quotes on ``previous``, stamping only successful ones."""
+    results = dict(previous)
+    for symbol, metrics in fetched.items():
+        if any(value is not None for value in metrics.values()):
+            results[symbol] = {**metrics, "fetched_at": fetched_at}
+        elif symbol not in results:
+            # Leave failures unstamped so the next run retries them.
+            results[symbol] = metrics
+    return results
 
-    canonical = Path("src/data/earnings_data.json")
-    if canonical != frontend_path:
-        canonical.write_text(serialized, encoding="utf-8")
-        LOGGER.info("Mirrored enrichment data to %s", canonical)
+
+def snapshot_payload(tickers: Dict[str, Dict[str, Optional[float]]], fetched_at: str, hits: int, misses: int) -> dict:
+    return {
+        "updated_at": fetched_at,
+        "source": "Yahoo Finance (RapidAPI quotes)",
+        "tickers": dict(sorted(tickers.items())),
+        "cache": {"hits": hits, "misses": misses},
+    }
 
 
-def enrich_tickers(tickers: Iterable[str], api_key: str, max_concurrency: int = 3, force: bool = False) -> Dict[str, Dict[str, Optional[float]]]:
-    tickers = sorted(set(tickers))
+def enrich_tickers(
+    tickers: Iterable[str],
+    api_key: str,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    force: bool = False,
+    rate_limit: float = DEFAULT_RATE_LIMIT,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    ttl: timedelta = ENRICH_MAX_AGE,
+    ticker_dates: Dict[str, List[str]] | None = None,
+    budget: Budget | None = None,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Enrich ``tickers``, refetching only symbols missing from the latest snapshot
+    or older than ``ttl``, and merge them into a new dated snapshot.
+
+    Stale tickers are fetched in priority order (see ``priority.prioritize``,
+    using ``ticker_dates`` from the ticker index), so when ``budget`` runs out
+    the partial snapshot covers the most valuable rows.
+    """
     if not tickers:
         raise ValueError("No tickers found in earnings cache.")
 
     output_path = enrichment_cache_path_for(now_sgt().date())
-    if not force:
-        latest = latest_enrichment_path()
-        if latest and now_sgt() - datetime.fromtimestamp(latest.stat().st_mtime, tz=now_sgt().tzinfo) < ENRICH_MAX_AGE:
-            LOGGER.info("Latest enrichment cache is fresh: %s", latest.name)
-            payload = json.loads(latest.read_text(encoding="utf-8"))
-            update_frontend_json(payload.get("tickers", {}))
-            return payload
-
-    results: Dict[str, Dict[str, Optional[float]]] = {}
-    with requests.Session() as session:
-        for idx, symbol in enumerate(tickers, start=1):
-            metrics = fetch_quote(session, api_key, symbol)
-            results[symbol] = metrics
-            LOGGER.info("Enriched %s/%s ticker %s", idx, len(tickers), symbol)
-            time.sleep(random.uniform(*DEFAULT_SLEEP_RANGE))
-
-    payload = {
-        "updated_at": now_sgt().isoformat(),
-        "source": "Yahoo Finance (RapidAPI quotes)",
-        "tickers": results,
-    }
-    output_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
-    LOGGER.info("Enrichment written to %s (%s tickers)", output_path, len(results))
-
-    update_frontend_json(results)
+    latest = load_latest_enrichment() or {}
+    snapshot = {} if force else latest
+    tickers = prioritize(tickers, ticker_dates, latest.get("tickers", {}))
+    # Newest quote per symbol across snapshots (an indexed query with the sqlite backend).
+    quotes = {} if force else load_latest_quotes(tickers)
+    previous = {**snapshot.get("tickers", {}), **quotes}
+    cached, stale = partition_enrichment({"tickers": quotes}, tickers, ttl=ttl)
+    METRICS.cache("enrichment", hits=len(cached), misses=len(stale))
+    LOGGER.info("Enrichment cache: %s hit(s), %s miss(es)", len(cached), len(stale))
+    if not stale:
+        update_frontend_json(previous)
+        return snapshot
+
+    fetched = fetch_quotes(
+        stale,
+        api_key,
+        max_concurrency=max_concurrency,
+        rate_limit=rate_limit,
+        batch_size=batch_size,
+        budget=budget,
+    )
+    METRICS.incr("tickers_fetched", len(fetched))
+    fetched_at = now_sgt().isoformat()
+    results = merge_fetched(previous, fetched, fetched_at)
+    payload = snapshot_payload(results, fetched_at, hits=len(cached), misses=len(stale))
+    write_cache(output_path, payload)
+    LOGGER.info("Enrichment written to %s (%s tickers, %s fetched)", output_path, len(results), len(fetched))
+
+    update_frontend_json(payload["tickers"])
     return payload
 
 
 def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Yahoo earnings enrichment job")
-    parser.add_argument("--force", action="store_true", help="Force refresh even if cache is fresh")
-    parser.add_argument("--max-concurrency", type=int, default=3, help="(kept for compatibility; sequential fetch)")
+    parser.add_argument("--force", action="store_true", help="Refetch every ticker even if its cache entry is fresh")
+    parser.add_argument("--ttl-hours", type=float, default=ENRICH_MAX_AGE.total_seconds() / 3600, help="Refetch tickers whose cached quote is older than this")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Number of quote requests in flight at once")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="Max quote requests per second across all workers (0 disables)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Tickers per quotes request (1 disables batching)")
     parser.add_argument("--api-key", help="RapidAPI key (optional, fallback to RAPIDAPI_KEY env or default)")
+    parser.add_argument("--window-days", type=int, help="Only enrich tickers reporting within this many days")
+    parser.add_argument("--deadline", type=float, help="Stop issuing requests after this many seconds and keep what was fetched")
+    parser.add_argument("--max-requests", type=int, help="Stop after this many quote requests and keep what was fetched")
+    parser.add_argument("--window-start", help="Start of the --window-days window, YYYY-MM-DD (default: today)")
+    add_http_cache_args(parser)
+    add_output_args(parser)
+    add_metrics_args(parser)
     return parser.parse_args(argv)
 
 
 def main(argv: Optional[list[str]] = None) -> None:
     args = parse_args(argv)
+    configure_from_args(args)
+    configure_output_from_args(args)
+    configure_metrics_from_args(args, "enrich")
     api_key = get_api_key(args.api_key)
-    tickers = load_cached_tickers()
+    window = window_from(parse_start_date(args.window_start) if args.window_start else None, args.window_days)
+    index = load_ticker_index()
+    tickers = index.tickers(window)
     if not tickers:
         LOGGER.warning("No tickers discovered from earnings cache. Nothing to do.")
+        write_metrics()
         return
 
+    budget = None
+    if args.deadline is not None or args.max_requests is not None:
+        budget = Budget(deadline=args.deadline, max_requests=args.max_requests)
     LOGGER.info("Starting enrichment for %s tickers", len(tickers))
-    enrich_tickers(tickers, api_key=api_key, max_concurrency=args.max_concurrency, force=args.force)
+    enrich_tickers(
+        tickers,
+        api_key=api_key,
+        max_concurrency=args.max_concurrency,
+        force=args.force,
+        rate_limit=args.rate_limit,
+        batch_size=args.batch_size,
+        ttl=timedelta(hours=args.ttl_hours),
+        ticker_dates=index.ticker_dates(),
+        budget=budget,
+    )
+    write_metrics()
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -0,0 +1,119 @@
+"""Shared extractor for the numeric quote metrics found in RapidAPI rows."""
+from __future__ import annotations
+
+from itertools import repeat
+from typing import Any, Dict, Optional, Tuple
+
+from .utils import parse_number
+
+FIELDS: Tuple[str, ...] = (
+    "price",
+    "eps_estimate",
+    "revenue_estimate",
+    "volume",
+    "market_cap",
+    "pe_ratio",
+    "year_high",
+    "year_low",
+)
+
+PRICE_KEYS = {"regularmarketprice", "marketprice", "lastprice", "price", "regularmarketpreviousclose"}
+EPS_KEYS = {"epsestimate", "epsforward", "eps", "earningsestimate", "epsquarterly", "epssurprise"}
+REVENUE_KEYS = {"revenuestimate", "revenueforecast", "totalrevenue", "revenue"}
+VOLUME_KEYS = {"volume", "regularmarketvolume", "totalvolume", "sharestraded"}
+MARKET_CAP_KEYS = {"marketcap", "marketcapitalization", "marketcapitalest", "marketcapital"}
+PE_KEYS = {"peratio", "trailingpe", "forwardpe", "pe"}
+HIGH_KEYS = {"fiftytwoweekhigh", "52weekhigh", "week52high", "fiftytwo_weekhigh", "fiftytwo_weekhi"}
+LOW_KEYS = {"fiftytwoweeklow", "52weeklow", "week52low", "fiftytwo_weeklow", "fiftytwo_weeklo"}
+
+MAX_CACHED_KEYS = 4096
+_DONE = object()
+
+
+def classify_key(normalized: str) -> Tuple[int, ...]:
+    """
+    Return the indexes into ``FIELDS`` a lower-cased key may fill, in priority order.
+
+    A key can match several fields (``openPrice`` matches both price and P/E);
+    the extractor assigns it to the first one that is still empty.
+    """
+    matches = (
+        normalized in PRICE_KEYS or "price" in normalized,
+        normalized in EPS_KEYS or "eps" in normalized,
+        normalized in REVENUE_KEYS or "revenue" in normalized,
+        normalized in VOLUME_KEYS or "volume" in normalized,
+        normalized in MARKET_CAP_KEYS or "marketcap" in normalized,
+        normalized in PE_KEYS or ("pe" in normalized and "peg" not in normalized),
+        normalized in HIGH_KEYS or ("high" in normalized and "52" in normalized),
+        normalized in LOW_KEYS or ("low" in normalized and "52" in normalized),
+    )
+    return tuple(idx for idx, matched in enumerate(matches) if matched)
+
+
+class MetricExtractor:
+    """
+    Single-pass metric extractor that memoizes key classification across rows.
+
+    The walk is depth-first in document order, so the first matching key wins
+    exactly as it did with the old recursive ``flatten`` helpers, but it stops
+    as soon as every field is filled and never descends into scalar values.
+    """
+
+    def __init__(self) -> None:
+        self._classes: Dict[str, Tuple[int, ...]] = {}
+
+    def classify(self, key: str) -> Tuple[int, ...]:
+        cached = self._classes.get(key)
+        if cached is None:
+            cached = classify_key(key.lower())
+            if len(self._classes) < MAX_CACHED_KEYS:
+                self._classes[key] = cached
+        return cached
+
+    def extract(self, obj: Any) -> Dict[str, Optional[float]]:
+        values: list[Optional[float]] = [None] * len(FIELDS)
+        remaining = len(FIELDS)
+        classes = self._classes
+        if isinstance(obj, dict):
+            stack = [iter(obj.items())]
+        elif isinstance(obj, list):
+            stack = [zip(repeat(None), obj)]
+        else:
+            stack = []
+
+        while stack:
+            item = next(stack[-1], _DONE)
+            if item is _DONE:
+                stack.pop()
+                continue
+            key, value = item
+            if isinstance(value, dict):
+                stack.append(iter(value.items()))
+                continue
+            if isinstance(value, list):
+                stack.append(zip(repeat(None), value))
+                continue
+            if not isinstance(key, str):
+                continue
+            candidates = classes.get(key)
+            if candidates is None:
+                candidates = self.classify(key)
+            for idx in candidates:
+                if values[idx] is None:
+                    parsed = parse_number(value)
+                    if parsed is not None:
+                        values[idx] = parsed
+                        remaining -= 1
+                        if not remaining:
+                            return dict(zip(FIELDS, values))
+                    break
+
+        return dict(zip(FIELDS, values))
+
+
+DEFAULT_EXTRACTOR = MetricExtractor()
+
+
+def extract_fields(obj: Any) -> Dict[str, Optional[float]]:
+    """Extract every metric in ``FIELDS`` from a nested row or quote entry."""
+    return DEFAULT_EXTRACTOR.extract(obj)
@@ -1,19 +1,58 @@
-"""Generate a consolidated earnings JSON file for the frontend."""
+"""
+Generate a consolidated earnings JSON file for the frontend.
+
+``--all`` / ``--range START END`` instead rebuild every cached calendar
+(``cache/yahoo_earnings_*.json``) into ``--output-dir``, pairing each with the
+enrichment snapshot closest to when it was fetched. Files are rebuilt in a
+process pool; a manifest of input hashes (calendar, enrichment, the merge and
+serialization code in ``BUILD_MODULES``, the JSON codec and the output
+options) lets reruns skip outputs whose inputs are unchanged.
+
+``--columnar`` merges and serializes through ``app.columnar.RowTable``
+(column-wise quote merge, vectorized number parsing, rows encoded straight
+from the columns); the output bytes are the same. It is only faster with the
+stdlib JSON codec, so with orjson/msgspec active the dict path is used.
+"""
 from __future__ import annotations
 
 import argparse
-import json
+import hashlib
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
 
+from . import codec
+from .columnar import RowTable, augment_columnar, columnar_preferred
 from .cache import CACHE_DIR, load_cache, load_latest_enrichment
+from .metrics import METRICS, add_metrics_args, configure_metrics_from_args, write_metrics
+from .output import (
+    COMPRESSIONS,
+    SHARD_DIR,
+    add_output_args,
+    atomic_write_bytes,
+    configure_output_from_args,
+    serialize,
+    write_day_shards,
+    write_json_outputs,
+)
 from .pipeline import augment_rows
-from .utils import now_sgt
+from .storage import ENRICH_PREFIX
+from .utils import SINGAPORE_TZ, now_sgt, parse_start_date
 
 LOGGER = logging.getLogger("app.generate")
 logging.basicConfig(level=logging.INFO)
 
 OUTPUT_PATH = Path("src/data/earnings_data.json")
+BULK_OUTPUT_DIR = CACHE_DIR / "generated"
+BULK_MANIFEST = "manifest.json"
+CALENDAR_PREFIX = "yahoo_earnings_"
+# Modules whose code decides the bytes of a bulk output; editing any of them
+# invalidates every output in the manifest.
+BUILD_MODULES = ("generate.py", "pipeline.py", "rows.py", "columnar.py", "utils.py", "codec.py", "output.py")
 
 
 def latest_earnings_path() -> Path:
@@ -23,35 +62,247 @@ def latest_earnings_path() -> Path:
     return files[0]
 
 
-def build_payload() -> dict:
-    earnings_path = latest_earnings_path()
-    payload = load_cache(earnings_path)
-    if payload is None:
-        raise ValueError(f"Failed to load earnings cache: {earnings_path}")
+def build_payload(
+    earnings_path: Path | None = None,
+    enrichment_path: Path | None = None,
+    columnar: bool = False,
+) -> dict:
+    """
+    Merge one cached calendar (default: the latest) with an enrichment snapshot (default: the latest).
+
+    With ``columnar`` (and the stdlib codec, see ``columnar.columnar_preferred``)
+    the merged rows are left in a ``RowTable`` under ``payload["days"]``;
+    write it with ``write_payload``.
+    """
+    if columnar and not columnar_preferred():
+        LOGGER.info("--columnar ignored: the %s codec is faster on the dict path", codec.CODEC.name)
+        columnar = False
+    earnings_path = earnings_path or latest_earnings_path()
+    with METRICS.stage("load"):
+        payload = load_cache(earnings_path)
+        if payload is None:
+            raise ValueError(f"Failed to load earnings cache: {earnings_path}")
+        if enrichment_path is not None:
+            enrichment = load_cache(enrichment_path) or {}
+        else:
+            enrichment = load_latest_enrichment() or {}
 
-    enrichment = load_latest_enrichment() or {}
     ticker_map = enrichment.get("tickers", {})
-    augment_rows(payload.get("days", []), ticker_map)
+    with METRICS.stage("merge"):
+        if columnar:
+            payload["days"], changes = augment_columnar(payload.get("days", []), ticker_map)
+        else:
+            changes = augment_rows(payload.get("days", []), ticker_map)
+    LOGGER.info("Enrichment merge: %s", changes.summary())
+    METRICS.incr("rows", row_count(payload))
 
     payload["generated_at"] = now_sgt().isoformat()
     payload["source"] = "Yahoo Finance"
     return payload
 
 
-def write_payload(payload: dict, output: Path = OUTPUT_PATH) -> None:
-    output.parent.mkdir(parents=True, exist_ok=True)
-    with output.open("w", encoding="utf-8") as fp:
-        json.dump(payload, fp, ensure_ascii=False, indent=2)
-    LOGGER.info("Wrote %s", output)
+def row_count(payload: dict) -> int:
+    days = payload.get("days", [])
+    if isinstance(days, RowTable):
+        return days.offsets[-1]
+    return sum(len(day.get("rows", [])) for day in days)
+
+
+def write_payload(
+    payload: dict,
+    output: Path = OUTPUT_PATH,
+    compact: bool | None = None,
+    precompress: Sequence[str] | None = None,
+) -> None:
+    days = payload.get("days")
+    serializer = days.dumps if isinstance(days, RowTable) else serialize
+    write_json_outputs(payload, output, compact=compact, precompress=precompress, serializer=serializer)
+
+
+@dataclass(frozen=True)
+class BulkJob:
+    calendar: Path
+    enrichment: Optional[Path]
+    output: Path
+    inputs_hash: str
+
+
+def calendar_range(path: Path) -> Optional[tuple[date, date]]:
+    """Parse ``yahoo_earnings_YYYYMMDD_YYYYMMDD.json`` into its start/end days."""
+    parts = path.stem[len(CALENDAR_PREFIX) :].split("_")
+    try:
+        start, end = (datetime.strptime(part, "%Y%m%d").date() for part in parts)
+    except ValueError:
+        return None
+    return start, end
+
+
+def enrichment_snapshots(cache_dir: Path) -> List[tuple[date, Path]]:
+    snapshots = []
+    for path in cache_dir.glob(f"{ENRICH_PREFIX}*.json"):
+        try:
+            snapshots.append((date.fromisoformat(path.stem[len(ENRICH_PREFIX) :]), path))
+        except ValueError:
+            continue
+    return sorted(snapshots)
+
+
+def closest_enrichment(fetched_on: date, snapshots: Sequence[tuple[date, Path]]) -> Optional[Path]:
+    """Snapshot dated closest to ``fetched_on``; on a tie the earlier one (quotes known at the time)."""
+    if not snapshots:
+        return None
+    return min(snapshots, key=lambda item: (abs((item[0] - fetched_on).days), item[0] > fetched_on))[1]
 
 
-def main() -> None:
+def file_digest(path: Path) -> str:
+    with path.open("rb") as fp:
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+def build_digest(compact: bool = False, precompress: Sequence[str] = (), columnar: bool = False) -> str:
+    """Hash of everything besides the input files that shapes an output: code, codec and options."""
+    here = Path(__file__).parent
+    parts = [file_digest(here / name) for name in BUILD_MODULES]
+    parts.append(f"codec={codec.CODEC.name} compact={compact} precompress={','.join(sorted(precompress))} columnar={columnar}")
+    return "\n".join(parts)
+
+
+def plan_bulk(
+    output_dir: Path,
+    start: date | None = None,
+    end: date | None = None,
+    cache_dir: Path | None = None,
+    compact: bool = False,
+    precompress: Sequence[str] = (),
+    columnar: bool = False,
+) -> List[BulkJob]:
+    """
+    One job per cached calendar overlapping ``start..end`` (every one when unset).
+
+    A calendar's fetch time is its mtime (written once by refresh/backfill).
+    Each job's ``inputs_hash`` also covers ``build_digest`` for the options.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    snapshots = enrichment_snapshots(cache_dir)
+    code_hash = build_digest(compact, precompress, columnar)
+    digests: Dict[Path, str] = {}
+    jobs = []
+    for calendar in sorted(cache_dir.glob(f"{CALENDAR_PREFIX}*.json")):
+        span = calendar_range(calendar)
+        if span is None or (start and span[1] < start) or (end and span[0] > end):
+            continue
+        fetched_on = datetime.fromtimestamp(calendar.stat().st_mtime, tz=SINGAPORE_TZ).date()
+        enrichment = closest_enrichment(fetched_on, snapshots)
+        if enrichment is not None and enrichment not in digests:
+            digests[enrichment] = file_digest(enrichment)
+        material = "\n".join((file_digest(calendar), digests.get(enrichment, "-"), code_hash))
+        output = output_dir / f"earnings_data_{span[0].isoformat()}_{span[1].isoformat()}.json"
+        jobs.append(BulkJob(calendar, enrichment, output, hashlib.sha256(material.encode("utf-8")).hexdigest()))
+    return jobs
+
+
+def regenerate(job: BulkJob, compact: bool = False, precompress: Sequence[str] = (), columnar: bool = False) -> int:
+    """Rebuild one output (runs in a worker process); returns the row count."""
+    payload = build_payload(job.calendar, job.enrichment, columnar=columnar)
+    write_payload(payload, job.output, compact=compact, precompress=precompress)
+    return row_count(payload)
+
+
+def regenerate_all(
+    output_dir: Path = BULK_OUTPUT_DIR,
+    start: date | None = None,
+    end: date | None = None,
+    max_workers: int | None = None,
+    force: bool = False,
+    compact: bool = False,
+    precompress: Sequence[str] = (),
+    cache_dir: Path | None = None,
+    columnar: bool = False,
+) -> Dict[str, int]:
+    """Rebuild every cached calendar whose inputs changed since the last run; return counts."""
+    manifest_path = output_dir / BULK_MANIFEST
+    entries: Dict[str, Any] = (load_cache(manifest_path) or {}).get("outputs", {})
+    jobs = plan_bulk(output_dir, start, end, cache_dir, compact=compact, precompress=precompress, columnar=columnar)
+    todo = [
+        job
+        for job in jobs
+        if force or entries.get(job.output.name, {}).get("inputs") != job.inputs_hash or not job.output.exists()
+    ]
+    LOGGER.info("Bulk generate: %s calendar(s), %s unchanged, %s to rebuild", len(jobs), len(jobs) - len(todo), len(todo))
+    METRICS.cache("bulk_outputs", hits=len(jobs) - len(todo), misses=len(todo))
+
+    built = failed = 0
+    if todo:
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(todo)))
+        with METRICS.stage("regenerate"), ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(regenerate, job, compact, tuple(precompress), columnar): job for job in todo}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as exc:  # noqa: BLE001 - one bad file must not stop the batch
+                    LOGGER.error("Failed to regenerate %s: %s", job.calendar.name, exc)
+                    entries.pop(job.output.name, None)
+                    failed += 1
+                    continue
+                built += 1
+                METRICS.incr("rows", rows)
+                entries[job.output.name] = {
+                    "calendar": job.calendar.name,
+                    "enrichment": job.enrichment.name if job.enrichment else None,
+                    "inputs": job.inputs_hash,
+                    "rows": rows,
+                }
+        atomic_write_bytes(
+            manifest_path,
+            serialize({"generated_at": now_sgt().isoformat(), "outputs": dict(sorted(entries.items()))}),
+        )
+    LOGGER.info("Bulk generate: %s rebuilt, %s failed", built, failed)
+    return {"planned": len(jobs), "rebuilt": built, "skipped": len(jobs) - len(todo), "failed": failed}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
     parser = argparse.ArgumentParser(description="Generate consolidated earnings JSON")
     parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Path to write JSON (default src/data/earnings_data.json)")
-    args = parser.parse_args()
+    parser.add_argument("--shards", action="store_true", help="Also write per-day shards + manifest under src/data/days/")
+    bulk = parser.add_mutually_exclusive_group()
+    bulk.add_argument("--all", action="store_true", help="Rebuild every cached calendar into --output-dir")
+    bulk.add_argument("--range", nargs=2, metavar=("START", "END"), help="Rebuild cached calendars overlapping START..END (YYYY-MM-DD)")
+    parser.add_argument("--output-dir", type=Path, default=BULK_OUTPUT_DIR, help="Directory for --all/--range outputs (default cache/generated/)")
+    parser.add_argument("--workers", type=int, help="Processes for --all/--range (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="With --all/--range, rebuild even when inputs are unchanged")
+    parser.add_argument("--columnar", action="store_true", help="Merge and serialize rows column-wise (same output): faster for indented output with EARNINGS_JSON_CODEC=json, no gain with --compact; ignored with orjson/msgspec, which are faster")
+    add_output_args(parser)
+    add_metrics_args(parser)
+    args = parser.parse_args(argv)
+    configure_output_from_args(args)
+    configure_metrics_from_args(args, "generate")
+
+    if args.all or args.range:
+        start, end = (parse_start_date(value) for value in args.range) if args.range else (None, None)
+        precompress = args.precompress
+        if precompress is not None and not precompress:
+            precompress = list(COMPRESSIONS)
+        regenerate_all(
+            args.output_dir,
+            start,
+            end,
+            max_workers=args.workers,
+            force=args.force,
+            compact=args.compact,
+            precompress=precompress or (),
+            columnar=args.columnar,
+        )
+        write_metrics()
+        return
 
-    payload = build_payload()
+    payload = build_payload(columnar=args.columnar)
     write_payload(payload, args.output)
+    if args.shards:
+        if isinstance(payload["days"], RowTable):
+            payload["days"] = payload["days"].to_days()
+        write_day_shards(payload, SHARD_DIR)
+    write_metrics()
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -0,0 +1,199 @@
+"""Shared HTTP session helpers for the RapidAPI jobs."""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Any, Callable, Iterator, List, Mapping
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import ResponseStore
+from .metrics import METRICS
+from .scheduler import AdaptiveScheduler, ThrottledError, TransientError, rate_limit_pause, retry_after_seconds
+from .stream import DEFAULT_CHUNK_SIZE, RowStream
+
+LOGGER = logging.getLogger("app.http")
+
+API_HOST = "yahoo-finance15.p.rapidapi.com"
+# Point the jobs at a stand-in server (e.g. benchmarks/mock_rapidapi.py) for load tests.
+API_BASE_URL = os.getenv("RAPIDAPI_BASE_URL", f"https://{API_HOST}").rstrip("/")
+HTTP_MODES = ("live", "record", "replay")
+
+_MODE = "live"
+_STORE: ResponseStore | None = None
+# ``ResponseStore.load`` default marking a miss, so a recorded ``null`` body is still a hit.
+_MISS = object()
+
+# Callables attached to every session from ``build_session`` as requests
+# response hooks, e.g. to record per-request latency during load tests.
+RESPONSE_HOOKS: List[Callable[..., Any]] = []
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def rapidapi_headers(api_key: str) -> dict[str, str]:
+    """Return the headers every RapidAPI request needs."""
+    return {
+        "x-rapidapi-key": api_key,
+        "x-rapidapi-host": API_HOST,
+        "accept": "application/json",
+    }
+
+
+def build_session(pool_size: int = 10) -> requests.Session:
+    """Return a session whose connection pool can serve ``pool_size`` threads at once."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if RESPONSE_HOOKS:
+        session.hooks["response"].extend(RESPONSE_HOOKS)
+    return session
+
+
+def configure_http_cache(mode: str = "live", ttl: timedelta | None = None, store: ResponseStore | None = None) -> None:
+    """
+    Select how ``get_json`` talks to the network.
+
+    ``live`` always hits the API, ``record`` hits the API and stores each raw
+    response (reusing stored ones younger than ``ttl``), and ``replay`` serves
+    every request from the store without touching the network.
+
+    Responses are keyed by their exact query parameters. Batched quote
+    requests key on the comma-joined ticker list, so a replay only finds a
+    batch recorded with the same tickers in the same order (same ticker set
+    and ``--batch-size``); any other composition misses.
+    """
+    global _MODE, _STORE
+    if mode not in HTTP_MODES:
+        raise ValueError(f"Unknown HTTP cache mode {mode!r}; expected one of {', '.join(HTTP_MODES)}")
+    _MODE = mode
+    _STORE = None if mode == "live" else (store or ResponseStore(ttl=ttl))
+
+
+def replaying() -> bool:
+    return _MODE == "replay"
+
+
+def add_http_cache_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", action="store_true", help="Store raw API responses under cache/http/")
+    group.add_argument("--replay", action="store_true", help="Serve API responses from cache/http/ only (no network)")
+    parser.add_argument("--http-ttl-hours", type=float, help="With --record, reuse stored responses younger than this")
+
+
+def configure_from_args(args: argparse.Namespace) -> None:
+    mode = "replay" if args.replay else "record" if args.record else "live"
+    ttl = timedelta(hours=args.http_ttl_hours) if args.http_ttl_hours is not None else None
+    configure_http_cache(mode, ttl=ttl)
+
+
+def _send(
+    session: requests.Session,
+    url: str,
+    params: Mapping[str, Any],
+    headers: Mapping[str, str],
+    timeout: float,
+    scheduler: AdaptiveScheduler | None,
+    stream: bool = False,
+) -> requests.Response:
+    """Issue one GET, turning 429/5xx/connection failures into scheduler errors."""
+    started = time.perf_counter()
+    try:
+        response = session.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+    except (requests.ConnectionError, requests.Timeout) as exc:
+        METRICS.incr("request_errors")
+        raise TransientError(f"{type(exc).__name__} for {url}: {exc}") from exc
+    METRICS.observe("request_seconds", time.perf_counter() - started)
+    METRICS.incr("requests")
+    METRICS.incr(f"responses_{response.status_code}")
+    if response.status_code == 429:
+        retry_after = retry_after_seconds(response.headers)
+        if retry_after is None:
+            retry_after = rate_limit_pause(response.headers)
+        response.close()
+        raise ThrottledError(f"429 Too Many Requests for {url}", retry_after)
+    if response.status_code >= 500:
+        response.close()
+        raise TransientError(f"{response.status_code} Server Error for {url}", retry_after_seconds(response.headers))
+    response.raise_for_status()
+    if scheduler is not None:
+        # RapidAPI reports the remaining quota; stop before it turns into 429s.
+        pause = rate_limit_pause(response.headers)
+        if pause:
+            scheduler.pause(pause)
+    return response
+
+
+def get_json(
+    session: requests.Session,
+    url: str,
+    params: Mapping[str, Any],
+    headers: Mapping[str, str],
+    timeout: float = 30,
+    scheduler: AdaptiveScheduler | None = None,
+) -> Any:
+    """
+    GET ``url`` and decode JSON, honouring the configured record/replay mode.
+
+    With a ``scheduler`` the network call runs under its concurrency limit and
+    429s, 5xx responses and connection errors are retried with backoff.
+    """
+    if _STORE is not None and (_MODE == "replay" or _STORE.ttl is not None):
+        cached = _STORE.load(url, params, default=_MISS)
+        METRICS.cache("http_store", hits=int(cached is not _MISS), misses=int(cached is _MISS))
+        if cached is not _MISS:
+            LOGGER.debug("Served %s %s from response store", url, dict(params))
+            return cached
+        if _MODE == "replay":
+            raise ReplayMissError(f"No recorded response for {url} {dict(params)}")
+
+    def attempt() -> Any:
+        response = _send(session, url, params, headers, timeout, scheduler)
+        METRICS.incr("bytes_received", len(response.content))
+        with METRICS.stage("parse"):
+            return response.json()
+
+    body = scheduler.run(attempt) if scheduler is not None else attempt()
+    if _STORE is not None:
+        _STORE.save(url, params, body)
+    return body
+
+
+def stream_json_rows(
+    session: requests.Session,
+    url: str,
+    params: Mapping[str, Any],
+    headers: Mapping[str, str],
+    timeout: float = 30,
+    scheduler: AdaptiveScheduler | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> RowStream:
+    """
+    GET ``url`` and return a ``RowStream`` that parses the body as it downloads.
+
+    The scheduler covers the request up to the response headers; the body is
+    read as the stream is iterated. Record/replay need the whole document, so
+    with a response store configured this falls back to ``get_json``.
+    """
+    if _STORE is not None:
+        return RowStream.of(get_json(session, url, params, headers, timeout, scheduler))
+
+    def attempt() -> requests.Response:
+        return _send(session, url, params, headers, timeout, scheduler, stream=True)
+
+    response = scheduler.run(attempt) if scheduler is not None else attempt()
+
+    def chunks() -> Iterator[bytes]:
+        with response:
+            for chunk in response.iter_content(chunk_size):
+                METRICS.incr("bytes_received", len(chunk))
+                yield chunk
+
+    return RowStream(chunks())
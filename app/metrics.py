@@ -0,0 +1,204 @@
+"""
+Run metrics for the refresh/enrich/generate jobs.
+
+Each job records into the process-wide ``METRICS`` collector:
+
+* stage durations (``fetch``, ``parse``, ``merge``, ``serialize``, ``write``),
+  summed across worker threads;
+* counters such as ``requests``, ``bytes_received``, ``bytes_written``, ``rows``;
+* histograms such as ``request_seconds``;
+* cache hit/miss counts, reported with their hit ratio.
+
+``--metrics-file`` writes a JSON snapshot at the end of the run and
+``--prom-file`` writes the same data in the Prometheus textfile format (for
+node_exporter's textfile collector).
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROM_PREFIX = "earnings"
+
+_METRICS_FILE: Optional[Path] = None
+_PROM_FILE: Optional[Path] = None
+
+
+class Histogram:
+    """Cumulative-bucket histogram matching Prometheus semantics."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip([*map(_format_bound, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+def _format_bound(value: float) -> str:
+    return f"{value:g}"
+
+
+class Metrics:
+    """Thread-safe collector for one job run."""
+
+    def __init__(self, job: str = "app") -> None:
+        self._lock = threading.Lock()
+        self.reset(job)
+
+    def reset(self, job: str) -> None:
+        with self._lock:
+            self.job = job
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+            self.stages: Dict[str, float] = {}
+            self.counters: Dict[str, float] = {}
+            self.histograms: Dict[str, Histogram] = {}
+            self.caches: Dict[str, List[int]] = {}
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def cache(self, name: str, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            counts = self.caches.setdefault(name, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            caches = {
+                name: {"hits": hits, "misses": misses, "hit_ratio": hits / (hits + misses) if hits + misses else None}
+                for name, (hits, misses) in self.caches.items()
+            }
+            return {
+                "job": self.job,
+                "started_at": self.started_at.isoformat(),
+                "duration_seconds": time.perf_counter() - self._started,
+                "stages": dict(self.stages),
+                "counters": dict(self.counters),
+                "histograms": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+                "caches": caches,
+            }
+
+    def prometheus(self, prefix: str = PROM_PREFIX) -> str:
+        """Render the snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        job = f'job="{self.job}"'
+        lines = [
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds{{{job}}} {snapshot['duration_seconds']:.6f}",
+            f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+            f"{prefix}_last_run_timestamp_seconds{{{job}}} {self.started_at.timestamp():.3f}",
+        ]
+        if snapshot["stages"]:
+            lines.append(f"# TYPE {prefix}_stage_seconds gauge")
+            for name, seconds in sorted(snapshot["stages"].items()):
+                lines.append(f'{prefix}_stage_seconds{{{job},stage="{name}"}} {seconds:.6f}')
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name}{{{job}}} {value:g}")
+        with self._lock:
+            histograms = {name: (histogram.cumulative(), histogram.sum, histogram.count) for name, histogram in self.histograms.items()}
+        for name, (buckets, total, count) in sorted(histograms.items()):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for bound, cumulative in buckets:
+                lines.append(f'{prefix}_{name}_bucket{{{job},le="{bound}"}} {cumulative}')
+            lines.append(f"{prefix}_{name}_sum{{{job}}} {total:.6f}")
+            lines.append(f"{prefix}_{name}_count{{{job}}} {count}")
+        if snapshot["caches"]:
+            lines.append(f"# TYPE {prefix}_cache_hits gauge")
+            lines.append(f"# TYPE {prefix}_cache_misses gauge")
+            for name, cache in sorted(snapshot["caches"].items()):
+                lines.append(f'{prefix}_cache_hits{{{job},cache="{name}"}} {cache["hits"]}')
+                lines.append(f'{prefix}_cache_misses{{{job},cache="{name}"}} {cache["misses"]}')
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def configure_metrics(job: str, metrics_file: Optional[Path] = None, prom_file: Optional[Path] = None) -> None:
+    """Start a fresh run for ``job`` and choose where ``write_metrics`` puts it."""
+    global _METRICS_FILE, _PROM_FILE
+    METRICS.reset(job)
+    _METRICS_FILE = metrics_file
+    _PROM_FILE = prom_file
+
+
+def add_metrics_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metrics-file", type=Path, help="Write run metrics as JSON to this path")
+    parser.add_argument("--prom-file", type=Path, help="Write run metrics in Prometheus textfile format to this path")
+
+
+def configure_metrics_from_args(args: argparse.Namespace, job: str) -> None:
+    configure_metrics(job, args.metrics_file, args.prom_file)
+
+
+def _replace_text(path: Path, text: str) -> None:
+    # node_exporter may read the file at any moment, so never expose a partial one.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_metrics() -> Dict[str, Any]:
+    """Write the configured metrics files (if any) and return the JSON snapshot."""
+    snapshot = METRICS.snapshot()
+    if _METRICS_FILE is not None:
+        _replace_text(_METRICS_FILE, json.dumps(snapshot, indent=2))
+    if _PROM_FILE is not None:
+        _replace_text(_PROM_FILE, METRICS.prometheus())
+    return snapshot
@@ -0,0 +1,230 @@
+"""Single write path for JSON payloads shipped to the dashboard and cache."""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Mapping, Sequence
+
+from . import codec
+from .metrics import METRICS
+
+try:  # Optional: brotli siblings are skipped when the package is missing.
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+LOGGER = logging.getLogger("app.output")
+
+COMPRESSIONS = ("gz", "br")
+MANIFEST_NAME = "manifest.json"
+SHARD_DIR = Path("src/data/days")
+# First line of src/utils/dataClient.js when the frontend loads day shards lazily.
+SHARDED_CLIENT_LINE = "const earningsData = null; // sharded: days load lazily from ../data/days/manifest.json"
+
+_COMPACT = False
+_PRECOMPRESS: tuple[str, ...] = ()
+
+
+def configure_output(compact: bool = False, precompress: Sequence[str] = ()) -> None:
+    """Set the process-wide defaults used by ``write_json_outputs``."""
+    global _COMPACT, _PRECOMPRESS
+    unknown = set(precompress) - set(COMPRESSIONS)
+    if unknown:
+        raise ValueError(f"Unknown compression(s) {sorted(unknown)}; expected {', '.join(COMPRESSIONS)}")
+    _COMPACT = compact
+    _PRECOMPRESS = tuple(precompress)
+
+
+def add_output_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--compact", action="store_true", help="Write frontend JSON without indentation")
+    parser.add_argument(
+        "--precompress",
+        nargs="*",
+        choices=COMPRESSIONS,
+        metavar="{gz,br}",
+        help="Also write precompressed siblings (default with no value: gz br)",
+    )
+
+
+def configure_output_from_args(args: argparse.Namespace) -> None:
+    precompress = args.precompress
+    if precompress is not None and not precompress:
+        precompress = list(COMPRESSIONS)
+    configure_output(compact=args.compact, precompress=precompress or ())
+
+
+def serialize(payload: Mapping[str, Any], compact: bool = False) -> bytes:
+    with METRICS.stage("serialize"):
+        return codec.dumps(payload, compact=compact)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write ``data`` to a temp file beside ``path`` and rename it into place."""
+    with METRICS.stage("write"):
+        _atomic_write_bytes(path, data)
+    METRICS.incr("bytes_written", len(data))
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """Atomically point ``target`` at ``source``'s bytes, hard-linking when possible."""
+    if source.resolve() == target.resolve():
+        return
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.link")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    try:
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def compress(data: bytes, fmt: str) -> bytes | None:
+    if fmt == "gz":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if fmt == "br":
+        if brotli is None:
+            LOGGER.debug("brotli not installed; skipping .br output")
+            return None
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Unknown compression {fmt!r}")
+
+
+def write_json_outputs(
+    payload: Mapping[str, Any],
+    path: Path,
+    mirrors: Iterable[Path] = (),
+    compact: bool | None = None,
+    precompress: Sequence[str] | None = None,
+    serializer: Callable[..., bytes] = serialize,
+    skip_unchanged: bool = True,
+) -> List[Path]:
+    """
+    Serialize ``payload`` once (``serializer(payload, compact=...)``), write it atomically to ``path`` and mirror it.
+
+    Precompressed siblings (``<name>.gz``/``<name>.br``) are written next to
+    ``path`` and mirrored alongside it. ``compact`` and ``precompress`` fall
+    back to the defaults set by ``configure_output``. Identical output already
+    on disk is left alone (see ``write_bytes_outputs``). Returns every path written.
+    """
+    compact = _COMPACT if compact is None else compact
+    return write_bytes_outputs(serializer(payload, compact=compact), path, mirrors, precompress, skip_unchanged)
+
+
+def unchanged_on_disk(path: Path, data: bytes) -> bool:
+    """True when ``path`` already holds exactly ``data`` (size checked before reading)."""
+    try:
+        return path.stat().st_size == len(data) and path.read_bytes() == data
+    except FileNotFoundError:
+        return False
+
+
+def write_bytes_outputs(
+    data: bytes,
+    path: Path,
+    mirrors: Iterable[Path] = (),
+    precompress: Sequence[str] | None = None,
+    skip_unchanged: bool = True,
+) -> List[Path]:
+    """
+    Write already-serialized JSON plus its precompressed siblings and mirrors.
+
+    With ``skip_unchanged`` (the default) nothing is touched when ``path`` and
+    every mirror already hold ``data`` with their siblings present, so file
+    watchers (e.g. Vite HMR) see no event.
+    """
+    precompress = _PRECOMPRESS if precompress is None else tuple(precompress)
+    targets = [path, *(mirror for mirror in mirrors if mirror != path)]
+    if skip_unchanged and all(
+        unchanged_on_disk(target, data) and all(target.with_name(f"{target.name}.{fmt}").exists() for fmt in precompress)
+        for target in targets
+    ):
+        LOGGER.debug("Unchanged %s; not rewritten", path)
+        METRICS.incr("writes_skipped")
+        return []
+    atomic_write_bytes(path, data)
+    written = [path]
+    siblings: List[tuple[str, Path]] = []
+    for fmt in precompress:
+        encoded = compress(data, fmt)
+        if encoded is None:
+            continue
+        sibling = path.with_name(f"{path.name}.{fmt}")
+        atomic_write_bytes(sibling, encoded)
+        siblings.append((fmt, sibling))
+        written.append(sibling)
+    LOGGER.info("Wrote %s (%s bytes%s)", path, len(data), "".join(f", .{fmt} {s.stat().st_size}" for fmt, s in siblings))
+
+    for mirror in targets[1:]:
+        link_or_copy(path, mirror)
+        written.append(mirror)
+        for fmt, sibling in siblings:
+            target = mirror.with_name(f"{mirror.name}.{fmt}")
+            link_or_copy(sibling, target)
+            written.append(target)
+        LOGGER.info("Mirrored %s to %s", path.name, mirror)
+    return written
+
+
+def write_day_shards(payload: Mapping[str, Any], shard_dir: Path) -> Path:
+    """
+    Write one JSON file per day plus a manifest the frontend uses to load lazily.
+
+    The manifest lists every day with its row count, shard size and SHA-256 so
+    the client can fetch only the days in the selected range. Shards whose bytes
+    are unchanged are left alone, and shards for days no longer in the payload
+    are removed. Returns the manifest path.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    entries = []
+    keep = {MANIFEST_NAME}
+    for day in payload.get("days", []):
+        filename = f"{day['day']}.json"
+        data = serialize(day, compact=_COMPACT)
+        write_bytes_outputs(data, shard_dir / filename)
+        entries.append(
+            {
+                "day": day["day"],
+                "file": filename,
+                "count": day.get("count", len(day.get("rows", []))),
+                "bytes": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+            }
+        )
+        keep.add(filename)
+
+    for stale in shard_dir.glob("*.json*"):
+        if stale.name.split(".json")[0] + ".json" not in keep:
+            stale.unlink()
+
+    manifest = {
+        "params": payload.get("params"),
+        "updated_at": payload.get("updated_at") or payload.get("generated_at"),
+        "source": payload.get("source"),
+        "days": entries,
+    }
+    manifest_path = shard_dir / MANIFEST_NAME
+    write_json_outputs(manifest, manifest_path)
+    return manifest_path
@@ -1,24 +1,271 @@
-"""Helper utilities for composing normalized earnings payloads."""
+"""
+Helper utilities for composing normalized earnings payloads, plus the
+in-process ``refresh -> enrich -> generate`` command:
+
+    python -m app.pipeline run --date 2025-10-17 --days 14
+
+``run`` keeps the calendar payload and ticker map in memory, starts quote
+requests for a day's symbols as soon as that day's calendar arrives, and writes
+the frontend JSON once at the end. The per-stage commands keep working.
+"""
 from __future__ import annotations
 
-from typing import Any, Dict
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .rows import EarningsRow, as_record
+from .utils import date_sequence, now_sgt, parse_start_date
+
+LOGGER = logging.getLogger("app.pipeline")
+
+# (enrichment key, frontend row key) pairs copied by ``update_frontend_json``.
+QUOTE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("price", "stockPrice"),
+    ("eps_estimate_curr_q", "epsEstimate"),
+    ("revenue_estimate_curr_q", "revenueEstimate"),
+    ("volume", "tradingVolume"),
+    ("market_cap", "marketCap"),
+    ("pe_ratio", "peRatio"),
+    ("year_high", "yearHigh"),
+    ("year_low", "yearLow"),
+)
+# The subset ``augment_rows`` applies when rebuilding from cache.
+AUGMENT_FIELDS = QUOTE_FIELDS[:3]
+
+
+@dataclass
+class ChangeSet:
+    """Which rows and fields a merge actually modified."""
+
+    rows: int = 0
+    fields: Dict[str, int] = field(default_factory=dict)
+    symbols: set = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return self.rows > 0
 
-from .utils import parse_number
+    def summary(self) -> str:
+        detail = ", ".join(f"{name} {count}" for name, count in sorted(self.fields.items()))
+        return f"{self.rows} row(s) touched across {len(self.symbols)} symbol(s)" + (f" ({detail})" if detail else "")
 
 
-def augment_rows(days: list[dict[str, Any]], ticker_map: Dict[str, Any]) -> None:
-    """Merge enrichment data into each row and normalize numeric fields."""
+def row_symbol(row: Dict[str, Any] | EarningsRow) -> str:
+    return (row.get("symbol") or row.get("ticker") or "").strip().upper()
+
+
+def index_rows(days: Iterable[Dict[str, Any]]) -> Dict[str, List[EarningsRow]]:
+    """
+    Map each upper-cased symbol to every row (across days) that reports it.
+
+    Dict rows (loaded from cached JSON) are replaced by ``EarningsRow``
+    records in place, so the merge below works on one row type.
+    """
+    index: Dict[str, List[EarningsRow]] = {}
     for day in days:
-        for row in day.get("rows", []):
-            symbol = (row.get("symbol") or row.get("ticker") or "").strip().upper()
-            info = ticker_map.get(symbol) if symbol else None
-            if info:
-                if info.get("price") is not None:
-                    row["stockPrice"] = info["price"]
-                if info.get("eps_estimate_curr_q") is not None:
-                    row["epsEstimate"] = info["eps_estimate_curr_q"]
-                if info.get("revenue_estimate_curr_q") is not None:
-                    row["revenueEstimate"] = info["revenue_estimate_curr_q"]
-            row.setdefault("epsEstimate", parse_number(row.get("eps_estimate")))
-            row.setdefault("revenueEstimate", parse_number(row.get("revenue_estimate")))
-            row.setdefault("stockPrice", parse_number(row.get("stock_price")))
+        rows = day.get("rows")
+        if not rows:
+            continue
+        if any(row.__class__ is not EarningsRow for row in rows):
+            rows = day["rows"] = [as_record(row) for row in rows]
+        for row in rows:
+            symbol = row_symbol(row)
+            if symbol:
+                index.setdefault(symbol, []).append(row)
+    return index
+
+
+def merge_quotes(
+    index: Dict[str, List[EarningsRow]],
+    ticker_map: Dict[str, Any],
+    fields: Sequence[Tuple[str, str]] = QUOTE_FIELDS,
+) -> ChangeSet:
+    """
+    Copy non-null enrichment values onto indexed rows, in place.
+
+    Only the symbols present in both ``index`` and ``ticker_map`` are visited,
+    and a value is written only when it differs from what the row holds.
+    """
+    changes = ChangeSet()
+    if len(ticker_map) < len(index):
+        pairs = ((symbol, index.get(symbol)) for symbol in ticker_map)
+    else:
+        pairs = ((symbol, rows) for symbol, rows in index.items())
+    for symbol, rows in pairs:
+        info = ticker_map.get(symbol) if rows else None
+        if not info:
+            continue
+        updates = [(target, info[source]) for source, target in fields if info.get(source) is not None]
+        if not updates:
+            continue
+        for row in rows:
+            touched = False
+            for target, value in updates:
+                if getattr(row, target) != value:
+                    setattr(row, target, value)
+                    changes.fields[target] = changes.fields.get(target, 0) + 1
+                    touched = True
+            if touched:
+                changes.rows += 1
+                changes.symbols.add(symbol)
+    return changes
+
+
+def augment_rows(days: list[dict[str, Any]], ticker_map: Dict[str, Any]) -> ChangeSet:
+    """
+    Merge enrichment data into each row; rows become ``EarningsRow`` records.
+
+    Numeric fields a cached row lacks are parsed from its raw strings first
+    (``EarningsRow.from_dict``), then quotes override them.
+    """
+    return merge_quotes(index_rows(days), ticker_map, AUGMENT_FIELDS)
+
+
+def run_pipeline(
+    api_key: str,
+    start: date,
+    days: int,
+    max_workers: int = 4,
+    max_concurrency: int = 3,
+    rate_limit: float = 5.0,
+    batch_size: int = 20,
+    ttl: timedelta = timedelta(hours=24),
+    force: bool = False,
+) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Fetch the calendar window and quotes concurrently; return ``(payload, snapshot)``.
+
+    Each finished calendar day immediately queues quote batches for symbols not
+    seen earlier in the window and missing or stale in the latest snapshot.
+    """
+    # Imported here: refresh and enrich import this module for the merge helpers.
+    from .cache import enrichment_cache_path_for, load_latest_enrichment, partition_enrichment, write_cache
+    from .enrich import chunked, fetch_batch, merge_fetched, snapshot_payload
+    from .http import build_session, replaying
+    from .metrics import METRICS
+    from .refresh import fetch_day_payload
+    from .scheduler import AdaptiveScheduler
+
+    dates = date_sequence(start, max(1, days))
+    calendar_workers = max(1, min(max_workers, len(dates)))
+    quote_workers = max(1, max_concurrency)
+    calendar_scheduler = AdaptiveScheduler(max_concurrency=calendar_workers)
+    quote_scheduler = AdaptiveScheduler(max_concurrency=quote_workers, rate=0 if replaying() else rate_limit)
+
+    snapshot = {} if force else (load_latest_enrichment() or {})
+    seen: set[str] = set()
+    hits = misses = 0
+    fetched: Dict[str, Any] = {}
+    with METRICS.stage("fetch"), build_session(pool_size=calendar_workers + quote_workers) as session:
+        with ThreadPoolExecutor(calendar_workers, thread_name_prefix="calendar") as calendar_pool, ThreadPoolExecutor(
+            quote_workers, thread_name_prefix="quotes"
+        ) as quote_pool:
+            day_futures = [
+                calendar_pool.submit(fetch_day_payload, session, api_key, current, calendar_scheduler) for current in dates
+            ]
+            quote_futures = []
+            for future in as_completed(day_futures):
+                day = future.result()
+                symbols = sorted({row_symbol(row) for row in day["rows"]} - seen - {""})
+                seen.update(symbols)
+                cached, stale = partition_enrichment(snapshot, symbols, ttl=ttl)
+                hits += len(cached)
+                misses += len(stale)
+                LOGGER.info("%s: %s new symbol(s), %s queued for quotes", day["day"], len(symbols), len(stale))
+                for batch in chunked(stale, batch_size):
+                    quote_futures.append(quote_pool.submit(fetch_batch, session, api_key, batch, quote_scheduler))
+            for future in as_completed(quote_futures):
+                fetched.update(future.result())
+            day_payloads = [future.result() for future in day_futures]
+
+    METRICS.cache("enrichment", hits=hits, misses=misses)
+    for scheduler in (calendar_scheduler, quote_scheduler):
+        METRICS.incr("throttled", scheduler.stats.throttled)
+        METRICS.incr("retries", scheduler.stats.retries)
+    LOGGER.info("Calendar requests: %s", calendar_scheduler.summary())
+    LOGGER.info("Quote requests: %s", quote_scheduler.summary())
+
+    fetched_at = now_sgt().isoformat()
+    snapshot = snapshot_payload(
+        merge_fetched(snapshot.get("tickers", {}), fetched, fetched_at), fetched_at, hits=hits, misses=misses
+    )
+    if fetched:
+        write_cache(enrichment_cache_path_for(now_sgt().date()), snapshot)
+
+    end = dates[-1]
+    payload = {
+        "params": {"start_day": start.isoformat(), "end_day": end.isoformat()},
+        "updated_at": fetched_at,
+        "source": "Yahoo Finance (RapidAPI)",
+        "days": day_payloads,
+    }
+    with METRICS.stage("merge"):
+        changes = merge_quotes(index_rows(day_payloads), snapshot["tickers"])
+    LOGGER.info("Enrichment merge: %s", changes.summary())
+    return payload, snapshot
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    from .enrich import DEFAULT_BATCH_SIZE, DEFAULT_MAX_CONCURRENCY, DEFAULT_RATE_LIMIT, ENRICH_MAX_AGE
+    from .http import add_http_cache_args
+    from .metrics import add_metrics_args
+    from .output import add_output_args
+    from .refresh import DEFAULT_DAYS, DEFAULT_MAX_WORKERS
+
+    parser = argparse.ArgumentParser(description="Earnings pipeline helpers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    runner = sub.add_parser("run", help="Fetch the calendar and quotes in one process and write the frontend JSON once")
+    runner.add_argument("--date", help="Start date YYYY-MM-DD (default: today)")
+    runner.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Number of consecutive days to fetch")
+    runner.add_argument("--api-key", help="RapidAPI key (optional, fallback to RAPIDAPI_KEY env)")
+    runner.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Calendar days fetched concurrently")
+    runner.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Quote requests in flight at once")
+    runner.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="Max quote requests per second (0 disables)")
+    runner.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Tickers per quotes request")
+    runner.add_argument("--ttl-hours", type=float, default=ENRICH_MAX_AGE.total_seconds() / 3600, help="Refetch quotes older than this")
+    runner.add_argument("--force", action="store_true", help="Refetch every quote even if cached")
+    runner.add_argument("--shards", action="store_true", help="Also write per-day shards + manifest")
+    add_http_cache_args(runner)
+    add_output_args(runner)
+    add_metrics_args(runner)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    from .http import configure_from_args
+    from .metrics import configure_metrics_from_args, write_metrics
+    from .output import SHARD_DIR, configure_output_from_args, write_day_shards
+    from .refresh import get_api_key, update_data_client, write_json
+
+    args = parse_args(argv)
+    if args.command == "run":
+        configure_from_args(args)
+        configure_output_from_args(args)
+        configure_metrics_from_args(args, "pipeline")
+        start = parse_start_date(args.date)
+        payload, _ = run_pipeline(
+            get_api_key(args.api_key),
+            start,
+            args.days,
+            max_workers=args.max_workers,
+            max_concurrency=args.max_concurrency,
+            rate_limit=args.rate_limit,
+            batch_size=args.batch_size,
+            ttl=timedelta(hours=args.ttl_hours),
+            force=args.force,
+        )
+        end = parse_start_date(payload["params"]["end_day"])
+        output_path = write_json(payload, start, end)
+        if args.shards:
+            write_day_shards(payload, SHARD_DIR)
+        update_data_client(output_path.name, sharded=args.shards)
+        LOGGER.info("Done. Frontend now references %s", output_path.name)
+        write_metrics()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,100 @@
+"""
+Work ordering and run budgets for enrichment.
+
+``prioritize`` orders tickers so the rows a reader is most likely to look at
+are refreshed first: tickers reporting soonest, then the largest by market cap
+and trading volume in the previous snapshot. ``Budget`` caps a run by wall
+time and/or request count; once it runs out workers stop issuing requests and
+whatever was fetched so far is kept.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .utils import default_start_date
+
+# Tickers with no upcoming report sort after every upcoming one.
+_PAST = 1 << 20
+
+
+def days_until_report(days: Sequence[str], today: date) -> int:
+    """Days from ``today`` to the next report, or ``_PAST`` + days since the last one."""
+    upcoming = [day for day in days if day >= today.isoformat()]
+    if upcoming:
+        return (date.fromisoformat(min(upcoming)) - today).days
+    if days:
+        return _PAST + (today - date.fromisoformat(max(days))).days
+    return 2 * _PAST
+
+
+def priority_key(
+    symbol: str,
+    ticker_dates: Mapping[str, Sequence[str]],
+    previous: Mapping[str, Mapping[str, Any]],
+    today: date,
+) -> Tuple[int, float, float, str]:
+    quote = previous.get(symbol) or {}
+    return (
+        days_until_report(ticker_dates.get(symbol, ()), today),
+        -(quote.get("market_cap") or 0.0),
+        -(quote.get("volume") or 0.0),
+        symbol,
+    )
+
+
+def prioritize(
+    tickers: Iterable[str],
+    ticker_dates: Mapping[str, Sequence[str]] | None = None,
+    previous: Mapping[str, Mapping[str, Any]] | None = None,
+    today: date | None = None,
+) -> List[str]:
+    """Order ``tickers`` by report proximity, then previous market cap and volume."""
+    today = today or default_start_date()
+    ticker_dates = ticker_dates or {}
+    previous = previous or {}
+    return sorted(set(tickers), key=lambda symbol: priority_key(symbol, ticker_dates, previous, today))
+
+
+class Budget:
+    """
+    Thread-safe wall-time / request budget for one run.
+
+    ``take`` reserves one request and returns False once ``deadline`` seconds
+    have passed since construction or ``max_requests`` were already taken.
+    ``None`` disables either limit.
+    """
+
+    def __init__(
+        self,
+        deadline: Optional[float] = None,
+        max_requests: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self.ends_at = clock() + deadline if deadline is not None else None
+        self.max_requests = max_requests
+        self.requests = 0
+        self.reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.reason is None:
+                if self.ends_at is not None and self._clock() >= self.ends_at:
+                    self.reason = "deadline"
+                elif self.max_requests is not None and self.requests >= self.max_requests:
+                    self.reason = "max-requests"
+            if self.reason is not None:
+                return False
+            self.requests += 1
+            return True
+
+    @property
+    def exhausted(self) -> bool:
+        return self.reason is not None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "exhausted": self.reason}
@@ -2,34 +2,68 @@
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import date, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import requests
 
-from .utils import now_sgt, parse_number, parse_start_date
+from .cache import cache_path, index_cache, load_calendar_day, write_calendar_day
+from .extract import extract_fields
+from .http import (
+    API_BASE_URL,
+    add_http_cache_args,
+    build_session,
+    configure_from_args,
+    get_json,
+    rapidapi_headers,
+    replaying,
+    stream_json_rows,
+)
+from .metrics import METRICS, add_metrics_args, configure_metrics_from_args, write_metrics
+from .output import (
+    SHARD_DIR,
+    SHARDED_CLIENT_LINE,
+    add_output_args,
+    configure_output_from_args,
+    link_or_copy,
+    write_day_shards,
+    write_json_outputs,
+)
+from .rows import EarningsRow
+from .scheduler import AdaptiveScheduler
+from .stream import RowStream, walk_rows
+from .utils import date_sequence, now_sgt, parse_start_date
 
 LOGGER = logging.getLogger("app.refresh")
 logging.basicConfig(level=logging.INFO)
 
-API_HOST = "yahoo-finance15.p.rapidapi.com"
-BASE_URL = f"https://{API_HOST}/api/v1/markets/calendar/earnings"
+BASE_URL = f"{API_BASE_URL}/api/v1/markets/calendar/earnings"
 DEFAULT_API_KEY = "f3ba37d23bmsh7f5f08200423752p124129jsn859ceeb7bbd1"
 DATA_DIR = Path("src/data")
 DATA_CLIENT_PATH = Path("src/utils/dataClient.js")
 DEFAULT_DAYS = 1
+DEFAULT_MAX_WORKERS = 4
+NO_EARNINGS_ERROR = "No earnings returned"
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Fetch Yahoo earnings calendar via RapidAPI")
     parser.add_argument("--date", help="Start date YYYY-MM-DD (default: today)")
     parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Number of consecutive days to fetch")
     parser.add_argument("--api-key", help="RapidAPI key (optional, fallback to RAPIDAPI_KEY env)")
-    return parser.parse_args()
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Number of days fetched concurrently")
+    parser.add_argument("--shards", action="store_true", help="Also write per-day shards + manifest and make the frontend load them lazily")
+    parser.add_argument("--force", action="store_true", help="Refetch every day even if its cached copy is still fresh")
+    parser.add_argument("--stream", action="store_true", help="Parse calendar responses incrementally instead of loading each body whole")
+    add_http_cache_args(parser)
+    add_output_args(parser)
+    add_metrics_args(parser)
+    return parser.parse_args(argv)
 
 
 def get_api_key(explicit: str | None = None) -> str:
@@ -39,100 +73,44 @@ def get_api_key(explicit: str | None = None) -> str:
     return key
 
 
-def fetch_day(session: requests.Session, key: str, target_date: date) -> dict:
+def fetch_day(
+    session: requests.Session, key: str, target_date: date, scheduler: AdaptiveScheduler | None = None
+) -> dict:
     params = {"date": target_date.isoformat()}
-    headers = {
-        "x-rapidapi-key": key,
-        "x-rapidapi-host": API_HOST,
-        "accept": "application/json",
-    }
+    headers = rapidapi_headers(key)
     LOGGER.info("Fetching earnings calendar for %s", target_date.isoformat())
-    response = session.get(BASE_URL, params=params, headers=headers, timeout=30)
-    response.raise_for_status()
-    return response.json()
-
-
-def collect_rows(obj: Any) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
+    return get_json(session, BASE_URL, params, headers, timeout=30, scheduler=scheduler)
 
-    def _collect(current: Any) -> None:
-        if isinstance(current, dict):
-            symbol = current.get("symbol") or current.get("ticker")
-            if symbol and not any(isinstance(current.get(k), list) for k in ("data", "earnings")):
-                rows.append(current)
-            else:
-                for value in current.values():
-                    _collect(value)
-        elif isinstance(current, list):
-            for item in current:
-                _collect(item)
 
-    _collect(obj)
-    return rows
+def fetch_day_rows(
+    session: requests.Session, key: str, target_date: date, scheduler: AdaptiveScheduler | None = None
+) -> RowStream:
+    """Like ``fetch_day`` but yield raw rows while the response downloads."""
+    params = {"date": target_date.isoformat()}
+    headers = rapidapi_headers(key)
+    LOGGER.info("Streaming earnings calendar for %s", target_date.isoformat())
+    return stream_json_rows(session, BASE_URL, params, headers, timeout=30, scheduler=scheduler)
 
 
+def collect_rows(obj: Any) -> List[Dict[str, Any]]:
+    return list(walk_rows(obj))
 
 
 def extract_metrics_from_raw(raw: dict) -> Dict[str, Optional[float]]:
-    price = None
-    eps = None
-    revenue = None
-    volume = None
-    market_cap = None
-    pe_ratio = None
-    year_high = None
-    year_low = None
-    price_keys = {"regularmarketprice", "marketprice", "lastprice", "price", "regularmarketpreviousclose"}
-    eps_keys = {"epsestimate", "epsforward", "eps", "earningsestimate", "epsquarterly", "epssurprise"}
-    revenue_keys = {"revenuestimate", "revenueforecast", "totalrevenue", "revenue"}
-    volume_keys = {"volume", "regularmarketvolume", "totalvolume", "sharestraded"}
-    market_cap_keys = {"marketcap", "marketcapitalization", "marketcapitalest", "marketcapital"}
-    pe_keys = {"peratio", "trailingpe", "forwardpe", "pe"}
-    high_keys = {"fiftytwoweekhigh", "52weekhigh", "week52high", "fiftytwo_weekhigh", "fiftytwo_weekhi"}
-    low_keys = {"fiftytwoweeklow", "52weeklow", "week52low", "fiftytwo_weeklow", "fiftytwo_weeklo"}
-
-    def flatten(obj):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                yield k, v
-                yield from flatten(v)
-        elif isinstance(obj, list):
-            for item in obj:
-                yield from flatten(item)
-
-    for key, value in flatten(raw):
-        if not isinstance(key, str):
-            continue
-        normalized = key.lower()
-        if price is None and (normalized in price_keys or "price" in normalized):
-            price = parse_number(value)
-        elif eps is None and (normalized in eps_keys or "eps" in normalized):
-            eps = parse_number(value)
-        elif revenue is None and (normalized in revenue_keys or "revenue" in normalized):
-            revenue = parse_number(value)
-        elif volume is None and (normalized in volume_keys or "volume" in normalized):
-            volume = parse_number(value)
-        elif market_cap is None and (normalized in market_cap_keys or "marketcap" in normalized):
-            market_cap = parse_number(value)
-        elif pe_ratio is None and (normalized in pe_keys or ("pe" in normalized and "peg" not in normalized)):
-            pe_ratio = parse_number(value)
-        elif year_high is None and (normalized in high_keys or ("high" in normalized and "52" in normalized)):
-            year_high = parse_number(value)
-        elif year_low is None and (normalized in low_keys or ("low" in normalized and "52" in normalized)):
-            year_low = parse_number(value)
-
+    fields = extract_fields(raw)
     return {
-        "stockPrice": price,
-        "epsEstimate": eps,
-        "revenueEstimate": revenue,
-        "tradingVolume": volume,
-        "marketCap": market_cap,
-        "peRatio": pe_ratio,
-        "yearHigh": year_high,
-        "yearLow": year_low,
+        "stockPrice": fields["price"],
+        "epsEstimate": fields["eps_estimate"],
+        "revenueEstimate": fields["revenue_estimate"],
+        "tradingVolume": fields["volume"],
+        "marketCap": fields["market_cap"],
+        "peRatio": fields["pe_ratio"],
+        "yearHigh": fields["year_high"],
+        "yearLow": fields["year_low"],
     }
 
-def transform_row(raw: Dict[str, Any], fallback_time: str | None = None) -> Dict[str, Any]:
+
+def transform_row(raw: Dict[str, Any], fallback_time: str | None = None) -> EarningsRow:
     symbol = (raw.get("symbol") or raw.get("ticker") or raw.get("instrument") or "").strip().upper()
     company = raw.get("company") or raw.get("companyshortname") or raw.get("name") or symbol
     eps_estimate = raw.get("epsestimate") or raw.get("epsEstimate")
@@ -146,68 +124,176 @@ def transform_row(raw: Dict[str, Any], fallback_time: str | None = None) -> Dict
     time_field = raw.get("time") or raw.get("starttime") or raw.get("startdatetimetype") or fallback_time or "-"
     metrics = extract_metrics_from_raw(raw)
 
-    return {
-        "symbol": symbol,
-        "company": company,
-        "eps_estimate": eps_estimate,
-        "eps_reported": eps_reported,
-        "surprise_pct": surprise_pct,
-        "time": time_field,
-        "quote_url": f"https://finance.yahoo.com/quote/{symbol}/" if symbol else None,
-        "epsEstimate": metrics["epsEstimate"],
-        "revenueEstimate": metrics["revenueEstimate"],
-        "stockPrice": metrics["stockPrice"],
-        "tradingVolume": metrics["tradingVolume"],
-        "marketCap": metrics["marketCap"],
-        "peRatio": metrics["peRatio"],
-        "yearHigh": metrics["yearHigh"],
-        "yearLow": metrics["yearLow"],
-    }
+    return EarningsRow(
+        symbol=symbol,
+        company=company,
+        eps_estimate=eps_estimate,
+        eps_reported=eps_reported,
+        surprise_pct=surprise_pct,
+        time=time_field,
+        quote_url=f"https://finance.yahoo.com/quote/{symbol}/" if symbol else None,
+        epsEstimate=metrics["epsEstimate"],
+        revenueEstimate=metrics["revenueEstimate"],
+        stockPrice=metrics["stockPrice"],
+        tradingVolume=metrics["tradingVolume"],
+        marketCap=metrics["marketCap"],
+        peRatio=metrics["peRatio"],
+        yearHigh=metrics["yearHigh"],
+        yearLow=metrics["yearLow"],
+    )
 
 
-def build_day_payload(target_date: date, raw_payload: dict) -> Dict[str, Any]:
-    rows = collect_rows(raw_payload)
-    transformed = [transform_row(item, raw_payload.get("time")) for item in rows]
+def build_day_payload(target_date: date, raw_payload: dict | RowStream) -> Dict[str, Any]:
+    """
+    Transform one day's response; a ``RowStream`` is consumed row by row so
+    only the transformed rows are kept.
+    """
+    with METRICS.stage("transform"):
+        if isinstance(raw_payload, RowStream):
+            root = raw_payload.root
+            transformed = [transform_row(item, root.get("time")) for item in raw_payload]
+        else:
+            transformed = [transform_row(item, raw_payload.get("time")) for item in walk_rows(raw_payload)]
+    METRICS.incr("rows", len(transformed))
     return {
         "day": target_date.isoformat(),
         "url": f"https://finance.yahoo.com/calendar/earnings?day={target_date.isoformat()}",
         "count": len(transformed),
         "rows": transformed,
-        "error": None if transformed else "No earnings returned",
+        "error": None if transformed else NO_EARNINGS_ERROR,
     }
 
 
+def error_day_payload(target_date: date, error: str) -> Dict[str, Any]:
+    return {
+        "day": target_date.isoformat(),
+        "url": f"https://finance.yahoo.com/calendar/earnings?day={target_date.isoformat()}",
+        "count": 0,
+        "rows": [],
+        "error": error,
+    }
+
+
+def fetch_day_payload(
+    session: requests.Session,
+    key: str,
+    target_date: date,
+    scheduler: AdaptiveScheduler | None = None,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """Fetch and transform one day, capturing any failure in the day's ``error`` field."""
+    try:
+        fetch = fetch_day_rows if stream else fetch_day
+        raw = fetch(session, key, target_date, scheduler)
+        return build_day_payload(target_date, raw)
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.exception("Failed to fetch %s: %s", target_date, exc)
+        return error_day_payload(target_date, str(exc))
+
+
+def fetch_window(
+    key: str,
+    start: date,
+    days: int,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: requests.Session | None = None,
+    scheduler: AdaptiveScheduler | None = None,
+    stream: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch ``days`` consecutive days concurrently, returning payloads in date order.
+
+    Long-running callers pass their own warm ``session`` and ``scheduler``.
+    With ``stream`` each response is parsed incrementally (see ``fetch_day_rows``).
+    """
+    return fetch_days(key, date_sequence(start, days), max_workers, session, scheduler, stream)
+
+
+def fetch_days(
+    key: str,
+    dates: List[date],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: requests.Session | None = None,
+    scheduler: AdaptiveScheduler | None = None,
+    stream: bool = False,
+) -> List[Dict[str, Any]]:
+    """Fetch arbitrary ``dates`` concurrently, returning payloads in the given order."""
+    if not dates:
+        return []
+    workers = max(1, min(max_workers, len(dates)))
+    scheduler = scheduler or AdaptiveScheduler(max_concurrency=workers)
+    throttled, retries = scheduler.stats.throttled, scheduler.stats.retries
+    owned = build_session(pool_size=workers) if session is None else nullcontext(session)
+    with METRICS.stage("fetch"), owned as session:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            payloads = list(executor.map(lambda current: fetch_day_payload(session, key, current, scheduler, stream), dates))
+    METRICS.incr("throttled", scheduler.stats.throttled - throttled)
+    METRICS.incr("retries", scheduler.stats.retries - retries)
+    LOGGER.info("Calendar requests: %s", scheduler.summary())
+    return payloads
+
+
+def fetch_window_cached(
+    key: str,
+    start: date,
+    days: int,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    stream: bool = False,
+    force: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Like ``fetch_window`` but serve days from the per-day calendar cache.
+
+    Only days whose cache entry is missing or expired (see
+    ``cache.calendar_day_ttl``) hit the network; successful fetches, including
+    days with no earnings, are written back to the cache. Replay runs bypass
+    it so recorded responses are what gets exercised.
+    """
+    if replaying():
+        return fetch_window(key, start, days, max_workers, stream=stream)
+    dates = date_sequence(start, days)
+    cached = {} if force else {current: load_calendar_day(current) for current in dates}
+    stale = [current for current in dates if cached.get(current) is None]
+    METRICS.cache("calendar_days", hits=len(dates) - len(stale), misses=len(stale))
+    LOGGER.info("Calendar days: %s cached, %s to fetch", len(dates) - len(stale), len(stale))
+
+    fetched_at = now_sgt()
+    for current, day in zip(stale, fetch_days(key, stale, max_workers, stream=stream)):
+        if day["error"] in (None, NO_EARNINGS_ERROR):
+            write_calendar_day(current, day, fetched_at)
+        cached[current] = day
+    return [cached[current] for current in dates]
+
+
 def write_json(payload: dict, start: date, end: date) -> Path:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
     if start == end:
         filename = f"earnings_data_{start.isoformat()}.json"
     else:
         filename = f"earnings_data_{start.isoformat()}_{end.isoformat()}.json"
     output_path = DATA_DIR / filename
-    serialized = json.dumps(payload, ensure_ascii=False, indent=2)
-    output_path.write_text(serialized, encoding="utf-8")
-    LOGGER.info("Wrote %s", output_path)
 
     # For compatibility, also update canonical file
-    canonical = DATA_DIR / "earnings_data.json"
-    canonical.write_text(serialized, encoding="utf-8")
-    LOGGER.info("Updated %s", canonical)
-
-    # Persist a copy under cache for historical reference
-    cache_dir = Path("cache")
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_file = cache_dir / filename
-    cache_file.write_text(serialized, encoding="utf-8")
+    write_json_outputs(payload, output_path, mirrors=[DATA_DIR / "earnings_data.json"])
+
+    # Persist a copy under cache for historical reference, named so that
+    # app.generate and the ticker index pick it up.
+    cache_file = cache_path(start.isoformat(), end.isoformat())
+    link_or_copy(output_path, cache_file)
+    index_cache(cache_file, payload)
     LOGGER.info("Wrote cache copy %s", cache_file)
 
     return output_path
 
 
-def update_data_client(target_filename: str) -> None:
+def update_data_client(target_filename: str, sharded: bool = False) -> None:
     if not DATA_CLIENT_PATH.exists():
         return
     lines = DATA_CLIENT_PATH.read_text(encoding="utf-8").splitlines()
-    import_line = f'import earningsData from "../data/{target_filename}";'
+    if sharded:
+        import_line = SHARDED_CLIENT_LINE
+        target_filename = f"{SHARD_DIR.name}/manifest.json"
+    else:
+        import_line = f'import earningsData from "../data/{target_filename}";'
     if lines:
         lines[0] = import_line
     else:
@@ -216,30 +302,19 @@ def update_data_client(target_filename: str) -> None:
     LOGGER.info("Updated %s to reference %s", DATA_CLIENT_PATH, target_filename)
 
 
-def main() -> None:
-    args = parse_args()
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    configure_from_args(args)
+    configure_output_from_args(args)
+    configure_metrics_from_args(args, "refresh")
     api_key = get_api_key(args.api_key)
     start_date = parse_start_date(args.date)
     window_days = max(1, args.days)
     end_date = start_date + timedelta(days=window_days - 1)
 
-    days_payload = []
-    with requests.Session() as session:
-        for offset in range(window_days):
-            current_date = start_date + timedelta(days=offset)
-            try:
-                raw = fetch_day(session, api_key, current_date)
-                day_payload = build_day_payload(current_date, raw)
-            except Exception as exc:  # noqa: BLE001
-                LOGGER.exception("Failed to fetch %s: %s", current_date, exc)
-                day_payload = {
-                    "day": current_date.isoformat(),
-                    "url": f"https://finance.yahoo.com/calendar/earnings?day={current_date.isoformat()}",
-                    "count": 0,
-                    "rows": [],
-                    "error": str(exc),
-                }
-            days_payload.append(day_payload)
+    days_payload = fetch_window_cached(
+        api_key, start_date, window_days, max_workers=args.max_workers, stream=args.stream, force=args.force
+    )
 
     payload = {
         "params": {"start_day": start_date.isoformat(), "end_day": end_date.isoformat()},
@@ -249,8 +324,11 @@ def main() -> None:
     }
 
     output_path = write_json(payload, start_date, end_date)
-    update_data_client(output_path.name)
+    if args.shards:
+        write_day_shards(payload, SHARD_DIR)
+    update_data_client(output_path.name, sharded=args.shards)
     LOGGER.info("Done. Frontend now references %s", output_path.name)
+    write_metrics()
 
 
 if __name__ == "__main__":  # pragma: no cover
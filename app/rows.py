@@ -0,0 +1,132 @@
+"""
+The earnings row record shared by refresh, the enrichment merge and generate.
+
+``EarningsRow`` is a slotted dataclass holding exactly the frontend row schema
+(``ROW_FIELDS``, in the order the JSON is written). ``refresh.transform_row``
+builds one per calendar entry; rows loaded back from cached JSON are converted
+with ``EarningsRow.from_dict``. Keys outside the schema (e.g. ``ticker`` or the
+raw ``stock_price`` strings of old caches) are kept in ``extra`` and written
+after the schema fields.
+
+Readers that still treat rows as mappings (``row.get("symbol")``,
+``row["stockPrice"]``) keep working. Payloads holding rows are serialized
+through ``json_default``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from .utils import parse_number
+
+# Raw calendar strings, in the order ``refresh.transform_row`` emits them.
+TEXT_FIELDS: Tuple[str, ...] = ("symbol", "company", "eps_estimate", "eps_reported", "surprise_pct", "time", "quote_url")
+# Parsed floats, merged from quotes by ``pipeline.merge_quotes``.
+NUMERIC_FIELDS: Tuple[str, ...] = (
+    "epsEstimate",
+    "revenueEstimate",
+    "stockPrice",
+    "tradingVolume",
+    "marketCap",
+    "peRatio",
+    "yearHigh",
+    "yearLow",
+)
+ROW_FIELDS = TEXT_FIELDS + NUMERIC_FIELDS
+# (frontend row key, raw string key) pairs filled when a cached row lacks the key.
+NORMALIZE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("epsEstimate", "eps_estimate"),
+    ("revenueEstimate", "revenue_estimate"),
+    ("stockPrice", "stock_price"),
+)
+
+_FIELD_SET = frozenset(ROW_FIELDS)
+_values = attrgetter(*ROW_FIELDS)
+
+
+@dataclass(slots=True)
+class EarningsRow:
+    """One frontend earnings row; field names are the JSON keys."""
+
+    symbol: Optional[str] = None
+    company: Any = None
+    eps_estimate: Any = None
+    eps_reported: Any = None
+    surprise_pct: Any = None
+    time: Any = None
+    quote_url: Optional[str] = None
+    epsEstimate: Optional[float] = None
+    revenueEstimate: Optional[float] = None
+    stockPrice: Optional[float] = None
+    tradingVolume: Optional[float] = None
+    marketCap: Optional[float] = None
+    peRatio: Optional[float] = None
+    yearHigh: Optional[float] = None
+    yearLow: Optional[float] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, row: Mapping[str, Any]) -> "EarningsRow":
+        """
+        Build a record from a cached JSON row.
+
+        Absent ``NORMALIZE_FIELDS`` targets are parsed from their raw strings;
+        other absent fields are None.
+        """
+        record = cls(*map(row.get, ROW_FIELDS))
+        if row.keys() == _FIELD_SET:
+            return record
+        for target, source in NORMALIZE_FIELDS:
+            if target not in row:
+                setattr(record, target, parse_number(row.get(source)))
+        extra = {key: value for key, value in row.items() if key not in _FIELD_SET}
+        if extra:
+            record.extra = extra
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The JSON object for this row: schema fields in order, then ``extra``."""
+        row = dict(zip(ROW_FIELDS, _values(self)))
+        if self.extra:
+            row.update(self.extra)
+        return row
+
+    # Read-only mapping access for code that handles cached dict rows too.
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELD_SET or bool(self.extra and key in self.extra)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from ROW_FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(ROW_FIELDS) + len(self.extra or ())
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+
+def as_record(row: Mapping[str, Any] | EarningsRow) -> EarningsRow:
+    return row if row.__class__ is EarningsRow else EarningsRow.from_dict(row)
+
+
+def json_default(value: Any) -> Any:
+    """``default=`` hook for ``json.dumps``: rows become their JSON objects."""
+    if value.__class__ is EarningsRow:
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
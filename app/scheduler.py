@@ -0,0 +1,280 @@
+"""
+Adaptive request scheduler shared by the RapidAPI jobs.
+
+``AdaptiveScheduler.run`` wraps one request attempt and takes care of:
+
+* retries with jittered exponential backoff for transient failures (5xx,
+  connection errors, timeouts);
+* 429 handling: every worker pauses until ``Retry-After`` (or the RapidAPI
+  rate-limit reset) has passed before the request is retried. A requested
+  wait longer than ``max_wait`` (e.g. a monthly quota reset days away) is not
+  waited out: the scheduler fails fast with ``QuotaExhaustedError`` instead;
+* AIMD concurrency: the number of requests allowed in flight grows additively
+  while responses succeed and is cut multiplicatively on each throttling
+  episode, so the jobs settle near the highest rate the plan tier sustains.
+
+The scheduler is transport-agnostic; ``app.http.get_json`` adapts it to requests.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Mapping, Optional, TypeVar
+
+from .utils import RateLimiter
+
+LOGGER = logging.getLogger("app.scheduler")
+
+T = TypeVar("T")
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_CAP = 30.0
+DEFAULT_THROTTLE_PAUSE = 1.0
+DEFAULT_MAX_WAIT = 60.0  # longest server-requested pause honoured, seconds
+
+
+class TransientError(Exception):
+    """A failure worth retrying after a backoff (5xx, connection reset, timeout)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ThrottledError(TransientError):
+    """The API answered 429; ``retry_after`` is the server-requested pause in seconds."""
+
+
+class QuotaExhaustedError(Exception):
+    """The server asked for a pause longer than ``max_wait``; not retried."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _header(headers: Mapping[str, Any], name: str) -> Optional[str]:
+    value = headers.get(name)
+    if value is None:
+        lowered = name.lower()
+        for key, candidate in headers.items():
+            if key.lower() == lowered:
+                return candidate
+    return value
+
+
+def retry_after_seconds(headers: Mapping[str, Any], now: Optional[datetime] = None) -> Optional[float]:
+    """Parse ``Retry-After`` as delta-seconds or an HTTP date."""
+    value = _header(headers, "Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+def rate_limit_pause(headers: Mapping[str, Any]) -> Optional[float]:
+    """Seconds to wait when RapidAPI reports the request quota is exhausted."""
+    remaining = _header(headers, "X-RateLimit-Requests-Remaining")
+    if remaining is None:
+        return None
+    try:
+        if int(float(remaining)) > 0:
+            return None
+        reset = _header(headers, "X-RateLimit-Requests-Reset")
+        return max(0.0, float(reset)) if reset is not None else DEFAULT_THROTTLE_PAUSE
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class SchedulerStats:
+    requests: int = 0
+    succeeded: int = 0
+    throttled: int = 0
+    retries: int = 0
+    failures: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "succeeded": self.succeeded,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+
+class AdaptiveScheduler:
+    """Thread-safe AIMD limiter + retry loop; share one instance across a job's workers."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        rate: float = 0.0,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_cap: float = DEFAULT_BACKOFF_CAP,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_wait = max_wait
+        self.increase = increase
+        self.decrease = decrease
+        self.stats = SchedulerStats()
+        self._limiter = RateLimiter(rate, clock=clock, sleep=sleep)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._cond = threading.Condition()
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._exhausted_until = 0.0
+        self._last_decrease = float("-inf")
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(self.min_concurrency, int(self._limit))
+
+    @property
+    def exhausted(self) -> bool:
+        """True while a pause longer than ``max_wait`` is in force (requests fail fast)."""
+        return self._clock() < self._exhausted_until
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold every new request for ``seconds`` (extends, never shortens, a pause).
+
+        A pause longer than ``max_wait`` marks the scheduler exhausted instead,
+        so new requests raise ``QuotaExhaustedError`` until it has passed.
+        """
+        with self._cond:
+            self._pause(seconds)
+            self._cond.notify_all()
+
+    def _pause(self, seconds: float) -> None:
+        now = self._clock()
+        if seconds > self.max_wait:
+            if now >= self._exhausted_until:
+                LOGGER.warning("Server asked to wait %.0fs (over max_wait %.0fs); failing fast", seconds, self.max_wait)
+            self._exhausted_until = max(self._exhausted_until, now + seconds)
+        else:
+            self._paused_until = max(self._paused_until, now + seconds)
+
+    def _check_exhausted(self) -> None:
+        remaining = self._exhausted_until - self._clock()
+        if remaining > 0:
+            raise QuotaExhaustedError(f"Request quota exhausted; resets in {remaining:.0f}s", remaining)
+
+    def _acquire(self) -> None:
+        with self._cond:
+            while True:
+                self._check_exhausted()
+                wait = self._paused_until - self._clock()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                if self._in_flight < self.concurrency_limit:
+                    break
+                self._cond.wait()
+            self._in_flight += 1
+            self.stats.requests += 1
+        self._limiter.acquire()
+
+    def _release(self, outcome: str, retry_after: Optional[float] = None) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            now = self._clock()
+            if outcome == "ok":
+                self.stats.succeeded += 1
+                self._limit = min(self.max_concurrency, self._limit + self.increase / max(self._limit, 1.0))
+            elif outcome == "throttled":
+                self.stats.throttled += 1
+                pause = DEFAULT_THROTTLE_PAUSE if retry_after is None else retry_after
+                # One multiplicative cut per throttling episode, not per 429 in flight.
+                if now - self._last_decrease >= min(pause, self.max_wait):
+                    self._limit = max(self.min_concurrency, self._limit * self.decrease)
+                    self._last_decrease = now
+                    LOGGER.info("Throttled; concurrency limit now %s", self.concurrency_limit)
+                self._pause(pause)
+            self._cond.notify_all()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Jittered delay before retry number ``attempt`` (0-based)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_wait) + self._rng.uniform(0, self.backoff_base)
+        ceiling = min(self.backoff_cap, self.backoff_base * (2**attempt))
+        return self._rng.uniform(ceiling / 2, ceiling)
+
+    def run(self, attempt: Callable[[], T]) -> T:
+        """
+        Call ``attempt`` under the concurrency/rate limits, retrying transient failures.
+
+        Raises ``QuotaExhaustedError`` without calling ``attempt`` while the
+        scheduler is exhausted.
+        """
+        for number in range(self.max_retries + 1):
+            self._acquire()
+            try:
+                result = attempt()
+            except ThrottledError as exc:
+                self._release("throttled", exc.retry_after)
+                error: TransientError = exc
+                delay = 0.0  # the shared pause already covers the wait
+            except TransientError as exc:
+                self._release("error")
+                error = exc
+                delay = self.backoff(number, exc.retry_after)
+            except BaseException:
+                self._release("error")
+                raise
+            else:
+                self._release("ok")
+                return result
+
+            if number == self.max_retries:
+                break
+            if self.exhausted:
+                with self._cond:
+                    self.stats.failures += 1
+                self._check_exhausted()
+            with self._cond:
+                self.stats.retries += 1
+            LOGGER.debug("Retrying after %s (attempt %s/%s)", error, number + 1, self.max_retries)
+            if delay > 0:
+                self._sleep(delay)
+
+        with self._cond:
+            self.stats.failures += 1
+        raise error
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (
+            f"{stats.requests} request(s), {stats.throttled} throttled, {stats.retries} retried, "
+            f"{stats.failures} failed, concurrency limit {self.concurrency_limit}/{self.max_concurrency}"
+        )
@@ -0,0 +1,270 @@
+"""
+Long-running daemon that keeps the calendar and quotes fresh.
+
+    python -m app.serve --days 14 --calendar-interval 60 --quotes-interval 5 --quotes-interval-closed 60
+
+One warm pooled session and one adaptive scheduler per endpoint serve every
+cycle, and the calendar window and ticker map stay in memory, so a cycle costs
+only its network time. Quotes are polled on the shorter interval while US
+markets are open. Output is rewritten only when the merged payload changed.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import signal
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+from .cache import enrichment_cache_path_for, load_latest_enrichment, partition_enrichment, write_cache
+from .enrich import DEFAULT_BATCH_SIZE, DEFAULT_MAX_CONCURRENCY, DEFAULT_RATE_LIMIT, fetch_quotes, snapshot_payload
+from .http import add_http_cache_args, build_session, configure_from_args, replaying
+from .metrics import METRICS, add_metrics_args, configure_metrics_from_args, write_metrics
+from .output import SHARD_DIR, add_output_args, configure_output_from_args, write_day_shards
+from .pipeline import augment_rows
+from .refresh import DEFAULT_MAX_WORKERS, fetch_window, get_api_key, update_data_client, write_json
+from .rows import EarningsRow
+from .scheduler import AdaptiveScheduler
+from .utils import default_start_date, now_sgt, us_market_open
+
+LOGGER = logging.getLogger("app.serve")
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_DAYS = 14
+DEFAULT_CALENDAR_INTERVAL = 60  # minutes
+DEFAULT_QUOTES_INTERVAL = 5  # minutes, while US markets are open
+DEFAULT_QUOTES_INTERVAL_CLOSED = 60  # minutes, otherwise
+
+
+def days_digest(days: list[dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(days, sort_keys=True, default=_digest_default).encode("utf-8")).hexdigest()
+
+
+def _digest_default(value: Any) -> Any:
+    return value.to_dict() if isinstance(value, EarningsRow) else str(value)
+
+
+class EarningsDaemon:
+    """Holds the warm session, schedulers and in-memory state between poll cycles."""
+
+    def __init__(
+        self,
+        api_key: str,
+        days: int = DEFAULT_DAYS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        calendar_interval: timedelta = timedelta(minutes=DEFAULT_CALENDAR_INTERVAL),
+        quotes_interval: timedelta = timedelta(minutes=DEFAULT_QUOTES_INTERVAL),
+        quotes_interval_closed: timedelta = timedelta(minutes=DEFAULT_QUOTES_INTERVAL_CLOSED),
+        shards: bool = False,
+    ) -> None:
+        self.api_key = api_key
+        self.days = max(1, days)
+        self.max_workers = max(1, max_workers)
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limit = 0 if replaying() else rate_limit
+        self.batch_size = batch_size
+        self.calendar_interval = calendar_interval
+        self.quotes_interval_open = quotes_interval
+        self.quotes_interval_closed = quotes_interval_closed
+        self.shards = shards
+
+        self.session = build_session(pool_size=max(self.max_workers, self.max_concurrency))
+        self.calendar_scheduler = AdaptiveScheduler(max_concurrency=self.max_workers)
+        self.quote_scheduler = AdaptiveScheduler(max_concurrency=self.max_concurrency, rate=self.rate_limit)
+
+        self.calendar: Optional[Dict[str, Any]] = None
+        self.window: Optional[tuple[date, date]] = None
+        self.ticker_map: Dict[str, Dict[str, Any]] = dict((load_latest_enrichment() or {}).get("tickers", {}))
+        self.next_calendar = 0.0
+        self.next_quotes = 0.0
+        self._published_digest: Optional[str] = None
+        self._client_target: Optional[str] = None
+        self._stop = threading.Event()
+
+    def quotes_interval(self) -> timedelta:
+        return self.quotes_interval_open if us_market_open() else self.quotes_interval_closed
+
+    def refresh_calendar(self) -> bool:
+        """Refetch the rolling window; return True when any day's rows changed."""
+        start = default_start_date()
+        end = start + timedelta(days=self.days - 1)
+        days = fetch_window(
+            self.api_key, start, self.days, self.max_workers, session=self.session, scheduler=self.calendar_scheduler
+        )
+        if self.calendar is not None:
+            # Keep the last good copy of a day whose fetch failed this time.
+            previous = {day["day"]: day for day in self.calendar["days"]}
+            days = [previous.get(day["day"], day) if day.get("error") else day for day in days]
+
+        changed = self.calendar is None or self.window != (start, end) or days_digest(days) != days_digest(self.calendar["days"])
+        self.window = (start, end)
+        self.calendar = {
+            "params": {"start_day": start.isoformat(), "end_day": end.isoformat()},
+            "updated_at": now_sgt().isoformat(),
+            "source": "Yahoo Finance (RapidAPI)",
+            "days": days,
+        }
+        LOGGER.info("Calendar %s..%s refreshed (%s)", start, end, "changed" if changed else "unchanged")
+        return changed
+
+    def refresh_quotes(self) -> bool:
+        """Refetch quotes older than the current interval; return True when any value changed."""
+        if self.calendar is None:
+            return False
+        tickers = sorted(
+            {
+                (row.get("symbol") or "").strip().upper()
+                for day in self.calendar["days"]
+                for row in day.get("rows", [])
+                if row.get("symbol")
+            }
+        )
+        # fetched_at is stamped when a fetch finishes, so allow some slack or
+        # quotes would only be refetched every other poll.
+        ttl = self.quotes_interval() * 0.9
+        cached, stale = partition_enrichment({"tickers": self.ticker_map}, tickers, ttl=ttl)
+        METRICS.cache("enrichment", hits=len(cached), misses=len(stale))
+        if not stale:
+            return False
+
+        fetched = fetch_quotes(
+            stale,
+            self.api_key,
+            max_concurrency=self.max_concurrency,
+            rate_limit=self.rate_limit,
+            batch_size=self.batch_size,
+            session=self.session,
+            scheduler=self.quote_scheduler,
+        )
+        fetched_at = now_sgt().isoformat()
+        changed = 0
+        for symbol, metrics in fetched.items():
+            if not any(value is not None for value in metrics.values()):
+                continue
+            previous = {key: value for key, value in self.ticker_map.get(symbol, {}).items() if key != "fetched_at"}
+            changed += previous != metrics
+            self.ticker_map[symbol] = {**metrics, "fetched_at": fetched_at}
+        LOGGER.info("Quotes: %s fetched, %s changed", len(fetched), changed)
+        if changed:
+            write_cache(
+                enrichment_cache_path_for(now_sgt().date()),
+                snapshot_payload(self.ticker_map, fetched_at, hits=len(cached), misses=len(stale)),
+            )
+        return bool(changed)
+
+    def publish(self) -> bool:
+        """Write the merged frontend payload unless it matches the last one written."""
+        if self.calendar is None or self.window is None:
+            return False
+        payload = copy.deepcopy(self.calendar)
+        augment_rows(payload["days"], self.ticker_map)
+        digest = days_digest(payload["days"])
+        if digest == self._published_digest:
+            LOGGER.info("Payload unchanged; skipping write")
+            return False
+
+        output_path = write_json(payload, *self.window)
+        if self.shards:
+            write_day_shards(payload, SHARD_DIR)
+        if output_path.name != self._client_target:
+            update_data_client(output_path.name, sharded=self.shards)
+            self._client_target = output_path.name
+        self._published_digest = digest
+        return True
+
+    def run_once(self) -> None:
+        """
+        Run whichever polls are due, then publish.
+
+        ``publish`` compares the payload digest with the last one written, so
+        a change whose write failed in an earlier cycle is still published.
+        """
+        METRICS.reset("serve")
+        now = time.monotonic()
+        polled = False
+        if now >= self.next_calendar:
+            self.refresh_calendar()
+            self.next_calendar = now + self.calendar_interval.total_seconds()
+            polled = True
+        if now >= self.next_quotes:
+            self.refresh_quotes()
+            self.next_quotes = now + self.quotes_interval().total_seconds()
+            polled = True
+        if polled:
+            self.publish()
+        write_metrics()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:  # noqa: BLE001 - a bad cycle must not kill the daemon
+                LOGGER.exception("Poll cycle failed")
+            wait = max(0.0, min(self.next_calendar, self.next_quotes) - time.monotonic())
+            LOGGER.info("Next poll in %.0fs", wait)
+            self._stop.wait(wait)
+        self.session.close()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Keep the earnings calendar and quotes fresh in a long-running process")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Rolling window length starting today")
+    parser.add_argument("--api-key", help="RapidAPI key (optional, fallback to RAPIDAPI_KEY env)")
+    parser.add_argument("--calendar-interval", type=float, default=DEFAULT_CALENDAR_INTERVAL, help="Minutes between calendar polls")
+    parser.add_argument("--quotes-interval", type=float, default=DEFAULT_QUOTES_INTERVAL, help="Minutes between quote polls during US market hours")
+    parser.add_argument("--quotes-interval-closed", type=float, default=DEFAULT_QUOTES_INTERVAL_CLOSED, help="Minutes between quote polls outside market hours")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Calendar days fetched concurrently")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Quote requests in flight at once")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT, help="Max quote requests per second (0 disables)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Tickers per quotes request")
+    parser.add_argument("--shards", action="store_true", help="Also write per-day shards + manifest")
+    parser.add_argument("--once", action="store_true", help="Run a single poll cycle and exit")
+    add_http_cache_args(parser)
+    add_output_args(parser)
+    add_metrics_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    configure_from_args(args)
+    configure_output_from_args(args)
+    configure_metrics_from_args(args, "serve")
+    daemon = EarningsDaemon(
+        get_api_key(args.api_key),
+        days=args.days,
+        max_workers=args.max_workers,
+        max_concurrency=args.max_concurrency,
+        rate_limit=args.rate_limit,
+        batch_size=args.batch_size,
+        calendar_interval=timedelta(minutes=args.calendar_interval),
+        quotes_interval=timedelta(minutes=args.quotes_interval),
+        quotes_interval_closed=timedelta(minutes=args.quotes_interval_closed),
+        shards=args.shards,
+    )
+    if args.once:
+        daemon.run_once()
+        daemon.session.close()
+        return
+
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+    LOGGER.info("Stopped")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
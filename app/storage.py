@@ -0,0 +1,338 @@
+"""
+Pluggable storage backends behind the ``app.cache`` helpers.
+
+The default ``json`` backend is the original one-file-per-payload layout under
+``cache/``. The ``sqlite`` backend keeps writing those files (the frontend and
+file-based tools still read them) but also indexes every payload into
+``cache/earnings.sqlite3``: calendar rows by day and symbol, and enrichment
+quotes by symbol and fetch time, so lookups become indexed reads.
+
+Select the backend with ``EARNINGS_STORAGE=sqlite`` and import existing caches
+with ``python -m app.storage import``.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Protocol
+
+from . import codec
+from .output import atomic_write_bytes, serialize
+from .utils import SINGAPORE_TZ, now_sgt
+
+LOGGER = logging.getLogger("app.storage")
+
+DB_NAME = "earnings.sqlite3"
+QUERY_CHUNK = 500  # bound parameters per IN (...) query
+CALENDAR_PREFIXES = ("yahoo_earnings_", "earnings_data_")
+ENRICH_PREFIX = "yahoo_enriched_"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    written_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_kind ON documents (kind, name);
+CREATE TABLE IF NOT EXISTS calendar_rows (
+    document TEXT NOT NULL,
+    day TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (document, day, position)
+);
+CREATE INDEX IF NOT EXISTS calendar_rows_day_symbol ON calendar_rows (day, symbol);
+CREATE INDEX IF NOT EXISTS calendar_rows_symbol_day ON calendar_rows (symbol, day);
+CREATE TABLE IF NOT EXISTS calendar_days (
+    day TEXT PRIMARY KEY,
+    document TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS enrichment (
+    symbol TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    document TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    PRIMARY KEY (symbol, fetched_at)
+);
+"""
+# Indexes written before the files became the source of truth kept a full
+# JSON copy in ``documents.body``; it is dropped on open.
+DROP_DOCUMENT_BODIES = """
+CREATE TABLE documents_new (name TEXT PRIMARY KEY, kind TEXT NOT NULL, written_at TEXT NOT NULL);
+INSERT INTO documents_new SELECT name, kind, written_at FROM documents;
+DROP TABLE documents;
+ALTER TABLE documents_new RENAME TO documents;
+CREATE INDEX IF NOT EXISTS documents_kind ON documents (kind, name);
+"""
+
+
+def document_kind(name: str) -> str:
+    if name.startswith(ENRICH_PREFIX):
+        return "enrichment"
+    if name.startswith(CALENDAR_PREFIXES):
+        return "calendar"
+    return "document"
+
+
+def has_metrics(entry: Mapping[str, Any]) -> bool:
+    """True unless every quote value is None (a failed lookup)."""
+    return any(value is not None for key, value in entry.items() if key != "fetched_at")
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    return codec.load_path(path)
+
+
+class StorageBackend(Protocol):
+    cache_dir: Path
+
+    def load(self, path: Path) -> dict[str, Any] | None: ...
+
+    def write(self, path: Path, payload: Mapping[str, Any]) -> None: ...
+
+    def index(self, path: Path, payload: Mapping[str, Any]) -> None: ...
+
+    def latest_enrichment_path(self) -> Path | None: ...
+
+    def latest_quotes(self, symbols: Iterable[str]) -> dict[str, dict[str, Any]]: ...
+
+
+class JsonBackend:
+    """One JSON file per payload; ``index`` is a no-op."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def load(self, path: Path) -> dict[str, Any] | None:
+        return _read_json(path)
+
+    def write(self, path: Path, payload: Mapping[str, Any]) -> None:
+        atomic_write_bytes(path, serialize(payload))
+
+    def index(self, path: Path, payload: Mapping[str, Any]) -> None:
+        return None
+
+    def latest_enrichment_path(self) -> Path | None:
+        files = sorted(self.cache_dir.glob(f"{ENRICH_PREFIX}*.json"), reverse=True)
+        return files[0] if files else None
+
+    def latest_quotes(self, symbols: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """
+        Return the newest successful quote per symbol, each stamped with ``fetched_at``.
+
+        Here that is the latest snapshot's entry (entries without a stamp get
+        the snapshot's ``updated_at``).
+        """
+        path = self.latest_enrichment_path()
+        snapshot = (self.load(path) if path else None) or {}
+        entries = snapshot.get("tickers", {})
+        default_stamp = snapshot.get("updated_at")
+        quotes = {}
+        for symbol in symbols:
+            entry = entries.get(symbol)
+            if entry and has_metrics(entry):
+                quotes[symbol] = {**entry, "fetched_at": entry.get("fetched_at") or default_stamp}
+        return quotes
+
+
+class SqliteBackend(JsonBackend):
+    """
+    JSON files plus an indexed SQLite copy of every cache payload.
+
+    The files stay the source of truth: ``load`` reads them, so a file edited,
+    replaced or deleted outside ``write_cache`` is never shadowed by an
+    indexed copy. The database only holds what the indexed queries need
+    (``latest_quotes``, ``calendar_between``), not the documents themselves.
+    """
+
+    def __init__(self, cache_dir: Path, db_path: Path | None = None) -> None:
+        super().__init__(cache_dir)
+        self.db_path = db_path or cache_dir / DB_NAME
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            if "body" in {column[1] for column in conn.execute("PRAGMA table_info(documents)")}:
+                conn.executescript(DROP_DOCUMENT_BODIES)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _owns(self, path: Path) -> bool:
+        return path.parent.resolve() == self.cache_dir.resolve()
+
+    def write(self, path: Path, payload: Mapping[str, Any]) -> None:
+        super().write(path, payload)
+        self.index(path, payload)
+
+    def index(self, path: Path, payload: Mapping[str, Any], written_at: str | None = None) -> None:
+        """Register ``path.name`` and refresh its calendar/enrichment rows from ``payload``."""
+        if not self._owns(path):
+            return
+        name = path.name
+        kind = document_kind(name)
+        written_at = written_at or now_sgt().isoformat()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (name, kind, written_at) VALUES (?, ?, ?)",
+                (name, kind, written_at),
+            )
+            if kind == "calendar":
+                self._index_calendar(conn, name, payload)
+            elif kind == "enrichment":
+                self._index_enrichment(conn, name, payload)
+
+    @staticmethod
+    def _index_calendar(conn: sqlite3.Connection, name: str, payload: Mapping[str, Any]) -> None:
+        conn.execute("DELETE FROM calendar_rows WHERE document = ?", (name,))
+        for day in payload.get("days", []):
+            day_key = day.get("day")
+            if not day_key:
+                continue
+            conn.executemany(
+                "INSERT INTO calendar_rows (document, day, position, symbol, row) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        name,
+                        day_key,
+                        position,
+                        (row.get("symbol") or row.get("ticker") or "").strip().upper(),
+                        codec.dumps(row, compact=True).decode("utf-8"),
+                    )
+                    for position, row in enumerate(day.get("rows", []))
+                ],
+            )
+            if not day.get("error") or day.get("rows"):
+                conn.execute("INSERT OR REPLACE INTO calendar_days (day, document) VALUES (?, ?)", (day_key, name))
+
+    @staticmethod
+    def _index_enrichment(conn: sqlite3.Connection, name: str, payload: Mapping[str, Any]) -> None:
+        default_stamp = payload.get("updated_at") or now_sgt().isoformat()
+        conn.executemany(
+            "INSERT OR IGNORE INTO enrichment (symbol, fetched_at, document, metrics) VALUES (?, ?, ?, ?)",
+            [
+                (symbol, metrics.get("fetched_at") or default_stamp, name, codec.dumps(metrics, compact=True).decode("utf-8"))
+                for symbol, metrics in payload.get("tickers", {}).items()
+                if has_metrics(metrics)  # failed lookups must not shadow an older quote
+            ],
+        )
+
+    def latest_enrichment_path(self) -> Path | None:
+        with closing(self._connect()) as conn:
+            names = conn.execute("SELECT name FROM documents WHERE kind = 'enrichment' ORDER BY name DESC").fetchall()
+        for (name,) in names:
+            path = self.cache_dir / name
+            if path.exists():  # skip snapshots deleted outside ``write_cache``
+                return path
+        return super().latest_enrichment_path()
+
+    def latest_quote(self, symbol: str) -> dict[str, Any] | None:
+        """Return the most recently fetched metrics for ``symbol``."""
+        with closing(self._connect()) as conn:
+            found = conn.execute(
+                "SELECT metrics FROM enrichment WHERE symbol = ? ORDER BY fetched_at DESC LIMIT 1",
+                (symbol.strip().upper(),),
+            ).fetchone()
+        return codec.loads(found[0]) if found else None
+
+    def latest_quotes(self, symbols: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """
+        Return the newest successful quote per symbol across every indexed
+        snapshot, each stamped with its ``fetched_at``.
+        """
+        symbols = list(symbols)
+        quotes: dict[str, dict[str, Any]] = {}
+        with closing(self._connect()) as conn:
+            for offset in range(0, len(symbols), QUERY_CHUNK):
+                chunk = symbols[offset : offset + QUERY_CHUNK]
+                found = conn.execute(
+                    "SELECT e.symbol, e.fetched_at, e.metrics FROM enrichment e "
+                    f"WHERE e.symbol IN ({', '.join('?' * len(chunk))}) "
+                    "AND e.fetched_at = (SELECT MAX(fetched_at) FROM enrichment WHERE symbol = e.symbol)",
+                    chunk,
+                )
+                for symbol, fetched_at, metrics in found:
+                    quotes[symbol] = {**codec.loads(metrics), "fetched_at": fetched_at}
+        return quotes
+
+    def calendar_between(self, start: str, end: str, symbol: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Return calendar rows for ISO days ``start``..``end`` inclusive, taken from
+        the newest document that covers each day, each tagged with its ``day``.
+        """
+        query = (
+            "SELECT r.day, r.row FROM calendar_rows r "
+            "JOIN calendar_days d ON d.day = r.day AND d.document = r.document "
+            "WHERE r.day BETWEEN ? AND ?"
+        )
+        params: list[Any] = [start, end]
+        if symbol:
+            query += " AND r.symbol = ?"
+            params.append(symbol.strip().upper())
+        query += " ORDER BY r.day, r.position"
+        with closing(self._connect()) as conn:
+            return [{**codec.loads(row), "day": day} for day, row in conn.execute(query, params)]
+
+
+BACKENDS = {"json": JsonBackend, "sqlite": SqliteBackend}
+_OPEN: Dict[tuple[str, Path], StorageBackend] = {}
+
+
+def open_backend(name: str, cache_dir: Path) -> StorageBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    key = (name, cache_dir)
+    if key not in _OPEN:
+        _OPEN[key] = BACKENDS[name](cache_dir)
+    return _OPEN[key]
+
+
+def iter_cache_files(cache_dir: Path) -> Iterator[Path]:
+    """Yield importable cache payloads oldest first, so newer documents win per day."""
+    patterns = [f"{prefix}*.json" for prefix in (*CALENDAR_PREFIXES, ENRICH_PREFIX)]
+    files = {path for pattern in patterns for path in cache_dir.glob(pattern)}
+    yield from sorted(files, key=lambda path: (path.stat().st_mtime, path.name))
+
+
+def import_json_cache(backend: SqliteBackend, cache_dir: Optional[Path] = None) -> int:
+    """Index every JSON payload under ``cache_dir`` into ``backend``; returns files imported."""
+    imported = 0
+    for path in iter_cache_files(cache_dir or backend.cache_dir):
+        try:
+            payload = _read_json(path)
+        except codec.DecodeError as exc:
+            LOGGER.warning("Skipping unreadable %s: %s", path, exc)
+            continue
+        if payload is None:
+            continue
+        written_at = datetime.fromtimestamp(path.stat().st_mtime, tz=SINGAPORE_TZ).isoformat()
+        backend.index(path, payload, written_at=written_at)
+        imported += 1
+    return imported
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the SQLite cache index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    importer = sub.add_parser("import", help="Import existing JSON caches into the SQLite index")
+    importer.add_argument("--cache-dir", type=Path, default=Path("./cache"))
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        backend = SqliteBackend(args.cache_dir)
+        count = import_json_cache(backend)
+        LOGGER.info("Imported %s cache file(s) into %s", count, backend.db_path)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    logging.basicConfig(level=logging.INFO)
+    main()
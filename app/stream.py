@@ -0,0 +1,240 @@
+"""
+Row discovery for calendar responses, whole-document and streaming.
+
+``walk_rows`` is the iterative form of the old recursive ``collect_rows``: a
+row is any dict with a truthy ``symbol``/``ticker`` that does not itself hold
+a ``data``/``earnings`` list; rows are not searched for nested rows.
+
+``RowStream`` applies the same rule to a body read in chunks. Containers that
+fit in ``window`` characters (typically one row) are decoded in one go by the
+C decoder; larger ones (the response wrapper, the row lists) are walked token
+by token and not kept once their rows have been yielded, so peak memory stays
+around one row plus the read buffer instead of the whole response.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+from json.decoder import scanstring
+from json.scanner import NUMBER_RE
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+ROW_LIST_KEYS = ("data", "earnings")
+DEFAULT_CHUNK_SIZE = 16 * 1024
+DEFAULT_WINDOW = 64 * 1024
+
+_WS = " \t\n\r"
+_LITERALS = (("true", True), ("false", False), ("null", None))
+_DECODER = json.JSONDecoder()
+_INCOMPLETE = object()
+
+
+def is_row(obj: Dict[str, Any]) -> bool:
+    symbol = obj.get("symbol") or obj.get("ticker")
+    return bool(symbol) and not any(isinstance(obj.get(key), list) for key in ROW_LIST_KEYS)
+
+
+def walk_rows(obj: Any) -> Iterator[Dict[str, Any]]:
+    """Yield rows in document order without recursion."""
+    stack = [iter((obj,))]
+    while stack:
+        for current in stack[-1]:
+            if isinstance(current, dict):
+                if is_row(current):
+                    yield current
+                else:
+                    stack.append(iter(current.values()))
+                    break
+            elif isinstance(current, list):
+                stack.append(iter(current))
+                break
+        else:
+            stack.pop()
+
+
+class _Frame:
+    __slots__ = ("value", "key", "expect_key", "blocked")
+
+    def __init__(self, value: Union[Dict[str, Any], List[Any]]) -> None:
+        self.value = value
+        self.key: Optional[str] = None
+        self.expect_key = isinstance(value, dict)
+        # Set once the object is known to hold a data/earnings list.
+        self.blocked = False
+
+    def may_be_row(self) -> bool:
+        return isinstance(self.value, dict) and not self.blocked and is_row(self.value)
+
+
+class RowStream:
+    """
+    Iterate the rows of a JSON document supplied as ``bytes``/``str`` chunks.
+
+    ``root`` holds the top-level object's scalar members seen so far (e.g. a
+    response-level ``time``). Rows are yielded as soon as they close unless an
+    enclosing object may itself be a row; those are held back until it closes.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]], window: int = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self.root: Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._document: Any = _INCOMPLETE
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._stack: List[_Frame] = []
+
+    @classmethod
+    def of(cls, document: Any) -> "RowStream":
+        """Wrap an already-decoded document (e.g. a recorded response)."""
+        stream = cls(())
+        stream._document = document
+        return stream
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self._document is not _INCOMPLETE:
+            if isinstance(self._document, dict):
+                self._set_root(self._document)
+            yield from walk_rows(self._document)
+            return
+
+        while True:
+            char = self._peek()
+            if not char:
+                if self._stack:
+                    raise ValueError("Truncated JSON document")
+                return
+            frame = self._stack[-1] if self._stack else None
+            if char == ",":
+                self._pos += 1
+                if frame is not None and isinstance(frame.value, dict):
+                    frame.expect_key = True
+            elif char == ":":
+                self._pos += 1
+            elif char in "}]":
+                self._pos += 1
+                self._stack.pop()
+                yield from self._close(frame.value)
+            elif frame is not None and frame.expect_key:
+                frame.key = self._string()
+                frame.expect_key = False
+            elif char in "{[":
+                value = self._try_decode()
+                if value is not _INCOMPLETE:
+                    if frame is None and isinstance(value, dict):
+                        self._set_root(value)
+                    yield from self._close(value)
+                    continue
+                self._pos += 1
+                container: Union[Dict[str, Any], List[Any]] = {} if char == "{" else []
+                if char == "[" and frame is not None and isinstance(frame.value, dict) and frame.key in ROW_LIST_KEYS:
+                    frame.blocked = True
+                if frame is None and isinstance(container, dict):
+                    self.root = container
+                self._stack.append(_Frame(container))
+            else:
+                self._attach(self._scalar())
+
+    def _set_root(self, document: Dict[str, Any]) -> None:
+        self.root = {key: value for key, value in document.items() if not isinstance(value, (dict, list))}
+
+    def _close(self, value: Any) -> Iterator[Dict[str, Any]]:
+        if any(frame.may_be_row() for frame in self._stack):
+            self._attach(value)
+            return
+        parent = self._stack[-1] if self._stack else None
+        if isinstance(value, list) and parent is not None and isinstance(parent.value, dict) and parent.key in ROW_LIST_KEYS:
+            # Keep the key so the parent is still recognised as a wrapper, not a row.
+            parent.blocked = True
+            self._attach([])
+        yield from walk_rows(value)
+
+    def _attach(self, value: Any) -> None:
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if isinstance(frame.value, dict):
+            frame.value[frame.key] = value
+        else:
+            frame.value.append(value)
+
+    def _fill(self, want: int = DEFAULT_CHUNK_SIZE) -> bool:
+        """Append at least ``want`` more characters (if available); False at end of input."""
+        if self._eof:
+            return False
+        parts = [self._buf[self._pos :]]
+        added = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            parts.append(text)
+            added += len(text)
+            if added >= want:
+                break
+        else:
+            self._eof = True
+            tail = self._decoder.decode(b"", final=True)
+            parts.append(tail)
+            added += len(tail)
+        self._buf = "".join(parts)
+        self._pos = 0
+        return added > 0
+
+    def _peek(self) -> str:
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def _try_decode(self) -> Any:
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                pending = len(self._buf) - self._pos
+                # Grow geometrically so a large container is re-scanned O(log n) times.
+                if pending >= self.window or not self._fill(want=max(pending, DEFAULT_CHUNK_SIZE)):
+                    return _INCOMPLETE
+                continue
+            self._pos = end
+            return value
+
+    def _string(self) -> str:
+        while True:
+            if self._buf[self._pos] != '"':
+                raise ValueError(f"Expected a string at offset {self._pos}")
+            try:
+                value, end = scanstring(self._buf, self._pos + 1, True)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def _scalar(self) -> Any:
+        while True:
+            buf, pos = self._buf, self._pos
+            if buf[pos] == '"':
+                return self._string()
+            match = NUMBER_RE.match(buf, pos)
+            if match:
+                # "1." or "1e-" at the buffer end may be the start of a longer number.
+                if len(buf) - match.end() < 3 and self._fill():
+                    continue
+                integer, frac, exp = match.groups()
+                self._pos = match.end()
+                return float(integer + (frac or "") + (exp or "")) if frac or exp else int(integer)
+            for literal, value in _LITERALS:
+                if buf.startswith(literal, pos):
+                    self._pos = pos + len(literal)
+                    return value
+            if len(buf) - pos < 5 and self._fill():
+                continue
+            raise ValueError(f"Unexpected JSON at offset {pos}: {buf[pos:pos + 20]!r}")
@@ -0,0 +1,135 @@
+"""
+Persistent index of which tickers appear in which calendar files and on which days.
+
+The index lives at ``cache/ticker_index.json`` and records, per source file,
+its mtime/size fingerprint and the tickers it lists with their earnings days.
+``update`` only re-parses files whose fingerprint changed, so startup cost no
+longer grows with the size of the cache directory.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set
+
+from .cache import CACHE_DIR, load_cache, write_cache
+from .utils import DateWindow, default_start_date
+
+LOGGER = logging.getLogger("app.ticker_index")
+
+INDEX_PATH = CACHE_DIR / "ticker_index.json"
+INDEX_VERSION = 1
+
+
+def _fingerprint(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def scan_calendar(payload: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Return ``{ticker: sorted earnings days}`` for one calendar payload."""
+    found: Dict[str, Set[str]] = {}
+    for day in payload.get("days", []):
+        day_key = day.get("day")
+        for row in day.get("rows", []):
+            symbol = row.get("symbol") or row.get("ticker")
+            if not symbol:
+                continue
+            days = found.setdefault(symbol.strip().upper(), set())
+            if day_key:
+                days.add(day_key)
+    return {symbol: sorted(days) for symbol, days in found.items()}
+
+
+class TickerIndex:
+    """Ticker -> earnings days / source files, maintained incrementally."""
+
+    def __init__(self, path: Path = INDEX_PATH, files: Dict[str, Dict[str, Any]] | None = None) -> None:
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "TickerIndex":
+        try:
+            data = load_cache(path)
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("Ignoring unreadable ticker index %s: %s", path, exc)
+            data = None
+        if not data or data.get("version") != INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("files", {}))
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        write_cache(self.path, {"version": INDEX_VERSION, "files": self.files})
+        self.dirty = False
+
+    def update(self, paths: Iterable[Path]) -> int:
+        """
+        Sync the index with ``paths``, re-parsing only new or changed files.
+
+        Entries for files no longer listed are dropped. Returns the number of
+        files that were parsed.
+        """
+        parsed = 0
+        seen = set()
+        for path in paths:
+            key = str(path)
+            seen.add(key)
+            try:
+                fingerprint = _fingerprint(path)
+            except FileNotFoundError:
+                continue
+            entry = self.files.get(key)
+            if entry and entry.get("mtime_ns") == fingerprint["mtime_ns"] and entry.get("size") == fingerprint["size"]:
+                continue
+            try:
+                payload = load_cache(path) or {}
+            except (OSError, json.JSONDecodeError):
+                payload = {}
+            self.files[key] = {**fingerprint, "tickers": scan_calendar(payload)}
+            self.dirty = True
+            parsed += 1
+        for stale in set(self.files) - seen:
+            del self.files[stale]
+            self.dirty = True
+        return parsed
+
+    def dates_for(self, symbol: str) -> List[str]:
+        days: Set[str] = set()
+        for entry in self.files.values():
+            days.update(entry["tickers"].get(symbol, ()))
+        return sorted(days)
+
+    def sources_for(self, symbol: str) -> List[str]:
+        return sorted(key for key, entry in self.files.items() if symbol in entry["tickers"])
+
+    def ticker_dates(self) -> Dict[str, List[str]]:
+        combined: Dict[str, Set[str]] = {}
+        for entry in self.files.values():
+            for symbol, days in entry["tickers"].items():
+                combined.setdefault(symbol, set()).update(days)
+        return {symbol: sorted(days) for symbol, days in combined.items()}
+
+    def tickers(self, window: DateWindow | None = None) -> Set[str]:
+        """Return every indexed ticker, or only those reporting inside ``window``."""
+        if window is None:
+            return {symbol for entry in self.files.values() for symbol in entry["tickers"]}
+        start, end = window.start.isoformat(), window.end.isoformat()
+        return {
+            symbol
+            for entry in self.files.values()
+            for symbol, days in entry["tickers"].items()
+            if any(start <= day <= end for day in days)
+        }
+
+
+def window_from(start: date | None, days: int | None) -> DateWindow | None:
+    """Build the enrichment target window; None (no window) unless ``days`` is set."""
+    if days is None:
+        return None
+    return DateWindow.from_start_and_days(start or default_start_date(), max(1, days))
@@ -5,12 +5,15 @@ Utility helpers for date handling, user-agent rotation, and miscellaneous helper
 from __future__ import annotations
 
 import random
+import threading
+import time
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import Iterable, List, Optional, Sequence
+from typing import Callable, Iterable, List, Optional, Sequence
 from zoneinfo import ZoneInfo
 
 SINGAPORE_TZ = ZoneInfo("Asia/Singapore")
+US_EASTERN_TZ = ZoneInfo("America/New_York")
 
 USER_AGENTS: Sequence[str] = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
@@ -42,6 +45,15 @@ def parse_start_date(start: str | None) -> date:
     return parsed
 
 
+def us_market_open(moment: datetime | None = None) -> bool:
+    """Return True during regular US trading hours (09:30-16:00 ET, Mon-Fri; holidays ignored)."""
+    local = (moment or datetime.now(tz=SINGAPORE_TZ)).astimezone(US_EASTERN_TZ)
+    if local.weekday() >= 5:
+        return False
+    minutes = local.hour * 60 + local.minute
+    return 9 * 60 + 30 <= minutes < 16 * 60
+
+
 def clamp_days(days: int, min_days: int = 1, max_days: int = 14) -> int:
     """Clamp day window to a safe range."""
     return max(min_days, min(max_days, days))
@@ -102,3 +114,43 @@ def parse_number(value: float | int | str | None) -> Optional[float]:
         return float(cleaned)
     except ValueError:
         return None
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by concurrent workers.
+
+    ``acquire`` blocks until the caller may issue one request so that the
+    aggregate rate across all threads stays at or below ``rate`` per second.
+    A non-positive rate disables limiting.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def acquire(self) -> float:
+        """Reserve one request slot and return the number of seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token up front so concurrent callers queue behind us.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
@@ -0,0 +1,83 @@
+"""
+Encode/decode throughput of each installed JSON codec in ``app.codec``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_codec --rows 20000 --days 30
+
+Shapes are the documents the jobs actually read and write: the indented
+frontend payload (rows held as ``EarningsRow`` records), one compact
+``cache/calendar_days`` record (typed envelope, rows built with ``as_record``) and an
+enrichment snapshot.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app import codec
+from app.cache import CalendarDayRecord
+from app.pipeline import index_rows
+from app.rows import as_record
+
+from .payloads import enrichment_snapshot, frontend_payload, ticker_symbols
+
+
+def best_of(repeat: int, run: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def typed_day(data: bytes) -> Any:
+    record = codec.loads(data, CalendarDayRecord)
+    record["payload"]["rows"] = [as_record(row) for row in record["payload"]["rows"]]
+    return record
+
+
+def shapes(rows: int, days: int, seed: int) -> List[Tuple[str, Any, bool, Callable[[bytes], Any]]]:
+    """(name, document, compact, decode) for every benchmarked document."""
+    payload = frontend_payload(rows, days=days, seed=seed)
+    index_rows(payload["days"])  # rows become EarningsRow records, as in the pipeline
+    busiest = max(payload["days"], key=lambda day: len(day["rows"]))
+    return [
+        ("frontend", payload, False, codec.loads),
+        ("calendar_day", {"fetched_at": payload["updated_at"], "payload": busiest}, True, typed_day),
+        ("enrichment", enrichment_snapshot(ticker_symbols(rows, seed), seed), False, codec.loads),
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs on real payload shapes")
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows in the frontend payload (and tickers in the snapshot)")
+    parser.add_argument("--days", type=int, default=30, help="Days the rows are spread over")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    documents = shapes(args.rows, args.days, args.seed)
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'shape':<14}{'codec':<10}{'bytes':>12}{'encode MB/s':>14}{'decode MB/s':>14}")
+    for name in codec.available_codecs():
+        codec.use_codec(name)
+        for shape, document, compact, decode in documents:
+            data = codec.dumps(document, compact=compact)
+            encode_s = best_of(args.repeat, lambda: codec.dumps(document, compact=compact))
+            decode_s = best_of(args.repeat, lambda: decode(data))
+            results.setdefault(shape, {})[name] = encode_s + decode_s
+            mb = len(data) / 1e6
+            print(f"{shape:<14}{name:<10}{len(data):>12,}{mb / encode_s:>14.1f}{mb / decode_s:>14.1f}")
+    codec.use_codec(None)
+
+    for shape, timings in results.items():
+        baseline = timings["json"]
+        speedups = ", ".join(f"{name} {baseline / seconds:.1f}x" for name, seconds in timings.items() if name != "json")
+        print(f"{shape}: round trip vs json: {speedups or 'no optional codec installed'}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,101 @@
+"""
+Compare the per-dict merge + serialize path with the columnar one in ``app.columnar``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_columnar --rows 50000 --days 90 [--codec json]
+
+"generate --columnar" is the path ``app.generate`` actually takes for the
+flag under the active codec (columnar with the stdlib codec, dict otherwise).
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+from app import codec, columnar
+from app.output import serialize
+from app.pipeline import augment_rows
+
+from .payloads import enrichment_snapshot, frontend_payload, ticker_symbols
+
+
+def legacy(payload: Dict[str, Any], ticker_map: Dict[str, Any], compact: bool) -> bytes:
+    augment_rows(payload["days"], ticker_map)
+    return serialize(payload, compact=compact)
+
+
+def vectorized(payload: Dict[str, Any], ticker_map: Dict[str, Any], compact: bool) -> bytes:
+    table, _ = columnar.augment_columnar(payload["days"], ticker_map)
+    return table.dumps(payload, compact=compact)
+
+
+def as_generated(payload: Dict[str, Any], ticker_map: Dict[str, Any], compact: bool) -> bytes:
+    build = vectorized if columnar.columnar_preferred() else legacy
+    return build(payload, ticker_map, compact)
+
+
+def measure(build: Callable[..., bytes], payload: Dict[str, Any], ticker_map: Dict[str, Any], compact: bool, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        fresh = copy.deepcopy(payload)
+        started = time.perf_counter()
+        build(fresh, ticker_map, compact)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def peak_memory(build: Callable[..., bytes], payload: Dict[str, Any], ticker_map: Dict[str, Any], compact: bool) -> float:
+    fresh = copy.deepcopy(payload)
+    tracemalloc.start()
+    build(fresh, ticker_map, compact)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dict vs columnar merge + serialize")
+    parser.add_argument("--rows", type=int, default=50_000, help="Number of synthetic rows")
+    parser.add_argument("--days", type=int, default=90, help="Days the rows are spread over")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--compact", action="store_true", help="Serialize without indentation")
+    parser.add_argument("--legacy-rows", action="store_true", help="Drop camelCase fields so normalization parses raw strings")
+    parser.add_argument("--codec", choices=["auto", *codec.PREFERENCE], default="auto", help="JSON codec to serialize with")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    codec.use_codec(args.codec)
+
+    payload = frontend_payload(args.rows, days=args.days, seed=args.seed)
+    if args.legacy_rows:
+        for day in payload["days"]:
+            for row in day["rows"]:
+                for field in ("epsEstimate", "revenueEstimate", "stockPrice"):
+                    row.pop(field)
+    ticker_map = enrichment_snapshot(ticker_symbols(args.rows, args.seed)[::2], args.seed)["tickers"]
+
+    identical = legacy(copy.deepcopy(payload), ticker_map, args.compact) == vectorized(
+        copy.deepcopy(payload), ticker_map, args.compact
+    )
+    before = measure(legacy, payload, ticker_map, args.compact, args.repeat)
+    after = measure(vectorized, payload, ticker_map, args.compact, args.repeat)
+    generated = measure(as_generated, payload, ticker_map, args.compact, args.repeat)
+
+    print(f"rows:          {args.rows}")
+    print(f"codec:         {codec.CODEC.name}")
+    print(f"numpy:         {columnar.np is not None}")
+    print(f"identical:     {identical}")
+    print(f"dict:          {args.rows / before:,.0f} rows/sec")
+    print(f"columnar:      {args.rows / after:,.0f} rows/sec ({before / after:.2f}x)")
+    print(f"--columnar:    {args.rows / generated:,.0f} rows/sec ({before / generated:.2f}x, as generate runs it)")
+    print(
+        f"peak memory:   {peak_memory(legacy, payload, ticker_map, args.compact):.1f} MB dict, "
+        f"{peak_memory(vectorized, payload, ticker_map, args.compact):.1f} MB columnar"
+    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,104 @@
+"""
+Compare the shared metric extractor against the old per-module implementation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_extract --rows 20000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from app.extract import FIELDS, MetricExtractor
+from app.stream import walk_rows
+from app.utils import parse_number
+
+from .payloads import calendar_payload, ticker_symbols
+
+DAY = date(2025, 10, 17)
+
+
+def legacy_extract(raw: dict) -> Dict[str, Optional[float]]:
+    """Pre-refactor ``refresh.extract_metrics_from_raw``, kept verbatim only as the parity oracle."""
+    price = eps = revenue = volume = market_cap = pe_ratio = year_high = year_low = None
+    price_keys = {"regularmarketprice", "marketprice", "lastprice", "price", "regularmarketpreviousclose"}
+    eps_keys = {"epsestimate", "epsforward", "eps", "earningsestimate", "epsquarterly", "epssurprise"}
+    revenue_keys = {"revenuestimate", "revenueforecast", "totalrevenue", "revenue"}
+    volume_keys = {"volume", "regularmarketvolume", "totalvolume", "sharestraded"}
+    market_cap_keys = {"marketcap", "marketcapitalization", "marketcapitalest", "marketcapital"}
+    pe_keys = {"peratio", "trailingpe", "forwardpe", "pe"}
+    high_keys = {"fiftytwoweekhigh", "52weekhigh", "week52high", "fiftytwo_weekhigh", "fiftytwo_weekhi"}
+    low_keys = {"fiftytwoweeklow", "52weeklow", "week52low", "fiftytwo_weeklow", "fiftytwo_weeklo"}
+
+    def flatten(obj):
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                yield k, v
+                yield from flatten(v)
+        elif isinstance(obj, list):
+            for item in obj:
+                yield from flatten(item)
+
+    for key, value in flatten(raw):
+        if not isinstance(key, str):
+            continue
+        normalized = key.lower()
+        if price is None and (normalized in price_keys or "price" in normalized):
+            price = parse_number(value)
+        elif eps is None and (normalized in eps_keys or "eps" in normalized):
+            eps = parse_number(value)
+        elif revenue is None and (normalized in revenue_keys or "revenue" in normalized):
+            revenue = parse_number(value)
+        elif volume is None and (normalized in volume_keys or "volume" in normalized):
+            volume = parse_number(value)
+        elif market_cap is None and (normalized in market_cap_keys or "marketcap" in normalized):
+            market_cap = parse_number(value)
+        elif pe_ratio is None and (normalized in pe_keys or ("pe" in normalized and "peg" not in normalized)):
+            pe_ratio = parse_number(value)
+        elif year_high is None and (normalized in high_keys or ("high" in normalized and "52" in normalized)):
+            year_high = parse_number(value)
+        elif year_low is None and (normalized in low_keys or ("low" in normalized and "52" in normalized)):
+            year_low = parse_number(value)
+
+    values = (price, eps, revenue, volume, market_cap, pe_ratio, year_high, year_low)
+    return dict(zip(FIELDS, values))
+
+
+def measure(extract: Callable[[dict], Dict[str, Optional[float]]], rows: List[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            extract(row)
+        best = min(best, time.perf_counter() - started)
+    return len(rows) / best
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark metric extraction throughput")
+    parser.add_argument("--rows", type=int, default=20_000, help="Number of synthetic rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--depth", type=int, default=1, help="Nesting depth of per-row metadata")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    payload = calendar_payload(ticker_symbols(args.rows, args.seed), DAY, args.depth, args.seed)
+    rows = list(walk_rows(payload))
+    extractor = MetricExtractor()
+
+    mismatches = sum(1 for row in rows if legacy_extract(row) != extractor.extract(row))
+    before = measure(legacy_extract, rows, args.repeat)
+    after = measure(extractor.extract, rows, args.repeat)
+
+    print(f"rows:          {len(rows)}")
+    print(f"mismatches:    {mismatches}")
+    print(f"before:        {before:,.0f} rows/sec")
+    print(f"after:         {after:,.0f} rows/sec")
+    print(f"speedup:       {after / before:.2f}x")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
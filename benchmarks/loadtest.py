@@ -0,0 +1,140 @@
+"""
+End-to-end load test: refresh -> enrich -> generate against the local mock API.
+
+    python -m benchmarks.loadtest --days 14 --tickers-per-day 400 --latency lognormal:60:0.4 --rate-429 0.02
+
+Starts ``benchmarks.mock_rapidapi`` on a free port, points ``app.refresh`` and
+``app.enrich`` at it, runs the three stages in a scratch directory and reports
+throughput, p50/p99 client-side request latency and wall-clock per stage.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .mock_rapidapi import CALENDAR_PATH, QUOTES_PATH, add_config_args, config_from_args, start_server
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[rank]
+
+
+class LatencyRecorder:
+    """requests response hook collecting elapsed time and status per response."""
+
+    def __init__(self) -> None:
+        self.samples: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, response, *args, **kwargs):
+        with self._lock:
+            self.samples.append(response.elapsed.total_seconds())
+            self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+        return response
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        count = len(self.samples)
+        return {
+            "requests": count,
+            "throughput_rps": count / seconds if seconds > 0 else None,
+            "p50_ms": (percentile(self.samples, 50) or 0) * 1000,
+            "p99_ms": (percentile(self.samples, 99) or 0) * 1000,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+def run_flow(args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    from app import enrich, generate, http, refresh
+
+    refresh.BASE_URL = f"{base_url}{CALENDAR_PATH}"
+    enrich.QUOTES_URL = f"{base_url}{QUOTES_PATH}"
+
+    stages: Dict[str, Dict[str, Any]] = {}
+    commands = [
+        ("refresh", refresh.main, ["--date", args.date, "--days", str(args.days), "--max-workers", str(args.max_workers)]),
+        (
+            "enrich",
+            enrich.main,
+            [
+                "--force",
+                "--max-concurrency", str(args.max_concurrency),
+                "--batch-size", str(args.batch_size),
+                "--rate-limit", str(args.rate_limit),
+            ],
+        ),
+        ("generate", generate.main, []),
+    ]
+    for name, command, argv in commands:
+        recorder = LatencyRecorder()
+        http.RESPONSE_HOOKS.append(recorder)
+        started = time.perf_counter()
+        try:
+            command(argv)
+        finally:
+            http.RESPONSE_HOOKS.remove(recorder)
+        seconds = time.perf_counter() - started
+        stages[name] = {"seconds": seconds, **recorder.summary(seconds)}
+    return stages
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the pipeline against the mock RapidAPI")
+    parser.add_argument("--date", default="2025-10-17", help="First calendar day")
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--max-workers", type=int, default=4, help="refresh --max-workers")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="enrich --max-concurrency")
+    parser.add_argument("--batch-size", type=int, default=20, help="enrich --batch-size")
+    parser.add_argument("--rate-limit", type=float, default=0, help="enrich --rate-limit (0 = unlimited)")
+    parser.add_argument("--output", help="Also write the JSON report to this path")
+    add_config_args(parser)
+    args = parser.parse_args(argv)
+
+    server = start_server(config_from_args(args))
+    previous_cwd = os.getcwd()
+    output = os.path.abspath(args.output) if args.output else None
+    started = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory(prefix="earnings-loadtest-") as scratch:
+            os.chdir(scratch)
+            try:
+                stages = run_flow(args, server.base_url)
+            finally:
+                os.chdir(previous_cwd)
+    finally:
+        server.shutdown()
+        server.server_close()
+    total = time.perf_counter() - started
+
+    samples = sum(stage["requests"] for stage in stages.values())
+    report = {
+        "config": vars(args),
+        "total_seconds": total,
+        "total_requests": samples,
+        "throughput_rps": samples / total if total > 0 else None,
+        "stages": stages,
+        "server": {
+            "requests": server.stats.requests,
+            "statuses": dict(sorted(server.stats.by_status.items())),
+            "bytes_sent": server.stats.bytes_sent,
+        },
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as fp:
+            fp.write(text)
+    print(text)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Local stand-in for the ``yahoo-finance15`` calendar and quotes endpoints.
+
+Serves deterministic payloads from ``benchmarks.payloads`` with configurable
+latency, 429/5xx injection, batch limits and payload size, so the pipeline can
+be load-tested without spending RapidAPI quota:
+
+    python -m benchmarks.mock_rapidapi --port 8765 --latency lognormal:40:0.5 --rate-429 0.05
+    RAPIDAPI_BASE_URL=http://127.0.0.1:8765 python -m app.refresh --days 14
+
+Latency specs are in milliseconds: ``fixed:MS``, ``uniform:LO:HI`` or
+``lognormal:MEDIAN:SIGMA``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .payloads import calendar_payload, quotes_payload, ticker_symbols
+
+CALENDAR_PATH = "/api/v1/markets/calendar/earnings"
+QUOTES_PATH = "/api/v1/markets/stock/quotes"
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Return a sampler yielding delays in seconds for a latency spec."""
+    kind, _, rest = spec.partition(":")
+    values = [float(part) for part in rest.split(":") if part]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high) / 1000
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(math.log(median), sigma) / 1000
+    raise ValueError(f"Unknown latency spec {spec!r}")
+
+
+@dataclass
+class MockConfig:
+    latency: str = "fixed:0"
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: float = 1.0
+    tickers_per_day: int = 400
+    max_batch: int = 50
+    depth: int = 1
+    seed: int = 7
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    by_status: Dict[int, int] = field(default_factory=dict)
+    bytes_sent: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, status: int, size: int) -> None:
+        with self.lock:
+            self.requests += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+            self.bytes_sent += size
+
+
+class MockRapidAPI(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: MockConfig) -> None:
+        super().__init__(address, MockHandler)
+        self.config = config
+        self.stats = MockStats()
+        self.sample_latency = parse_latency(config.latency)
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        # Each day draws its tickers from a shared universe so quotes line up.
+        self.universe = ticker_symbols(max(config.tickers_per_day * 4, 1), config.seed)
+
+    def draw(self) -> tuple[float, float]:
+        with self._rng_lock:
+            return self.sample_latency(self._rng), self._rng.random()
+
+    def day_symbols(self, day: date) -> List[str]:
+        rng = random.Random(f"{self.config.seed}-{day.isoformat()}")
+        return rng.sample(self.universe, min(self.config.tickers_per_day, len(self.universe)))
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: MockRapidAPI
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - BaseHTTPRequestHandler signature
+        return
+
+    def _send(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.stats.record(status, len(data))
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        config = self.server.config
+        delay, roll = self.server.draw()
+        time.sleep(delay)
+
+        if roll < config.rate_429:
+            self._send(429, {"message": "Too many requests"}, {"Retry-After": f"{config.retry_after:g}"})
+            return
+        if roll < config.rate_429 + config.rate_5xx:
+            self._send(503, {"message": "Service unavailable"})
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == CALENDAR_PATH:
+            try:
+                day = date.fromisoformat(query.get("date", [""])[0])
+            except ValueError:
+                self._send(400, {"message": "date must be YYYY-MM-DD"})
+                return
+            self._send(200, calendar_payload(self.server.day_symbols(day), day, config.depth, config.seed))
+        elif url.path == QUOTES_PATH:
+            symbols = [s.strip().upper() for s in query.get("ticker", [""])[0].split(",") if s.strip()]
+            # Like the real endpoint, very large batches are truncated.
+            self._send(200, quotes_payload(symbols[: config.max_batch], config.depth, config.seed))
+        else:
+            self._send(404, {"message": f"Unknown endpoint {url.path}"})
+
+
+def start_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> MockRapidAPI:
+    """Start the mock on a background thread and return it (``port=0`` picks a free port)."""
+    server = MockRapidAPI((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, name="mock-rapidapi", daemon=True)
+    thread.start()
+    return server
+
+
+def add_config_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", default="fixed:0", help="fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--tickers-per-day", type=int, default=400)
+    parser.add_argument("--max-batch", type=int, default=50, help="Symbols served per quotes request")
+    parser.add_argument("--depth", type=int, default=1, help="Payload nesting depth")
+    parser.add_argument("--seed", type=int, default=7)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after,
+        tickers_per_day=args.tickers_per_day,
+        max_batch=args.max_batch,
+        depth=args.depth,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local RapidAPI stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_args(parser)
+    args = parser.parse_args(argv)
+
+    server = MockRapidAPI((args.host, args.port), config_from_args(args))
+    print(f"Serving mock RapidAPI on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
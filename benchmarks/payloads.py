@@ -0,0 +1,179 @@
+"""
+Deterministic generators for realistic RapidAPI calendar and quote payloads.
+
+Every generator takes a ``seed`` so two runs (or two commits) benchmark the same
+bytes. ``depth`` controls how deeply rows are wrapped and how much unrelated
+nested metadata each row carries, which is what drives the cost of the
+recursive walks in ``collect_rows`` and the metric extractor.
+"""
+from __future__ import annotations
+
+import random
+import string
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+TIMES = ("BMO", "AMC", "TNS", "TAS")
+EXCHANGES = ("NMS", "NYQ", "NGM", "ASE")
+
+
+def ticker_symbols(count: int, seed: int = 7) -> List[str]:
+    """Return ``count`` unique, deterministic ticker symbols (1-5 letters)."""
+    rng = random.Random(seed)
+    seen: set[str] = set()
+    symbols: List[str] = []
+    while len(symbols) < count:
+        symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5)))
+        if symbol not in seen:
+            seen.add(symbol)
+            symbols.append(symbol)
+    return symbols
+
+
+def _money(rng: random.Random, low: float, high: float) -> str:
+    value = rng.uniform(low, high)
+    for suffix, scale in (("T", 1e12), ("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f}{suffix}"
+    return f"{value:.2f}"
+
+
+def _noise(rng: random.Random, depth: int) -> Dict[str, Any]:
+    """Unrelated nested metadata that walkers have to step over."""
+    node: Dict[str, Any] = {
+        "code": rng.choice(EXCHANGES),
+        "timezone": "America/New_York",
+        "flags": [rng.random() for _ in range(3)],
+    }
+    if depth > 0:
+        node["child"] = _noise(rng, depth - 1)
+    return node
+
+
+def quote_entry(rng: random.Random, symbol: str, depth: int = 1) -> Dict[str, Any]:
+    """One quote as returned by the ``stock/quotes`` endpoint."""
+    price = round(rng.uniform(1, 900), 2)
+    return {
+        "symbol": symbol,
+        "shortName": f"{symbol} Holdings",
+        "regularMarketPrice": price,
+        "regularMarketPreviousClose": round(price * rng.uniform(0.95, 1.05), 2),
+        "regularMarketVolume": rng.randint(1_000, 90_000_000),
+        "marketCap": _money(rng, 5e7, 3e12),
+        "trailingPE": round(rng.uniform(3, 80), 2),
+        "epsForward": round(rng.uniform(-1, 12), 2),
+        "fiftyTwoWeekHigh": round(price * rng.uniform(1.0, 1.6), 2),
+        "fiftyTwoWeekLow": round(price * rng.uniform(0.4, 1.0), 2),
+        "exchange": _noise(rng, depth),
+    }
+
+
+def calendar_row(rng: random.Random, symbol: str, day: date, depth: int = 1) -> Dict[str, Any]:
+    """One raw row from the ``calendar/earnings`` endpoint."""
+    return {
+        "symbol": symbol,
+        "companyshortname": f"{symbol} Holdings Inc.",
+        "startdatetime": f"{day.isoformat()}T20:00:00.000Z",
+        "startdatetimetype": rng.choice(TIMES),
+        "epsestimate": round(rng.uniform(-1, 5), 2) if rng.random() > 0.1 else None,
+        "epsactual": None,
+        "epssurprisepct": None,
+        "revenueEstimate": _money(rng, 1e6, 9e10),
+        "quote": quote_entry(rng, symbol, depth),
+        "links": [{"rel": "self", "href": f"https://example.invalid/{symbol}"}],
+    }
+
+
+def _wrap(rows: List[Dict[str, Any]], depth: int) -> Any:
+    """Bury the row list ``depth`` containers deep, as some API variants do."""
+    wrapped: Any = rows
+    for level in range(depth):
+        wrapped = {"data": wrapped} if level % 2 == 0 else [wrapped]
+    return wrapped
+
+
+def calendar_payload(symbols: List[str], day: date, depth: int = 1, seed: int = 7) -> Dict[str, Any]:
+    """Raw calendar response for one day covering ``symbols``."""
+    rng = random.Random(f"{seed}-{day.isoformat()}")
+    rows = [calendar_row(rng, symbol, day, depth) for symbol in symbols]
+    return {
+        "meta": {"version": "v1.0", "status": 200, "copywrite": "https://devAPI.ai", "total": len(rows)},
+        "body": _wrap(rows, depth),
+    }
+
+
+def quotes_payload(symbols: List[str], depth: int = 1, seed: int = 7) -> Dict[str, Any]:
+    """Raw multi-ticker quotes response."""
+    rng = random.Random(f"{seed}-quotes")
+    return {
+        "meta": {"version": "v1.0", "status": 200, "symbol": ",".join(symbols[:3])},
+        "body": [quote_entry(rng, symbol, depth) for symbol in symbols],
+    }
+
+
+def frontend_payload(tickers: int, days: int = 5, start: date = date(2025, 10, 17), seed: int = 7) -> Dict[str, Any]:
+    """Transformed payload shaped like ``src/data/earnings_data_*.json``."""
+    rng = random.Random(seed)
+    symbols = ticker_symbols(tickers, seed)
+    per_day = max(1, len(symbols) // days)
+    days_payload = []
+    for offset in range(days):
+        current = start + timedelta(days=offset)
+        chunk = symbols[offset * per_day : (offset + 1) * per_day] if offset < days - 1 else symbols[offset * per_day :]
+        rows = []
+        for symbol in chunk:
+            rows.append(
+                {
+                    "symbol": symbol,
+                    "company": f"{symbol} Holdings Inc.",
+                    "eps_estimate": f"{rng.uniform(-1, 5):.2f}",
+                    "eps_reported": None,
+                    "surprise_pct": None,
+                    "time": rng.choice(TIMES),
+                    "quote_url": f"https://finance.yahoo.com/quote/{symbol}/",
+                    "epsEstimate": None,
+                    "revenueEstimate": None,
+                    "stockPrice": None,
+                    "tradingVolume": None,
+                    "marketCap": None,
+                    "peRatio": None,
+                    "yearHigh": None,
+                    "yearLow": None,
+                }
+            )
+        days_payload.append(
+            {
+                "day": current.isoformat(),
+                "url": f"https://finance.yahoo.com/calendar/earnings?day={current.isoformat()}",
+                "count": len(rows),
+                "rows": rows,
+                "error": None,
+            }
+        )
+    end = start + timedelta(days=days - 1)
+    return {
+        "params": {"start_day": start.isoformat(), "end_day": end.isoformat()},
+        "updated_at": f"{start.isoformat()}T08:00:00+08:00",
+        "source": "Yahoo Finance (RapidAPI)",
+        "days": days_payload,
+    }
+
+
+def enrichment_snapshot(symbols: List[str], seed: int = 7) -> Dict[str, Any]:
+    """Enrichment snapshot shaped like ``cache/yahoo_enriched_*.json``."""
+    rng = random.Random(f"{seed}-enriched")
+    tickers = {}
+    for symbol in symbols:
+        price = round(rng.uniform(1, 900), 2)
+        tickers[symbol] = {
+            "price": price,
+            "eps_estimate_curr_q": round(rng.uniform(-1, 5), 2),
+            "revenue_estimate_curr_q": rng.uniform(1e6, 9e10),
+            "volume": float(rng.randint(1_000, 90_000_000)),
+            "market_cap": rng.uniform(5e7, 3e12),
+            "pe_ratio": round(rng.uniform(3, 80), 2),
+            "year_high": round(price * 1.3, 2),
+            "year_low": round(price * 0.7, 2),
+            "fetched_at": "2025-10-17T08:00:00+08:00",
+        }
+    return {"updated_at": "2025-10-17T08:00:00+08:00", "source": "Yahoo Finance (RapidAPI quotes)", "tickers": tickers}
@@ -0,0 +1,254 @@
+"""
+Benchmark suite for the refresh/enrich/generate hot paths.
+
+Each case is timed (best of ``--repeat``) and memory-profiled (tracemalloc peak
+of one extra run) at every ``--sizes`` ticker count, then written as JSON:
+
+    python -m benchmarks.run --sizes 50,1000,20000 --output bench.json
+    python -m benchmarks.run --sizes 1000 --compare bench.json
+
+Cases run inside a scratch working directory because the pipeline modules use
+paths relative to the repository root (``cache/``, ``src/data/``).
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .payloads import calendar_payload, enrichment_snapshot, frontend_payload, quotes_payload, ticker_symbols
+
+DAY = date(2025, 10, 17)
+SELECT_SAMPLE = 200
+
+
+@dataclass(slots=True)
+class Bench:
+    """``setup`` builds fresh input (untimed); ``run`` consumes it; ``items`` is the unit count."""
+
+    run: Callable[[Any], Any]
+    items: int
+    setup: Callable[[], Any] = lambda: None
+
+
+def _write_json(path: Path, payload: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def case_collect_rows(size: int, depth: int) -> Bench:
+    from app import refresh
+
+    payload = calendar_payload(ticker_symbols(size), DAY, depth)
+    return Bench(run=lambda _: refresh.collect_rows(payload), items=size)
+
+
+def case_transform_row(size: int, depth: int) -> Bench:
+    from app import refresh
+
+    rows = refresh.collect_rows(calendar_payload(ticker_symbols(size), DAY, depth))
+    return Bench(run=lambda _: [refresh.transform_row(row) for row in rows], items=len(rows))
+
+
+def case_build_day_payload(size: int, depth: int) -> Bench:
+    from app import refresh
+
+    payload = calendar_payload(ticker_symbols(size), DAY, depth)
+    return Bench(run=lambda _: refresh.build_day_payload(DAY, payload), items=size)
+
+
+def case_extract_metrics(size: int, depth: int) -> Bench:
+    from app import enrich
+
+    entries = quotes_payload(ticker_symbols(size), depth)["body"]
+    return Bench(run=lambda _: [enrich.extract_metrics(entry) for entry in entries], items=len(entries))
+
+
+def case_select_entry(size: int, depth: int) -> Bench:
+    from app import enrich
+
+    symbols = ticker_symbols(size)
+    payload = quotes_payload(symbols, depth)
+    sample = symbols[:: max(1, len(symbols) // SELECT_SAMPLE)][:SELECT_SAMPLE]
+    return Bench(run=lambda _: [enrich.select_entry(symbol, payload) for symbol in sample], items=len(sample))
+
+
+def case_augment_rows(size: int, depth: int) -> Bench:
+    from app import pipeline
+
+    payload = frontend_payload(size)
+    ticker_map = enrichment_snapshot(ticker_symbols(size))["tickers"]
+    return Bench(
+        setup=lambda: copy.deepcopy(payload["days"]),
+        run=lambda days: pipeline.augment_rows(days, ticker_map),
+        items=size,
+    )
+
+
+def case_update_frontend_json(size: int, depth: int) -> Bench:
+    from app import enrich
+
+    payload = frontend_payload(size)
+    ticker_map = enrichment_snapshot(ticker_symbols(size))["tickers"]
+    target = Path("src/data/earnings_data.json")
+    return Bench(
+        setup=lambda: _write_json(target, payload),
+        run=lambda _: enrich.update_frontend_json(ticker_map),
+        items=size,
+    )
+
+
+def case_generate_build_payload(size: int, depth: int) -> Bench:
+    from app import generate
+
+    payload = frontend_payload(size)
+    snapshot = enrichment_snapshot(ticker_symbols(size))
+
+    def setup() -> None:
+        _write_json(Path("cache/yahoo_earnings_20251017_20251021.json"), payload)
+        _write_json(Path("cache/yahoo_enriched_2025-10-17.json"), snapshot)
+
+    return Bench(setup=setup, run=lambda _: generate.build_payload(), items=size)
+
+
+CASES: Dict[str, Callable[[int, int], Bench]] = {
+    "refresh.collect_rows": case_collect_rows,
+    "refresh.transform_row": case_transform_row,
+    "refresh.build_day_payload": case_build_day_payload,
+    "enrich.extract_metrics": case_extract_metrics,
+    "enrich.select_entry": case_select_entry,
+    "pipeline.augment_rows": case_augment_rows,
+    "enrich.update_frontend_json": case_update_frontend_json,
+    "generate.build_payload": case_generate_build_payload,
+}
+
+
+def measure(bench: Bench, repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        arg = bench.setup()
+        started = time.perf_counter()
+        bench.run(arg)
+        best = min(best, time.perf_counter() - started)
+
+    arg = bench.setup()
+    tracemalloc.start()
+    try:
+        bench.run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": best,
+        "items_per_sec": bench.items / best if best > 0 else float("inf"),
+        "peak_bytes": peak,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes: List[int], depth: int, repeat: int, selected: List[str]) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    for name in selected:
+        for size in sizes:
+            entry: Dict[str, Any] = {"case": name, "size": size, "depth": depth}
+            try:
+                bench = CASES[name](size, depth)
+            except ImportError as exc:
+                entry["skipped"] = f"import failed: {exc}"
+                results.append(entry)
+                print(f"{name:<30} {size:>7}  skipped ({exc})", file=sys.stderr)
+                break
+            entry.update(measure(bench, repeat))
+            entry["items"] = bench.items
+            results.append(entry)
+            print(
+                f"{name:<30} {size:>7}  {entry['seconds'] * 1000:10.2f} ms  "
+                f"{entry['items_per_sec']:14,.0f} items/s  {entry['peak_bytes'] / 1024:10,.0f} KiB peak",
+                file=sys.stderr,
+            )
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "sizes": sizes,
+            "depth": depth,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Print per-case time ratios against ``baseline``; return the number of regressions."""
+    base = {(r["case"], r["size"]): r for r in baseline.get("results", []) if "seconds" in r}
+    regressions = 0
+    for result in current["results"]:
+        previous = base.get((result["case"], result["size"]))
+        if "seconds" not in result or previous is None:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{result['case']:<30} {result['size']:>7}  {ratio:6.2f}x time vs {baseline['meta'].get('revision')}{flag}")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run pipeline benchmarks")
+    parser.add_argument("--sizes", default="50,1000,10000", help="Comma-separated ticker counts")
+    parser.add_argument("--depth", type=int, default=1, help="Nesting depth of synthetic payloads")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Run only these cases")
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown fraction flagged as regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    output = args.output.resolve() if args.output else None
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="earnings-bench-") as scratch:
+        os.chdir(scratch)
+        try:
+            report = run_suite(sizes, args.depth, args.repeat, args.case or list(CASES))
+        finally:
+            os.chdir(previous_cwd)
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    if baseline:
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -27,6 +27,13 @@ const addDays = (value, days) => {
   return date;
 };
 
+const toDayKey = (value) => {
+  const date = new Date(value);
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  return `${date.getFullYear()}-${month}-${day}`;
+};
+
 
 const EarningsDashboard = () => {
   const navigate = useNavigate();
@@ -204,7 +211,11 @@ const EarningsDashboard = () => {
       setError(null);
 
       try {
-        const dataset = await fetchUpcomingEarnings();
+        const todayStart = startOfDay(new Date());
+        const range = dateRange === 'all'
+          ? {}
+          : { startDate: toDayKey(todayStart), endDate: toDayKey(addDays(todayStart, parseInt(dateRange))) };
+        const dataset = await fetchUpcomingEarnings(range);
         if (isMounted) {
           if (!dataset || dataset.length === 0) {
             setError('No earnings data available in the local cache.');
@@ -234,7 +245,7 @@ const EarningsDashboard = () => {
     return () => {
       isMounted = false;
     };
-  }, []);
+  }, [dateRange]);
 
   // Reset page when filters change
   useEffect(() => {
@@ -59,9 +59,40 @@ const flattenDays = (data) => {
   return items;
 };
 
-export const fetchUpcomingEarnings = async () => flattenDays(earningsData);
+// Per-day shards written by `app.refresh --shards`; each loader is a lazy chunk.
+const shardLoaders = import.meta.glob('../data/days/*.json', { import: 'default' });
+const SHARD_PREFIX = '../data/days/';
+
+const inRange = (day, startDate, endDate) =>
+  (!startDate || day >= startDate) && (!endDate || day <= endDate);
+
+const loadShardManifest = async () => {
+  const loader = shardLoaders[`${SHARD_PREFIX}manifest.json`];
+  return loader ? loader() : null;
+};
+
+const loadShardedDays = async (startDate, endDate) => {
+  const manifest = await loadShardManifest();
+  if (!manifest) return { days: [] };
+  const wanted = (manifest.days || []).filter((entry) => inRange(entry.day, startDate, endDate));
+  const days = await Promise.all(
+    wanted.map((entry) => {
+      const loader = shardLoaders[`${SHARD_PREFIX}${entry.file}`];
+      return loader ? loader() : null;
+    }),
+  );
+  return { ...manifest, days: days.filter(Boolean) };
+};
+
+// `startDate`/`endDate` are inclusive YYYY-MM-DD strings. With sharded data only
+// the matching day files are fetched; the bundled payload is returned whole.
+export const fetchUpcomingEarnings = async ({ startDate, endDate } = {}) => {
+  if (earningsData) return flattenDays(earningsData);
+  return flattenDays(await loadShardedDays(startDate, endDate));
+};
 
 export const __testables__ = {
   flattenDays,
+  inRange,
   parseNumber,
 };
@@ -0,0 +1,60 @@
+"""In-process stand-ins for ``requests.Session`` used by the job tests."""
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Callable, Dict, List, Mapping
+
+
+class FakeResponse:
+    def __init__(self, body: Any, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.headers: Dict[str, str] = {}
+        self.content = json.dumps(body).encode("utf-8")
+        self._body = body
+
+    def json(self) -> Any:
+        return self._body
+
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code} error")
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "FakeResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+class FakeSession:
+    """Answers each GET with ``handler(params)``; an exception it returns is raised instead."""
+
+    def __init__(self, handler: Callable[[Mapping[str, Any]], Any]) -> None:
+        self.handler = handler
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Mapping[str, Any] | None = None, **kwargs: Any) -> FakeResponse:
+        with self._lock:
+            self.calls.append(dict(params or {}))
+        body = self.handler(params or {})
+        if isinstance(body, BaseException):
+            raise body
+        return body if isinstance(body, FakeResponse) else FakeResponse(body)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "FakeSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import backfill, cache
+from app.refresh import error_day_payload
+from app.rows import EarningsRow
+
+START = date(2025, 1, 6)
+END = date(2025, 1, 10)
+ALL_DAYS = [(START + timedelta(days=offset)).isoformat() for offset in range(5)]
+
+
+class FakeFetch:
+    """Stands in for ``fetch_day_payload``; ``outcomes[day]`` is an exception to raise or an error string."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.outcomes: dict[str, object] = {}
+
+    def __call__(self, session, api_key, current, scheduler, stream):
+        day = current.isoformat()
+        self.calls.append(day)
+        outcome = self.outcomes.get(day)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if isinstance(outcome, str):
+            return error_day_payload(current, outcome)
+        return {"day": day, "url": "", "count": 1, "rows": [EarningsRow(symbol="AXP")], "error": None}
+
+
+@pytest.fixture
+def fetch(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path, raising=False)
+    monkeypatch.setattr(backfill, "CACHE_DIR", tmp_path, raising=False)
+    fake = FakeFetch()
+    monkeypatch.setattr(backfill, "fetch_day_payload", fake)
+    return fake
+
+
+def test_interrupted_backfill_resumes_without_refetching_finished_days(fetch):
+    fetch.outcomes["2025-01-08"] = KeyboardInterrupt()
+    with pytest.raises(KeyboardInterrupt):
+        backfill.backfill("key", START, END, max_workers=1)
+    finished = set(fetch.calls[: fetch.calls.index("2025-01-08")])
+    assert finished == {"2025-01-06", "2025-01-07"}
+    assert backfill.Checkpoint.load(backfill.checkpoint_path(START, END)).done == finished
+
+    del fetch.outcomes["2025-01-08"]
+    fetch.calls.clear()
+    payload = backfill.backfill("key", START, END, max_workers=1)
+
+    assert sorted(fetch.calls) == sorted(set(ALL_DAYS) - finished)
+    assert [day["day"] for day in payload["days"]] == ALL_DAYS
+    assert all(day["error"] is None for day in payload["days"])
+
+
+def test_cached_days_are_not_refetched(fetch):
+    cache.write_calendar_day(START, {"day": START.isoformat(), "count": 1, "rows": [EarningsRow(symbol="TRV")], "error": None})
+
+    payload = backfill.backfill("key", START, END, max_workers=2)
+
+    assert sorted(fetch.calls) == ALL_DAYS[1:]
+    assert payload["days"][0]["rows"][0].symbol == "TRV"
+
+
+def test_failed_days_stay_failed_and_are_retried(fetch):
+    fetch.outcomes["2025-01-07"] = "500 Server Error"
+    payload = backfill.backfill("key", START, END, max_workers=2)
+
+    checkpoint = backfill.Checkpoint.load(backfill.checkpoint_path(START, END))
+    assert checkpoint.failed == {"2025-01-07": "500 Server Error"}
+    assert payload["days"][1]["error"] == "500 Server Error"
+
+    fetch.calls.clear()
+    payload = backfill.backfill("key", START, END, max_workers=2)
+    assert fetch.calls == ["2025-01-07"]
+    assert payload["days"][1]["error"] == "500 Server Error"
+
+    del fetch.outcomes["2025-01-07"]
+    fetch.calls.clear()
+    backfill.backfill("key", START, END, max_workers=2)
+    assert fetch.calls == ["2025-01-07"]
+    assert backfill.Checkpoint.load(backfill.checkpoint_path(START, END)).failed == {}
@@ -1,8 +1,9 @@
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 from app import cache
+from app.utils import SINGAPORE_TZ
 
 
 def test_is_cache_fresh(tmp_path: Path, monkeypatch):
@@ -21,3 +22,78 @@ def test_is_cache_fresh(tmp_path: Path, monkeypatch):
     os.utime(file_path, (timestamp, timestamp))
 
     assert cache.is_cache_fresh(file_path) is False
+
+
+def test_partition_enrichment_uses_per_ticker_ttl():
+    now = datetime(2025, 10, 17, 12, 0, tzinfo=timezone.utc)
+    snapshot = {
+        "updated_at": (now - timedelta(hours=30)).isoformat(),
+        "tickers": {
+            "AAPL": {"price": 1.0, "fetched_at": (now - timedelta(hours=1)).isoformat()},
+            "MSFT": {"price": 2.0, "fetched_at": (now - timedelta(hours=25)).isoformat()},
+            "AXP": {"price": 3.0},
+        },
+    }
+
+    hits, misses = cache.partition_enrichment(snapshot, ["AAPL", "AXP", "MSFT", "NVDA"], now=now)
+
+    assert list(hits) == ["AAPL"]
+    assert misses == ["AXP", "MSFT", "NVDA"]
+
+
+def test_response_store_round_trip_and_ttl(tmp_path: Path):
+    store = cache.ResponseStore(root=tmp_path)
+    url = "https://example.invalid/calendar"
+
+    assert store.load(url, {"date": "2025-10-17"}) is None
+    path = store.save(url, {"date": "2025-10-17"}, {"body": [{"symbol": "AXP"}]})
+
+    assert path.parent.name == path.stem[:2]
+    assert store.load(url, {"date": "2025-10-17"}) == {"body": [{"symbol": "AXP"}]}
+    assert store.load(url, {"date": "2025-10-18"}) is None
+    assert store.load(url, {"date": "2025-10-17"}, ttl=timedelta(0)) is None
+    assert [record["params"] for record in store.entries(url)] == [{"date": "2025-10-17"}]
+
+
+def test_calendar_day_ttl_tiers_and_expiry(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path, raising=False)
+    now = datetime(2025, 10, 17, 12, 0, tzinfo=timezone.utc)
+    today = now.date()
+
+    assert cache.calendar_day_ttl(today, now, today=today) == timedelta(hours=1)
+    assert cache.calendar_day_ttl(today + timedelta(days=5), now, today=today) == timedelta(hours=6)
+    assert cache.calendar_day_ttl(today + timedelta(days=60), now, today=today) == cache.CALENDAR_DAY_TTL_FAR
+    assert cache.calendar_day_ttl(today - timedelta(days=1), now, today=today) is None
+
+    tomorrow, far = today + timedelta(days=1), today + timedelta(days=13)
+    cache.write_calendar_day(tomorrow, {"day": tomorrow.isoformat()}, fetched_at=now)
+    cache.write_calendar_day(far, {"day": far.isoformat()}, fetched_at=now)
+    later = now + timedelta(hours=2)
+    assert cache.load_calendar_day(tomorrow, now=later) is None
+    assert cache.load_calendar_day(far, now=later) == {"day": far.isoformat()}
+    assert cache.load_calendar_day(today, now=later) is None
+
+
+def test_failed_lookup_is_a_miss_on_the_next_partition():
+    now = datetime(2025, 10, 17, 12, 0, tzinfo=timezone.utc)
+    failed = {"price": None, "eps": None, "revenue": None}
+    snapshot = {
+        "updated_at": now.isoformat(),
+        "tickers": {"AXP": {"price": 3.0}, "MSFT": failed},
+    }
+
+    hits, misses = cache.partition_enrichment(snapshot, ["AXP", "MSFT"], now=now)
+
+    assert list(hits) == ["AXP"]
+    assert misses == ["MSFT"]
+
+
+def test_calendar_day_is_final_only_after_the_us_session_settles():
+    day = date(2025, 10, 16)
+    # 03:00 SGT on the 17th is still the afternoon of the 16th in New York.
+    early = datetime(2025, 10, 17, 3, 0, tzinfo=SINGAPORE_TZ)
+    settled = datetime(2025, 10, 17, 18, 0, tzinfo=SINGAPORE_TZ)  # 06:00 ET
+
+    assert cache.calendar_day_ttl(day, early, today=early.date()) == timedelta(hours=1)
+    assert cache.calendar_day_ttl(day, settled - timedelta(minutes=1), today=early.date()) == timedelta(hours=1)
+    assert cache.calendar_day_ttl(day, settled, today=settled.date()) is None
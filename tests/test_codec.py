@@ -0,0 +1,59 @@
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from app import cache, codec
+from app.rows import EarningsRow
+from app.utils import SINGAPORE_TZ
+
+PAYLOAD = {
+    "params": {"start_day": "2025-10-17"},
+    "days": [
+        {
+            "day": "2025-10-17",
+            "count": 2,
+            "rows": [
+                EarningsRow(symbol="AXP", company="Amex ✓", stockPrice=250.5, tradingVolume=1.2e6),
+                EarningsRow.from_dict({"ticker": "MSFT", "stock_price": "410"}),
+            ],
+            "error": None,
+        }
+    ],
+}
+
+
+@pytest.fixture(params=codec.available_codecs())
+def backend(request):
+    yield codec.use_codec(request.param)
+    codec.use_codec(None)
+
+
+def test_every_codec_writes_the_stdlib_layout(backend):
+    expected = {compact: codec.CODECS["json"].encode(PAYLOAD, compact) for compact in (False, True)}
+
+    for compact in (False, True):
+        assert codec.dumps(PAYLOAD, compact=compact) == expected[compact]
+    assert codec.dumps(PAYLOAD["days"][0]["rows"][1], compact=True).endswith(b'"ticker":"MSFT","stock_price":"410"}')
+    with pytest.raises(codec.DecodeError):
+        codec.loads(b'{"days": [')
+
+
+def test_calendar_day_cache_returns_records(backend, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    day = PAYLOAD["days"][0]
+    cache.write_calendar_day(date(2025, 1, 6), day, datetime(2025, 1, 8, tzinfo=SINGAPORE_TZ))
+
+    loaded = cache.load_calendar_day(date(2025, 1, 6))
+    assert loaded == day
+    assert loaded["rows"][1].extra == {"ticker": "MSFT", "stock_price": "410"}
+
+
+def test_rows_anywhere_are_encoded_through_json_default(backend):
+    row = PAYLOAD["days"][0]["rows"][1]
+    document = {"nested": [{"row": row}], "tickers": {"MSFT": [row]}}
+
+    data = codec.dumps(document, compact=True)
+
+    assert b'"extra"' not in data
+    assert codec.loads(data) == {"nested": [{"row": row.to_dict()}], "tickers": {"MSFT": [row.to_dict()]}}
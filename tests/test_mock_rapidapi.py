@@ -0,0 +1,26 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.mock_rapidapi import MockConfig, start_server
+
+
+def test_mock_serves_calendar_batches_and_injected_429():
+    server = start_server(MockConfig(tickers_per_day=5, max_batch=2))
+    try:
+        calendar = json.load(urllib.request.urlopen(f"{server.base_url}/api/v1/markets/calendar/earnings?date=2025-10-17"))
+        quotes = json.load(urllib.request.urlopen(f"{server.base_url}/api/v1/markets/stock/quotes?ticker=AXP,TRV,SLB"))
+        server.config.rate_429 = 1.0
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(f"{server.base_url}/api/v1/markets/stock/quotes?ticker=AXP")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert calendar["meta"]["total"] == 5
+    assert [entry["symbol"] for entry in quotes["body"]] == ["AXP", "TRV"]
+    assert excinfo.value.code == 429
+    assert excinfo.value.headers["Retry-After"] == "1"
+    assert server.stats.by_status == {200: 2, 429: 1}
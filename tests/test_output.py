@@ -0,0 +1,77 @@
+import gzip
+import json
+from pathlib import Path
+
+from app import output
+
+
+def test_write_json_outputs_mirrors_and_precompresses(tmp_path: Path):
+    payload = {"days": [{"day": "2025-10-17", "rows": [{"symbol": "AXP", "company": "Américan"}]}]}
+    primary = tmp_path / "data" / "earnings_data_2025-10-17.json"
+    mirror = tmp_path / "data" / "earnings_data.json"
+
+    written = output.write_json_outputs(payload, primary, mirrors=[mirror], compact=True, precompress=["gz"])
+
+    assert primary.read_bytes() == json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert mirror.read_bytes() == primary.read_bytes()
+    assert json.loads(gzip.decompress(primary.with_name(primary.name + ".gz").read_bytes())) == payload
+    assert mirror.with_name(mirror.name + ".gz").exists()
+    assert len(written) == 4
+    assert not list(primary.parent.glob(".*"))
+
+
+def test_rewriting_primary_does_not_disturb_linked_mirror(tmp_path: Path):
+    primary = tmp_path / "a.json"
+    mirror = tmp_path / "b.json"
+    output.write_json_outputs({"v": 1}, primary, mirrors=[mirror], precompress=())
+
+    output.write_json_outputs({"v": 2}, primary, precompress=())
+
+    assert json.loads(primary.read_text()) == {"v": 2}
+    assert json.loads(mirror.read_text()) == {"v": 1}
+
+
+def test_write_day_shards_writes_manifest_and_prunes_old_days(tmp_path: Path):
+    shard_dir = tmp_path / "days"
+    shard_dir.mkdir()
+    (shard_dir / "2025-10-01.json").write_text("{}", encoding="utf-8")
+    payload = {
+        "params": {"start_day": "2025-10-17", "end_day": "2025-10-18"},
+        "updated_at": "2025-10-17T08:00:00+08:00",
+        "days": [
+            {"day": "2025-10-17", "count": 1, "rows": [{"symbol": "AXP"}]},
+            {"day": "2025-10-18", "count": 0, "rows": []},
+        ],
+    }
+
+    manifest_path = output.write_day_shards(payload, shard_dir)
+
+    manifest = json.loads(manifest_path.read_text())
+    assert [entry["day"] for entry in manifest["days"]] == ["2025-10-17", "2025-10-18"]
+    assert manifest["days"][0]["bytes"] == (shard_dir / "2025-10-17.json").stat().st_size
+    assert json.loads((shard_dir / "2025-10-17.json").read_text())["rows"] == [{"symbol": "AXP"}]
+    assert sorted(p.name for p in shard_dir.iterdir()) == ["2025-10-17.json", "2025-10-18.json", "manifest.json"]
+
+
+def test_skip_unchanged_leaves_identical_file_alone(tmp_path: Path):
+    target = tmp_path / "day.json"
+    assert output.write_bytes_outputs(b"{}", target, precompress=(), skip_unchanged=True) == [target]
+    before = target.stat().st_mtime_ns
+
+    assert output.write_bytes_outputs(b"{}", target, precompress=(), skip_unchanged=True) == []
+    assert target.stat().st_mtime_ns == before
+
+
+def test_identical_payload_leaves_frontend_files_alone(tmp_path: Path):
+    primary = tmp_path / "earnings_data_2025-10-17.json"
+    mirror = tmp_path / "earnings_data.json"
+    payload = {"days": [{"day": "2025-10-17", "rows": [{"symbol": "AXP"}]}]}
+    output.write_json_outputs(payload, primary, mirrors=[mirror], precompress=["gz"])
+    before = [path.stat().st_mtime_ns for path in (primary, mirror)]
+
+    assert output.write_json_outputs(payload, primary, mirrors=[mirror], precompress=["gz"]) == []
+    assert [path.stat().st_mtime_ns for path in (primary, mirror)] == before
+
+    mirror.unlink()
+    assert mirror in output.write_json_outputs(payload, primary, mirrors=[mirror], precompress=["gz"])
+    assert mirror.read_bytes() == primary.read_bytes()
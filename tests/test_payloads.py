@@ -0,0 +1,16 @@
+from datetime import date
+
+from benchmarks.payloads import calendar_payload, frontend_payload, ticker_symbols
+
+
+def test_generators_are_deterministic_and_sized():
+    symbols = ticker_symbols(500)
+
+    assert len(set(symbols)) == 500
+    assert calendar_payload(symbols[:20], date(2025, 10, 17), depth=3) == calendar_payload(
+        symbols[:20], date(2025, 10, 17), depth=3
+    )
+
+    payload = frontend_payload(1000, days=7)
+    assert sum(day["count"] for day in payload["days"]) == 1000
+    assert [day["day"] for day in payload["days"]][-1] == "2025-10-23"
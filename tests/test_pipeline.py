@@ -0,0 +1,33 @@
+from app.pipeline import augment_rows, index_rows, merge_quotes
+
+
+def _days():
+    return [
+        {"day": "2025-10-17", "rows": [{"symbol": "axp", "stockPrice": 300.0}, {"symbol": "ZION"}]},
+        {"day": "2025-10-18", "rows": [{"ticker": "AXP", "stockPrice": 300.0}]},
+    ]
+
+
+def test_merge_quotes_reports_only_real_changes():
+    days = _days()
+    index = index_rows(days)
+    assert [len(index[s]) for s in ("AXP", "ZION")] == [2, 1]
+
+    changes = merge_quotes(index, {"AXP": {"price": 300.0, "volume": 10, "market_cap": None}})
+    assert changes.rows == 2
+    assert changes.fields == {"tradingVolume": 2}
+    assert days[1]["rows"][0]["tradingVolume"] == 10
+    assert days[0]["rows"][0].marketCap is None
+
+    assert not merge_quotes(index, {"AXP": {"price": 300.0, "volume": 10}})
+
+
+def test_augment_rows_copies_three_fields_and_normalizes():
+    days = [{"rows": [{"symbol": "AXP", "eps_estimate": "1.5"}, {"symbol": "ZION", "eps_estimate": "2"}]}]
+    changes = augment_rows(days, {"AXP": {"price": 301.0, "volume": 10}})
+
+    axp, zion = days[0]["rows"]
+    assert axp["stockPrice"] == 301.0 and axp["epsEstimate"] == 1.5
+    assert axp.tradingVolume is None
+    assert zion["epsEstimate"] == 2.0 and zion["stockPrice"] is None
+    assert changes.rows == 1
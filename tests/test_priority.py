@@ -0,0 +1,33 @@
+from datetime import date
+
+from app.priority import Budget, prioritize
+
+
+def test_prioritize_by_report_date_then_size():
+    today = date(2025, 10, 17)
+    ticker_dates = {
+        "ZION": ["2025-10-17"],
+        "AAPL": ["2025-10-30"],
+        "MSFT": ["2025-10-30"],
+        "OLD": ["2025-07-01"],
+        "TINY": ["2025-10-18"],
+    }
+    previous = {"AAPL": {"market_cap": 3.5e12}, "MSFT": {"market_cap": 3.5e12, "volume": 2e7}, "TINY": {}}
+
+    order = prioritize(["OLD", "AAPL", "MSFT", "ZION", "TINY", "NODATE"], ticker_dates, previous, today=today)
+
+    assert order == ["ZION", "TINY", "MSFT", "AAPL", "OLD", "NODATE"]
+
+
+def test_budget_stops_on_requests_and_deadline():
+    now = [0.0]
+    budget = Budget(deadline=10, max_requests=2, clock=lambda: now[0])
+    assert budget.take() and budget.take()
+    assert not budget.take()
+    assert budget.reason == "max-requests"
+
+    timed = Budget(deadline=10, clock=lambda: now[0])
+    assert timed.take()
+    now[0] = 10.0
+    assert not timed.take()
+    assert timed.as_dict() == {"requests": 1, "exhausted": "deadline"}
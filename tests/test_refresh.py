@@ -0,0 +1,29 @@
+import threading
+from datetime import date
+
+from app import refresh
+from fakes import FakeResponse, FakeSession
+
+
+def test_fetch_window_keeps_date_order_and_isolates_failed_days():
+    last_done = threading.Event()
+
+    def calendar(params):
+        day = params["date"]
+        if day == "2025-10-17":
+            # Finish after the last day so completion order differs from date order.
+            assert last_done.wait(5)
+        if day == "2025-10-18":
+            return FakeResponse({"message": "boom"}, status_code=404)
+        body = {"body": [{"symbol": f"S{day[-2:]}", "companyshortname": "Co"}]}
+        if day == "2025-10-19":
+            last_done.set()
+        return body
+
+    session = FakeSession(calendar)
+    days = refresh.fetch_window("key", date(2025, 10, 17), 3, max_workers=3, session=session)
+
+    assert [day["day"] for day in days] == ["2025-10-17", "2025-10-18", "2025-10-19"]
+    assert [row.symbol for row in days[0]["rows"]] == ["S17"]
+    assert days[1]["rows"] == [] and "404" in days[1]["error"]
+    assert days[2]["error"] is None and days[2]["count"] == 1
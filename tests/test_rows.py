@@ -0,0 +1,22 @@
+import json
+
+from app.output import serialize
+from app.rows import ROW_FIELDS, EarningsRow
+
+
+def test_from_dict_normalizes_legacy_rows_and_keeps_extra_keys():
+    row = EarningsRow.from_dict({"ticker": "axp", "eps_estimate": "1.5", "stock_price": "2K", "stockPrice": None})
+
+    assert row.epsEstimate == 1.5 and row.revenueEstimate is None
+    assert row.stockPrice is None  # present keys are never re-parsed
+    assert row.get("ticker") == "axp" and row["stock_price"] == "2K" and "ticker" in row
+    assert list(row.to_dict()) == list(ROW_FIELDS) + ["ticker", "stock_price"]
+    assert EarningsRow.from_dict(row.to_dict()) == row
+
+
+def test_serialize_writes_rows_as_their_json_objects():
+    row = EarningsRow(symbol="AXP", company="American Express", stockPrice=250.0)
+    payload = {"days": [{"day": "2025-10-17", "rows": [row]}]}
+
+    for compact in (False, True):
+        assert json.loads(serialize(payload, compact=compact)) == {"days": [{"day": "2025-10-17", "rows": [row.to_dict()]}]}
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from app.scheduler import (
+    AdaptiveScheduler,
+    QuotaExhaustedError,
+    ThrottledError,
+    TransientError,
+    rate_limit_pause,
+    retry_after_seconds,
+)
+
+
+def test_retries_transient_errors_with_backoff():
+    slept = []
+    scheduler = AdaptiveScheduler(max_concurrency=4, sleep=slept.append, rng=random.Random(1))
+    calls = iter([TransientError("503"), TransientError("503"), "ok"])
+
+    def attempt():
+        result = next(calls)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert scheduler.run(attempt) == "ok"
+    assert scheduler.stats.retries == 2
+    assert 0.25 <= slept[0] <= 0.5 and 0.5 <= slept[1] <= 1.0
+
+
+def test_throttling_halves_concurrency_and_gives_up_after_max_retries():
+    scheduler = AdaptiveScheduler(max_concurrency=8, max_retries=1, sleep=lambda _: None)
+
+    def attempt():
+        raise ThrottledError("429", retry_after=0.01)
+
+    with pytest.raises(ThrottledError):
+        scheduler.run(attempt)
+    assert scheduler.stats.throttled == 2
+    assert scheduler.stats.failures == 1
+    # The retry waits out Retry-After, so the second 429 is a new episode.
+    assert scheduler.concurrency_limit == 2
+
+    for _ in range(20):
+        scheduler.run(lambda: None)
+    assert scheduler.concurrency_limit > 2
+
+
+def test_rate_limit_headers():
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({}) is None
+    assert rate_limit_pause({"X-RateLimit-Requests-Remaining": "5"}) is None
+    assert rate_limit_pause({"x-ratelimit-requests-remaining": "0", "x-ratelimit-requests-reset": "12"}) == 12.0
+
+
+def test_quota_reset_beyond_max_wait_fails_fast_instead_of_pausing():
+    now = [0.0]
+    slept = []
+    scheduler = AdaptiveScheduler(max_concurrency=4, max_wait=60, clock=lambda: now[0], sleep=slept.append)
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        raise ThrottledError("429", retry_after=7 * 86400)
+
+    with pytest.raises(QuotaExhaustedError):
+        scheduler.run(attempt)
+    assert calls == [1] and slept == []
+    assert scheduler.exhausted
+
+    # Until the reset has passed, requests fail without calling out.
+    with pytest.raises(QuotaExhaustedError):
+        scheduler.run(lambda: calls.append(2))
+    assert calls == [1]
+
+    now[0] += 7 * 86400
+    assert not scheduler.exhausted
+    scheduler.pause(30)
+    assert not scheduler.exhausted
+    now[0] += 30
+    assert scheduler.run(lambda: "ok") == "ok"
+
+    # A successful response reporting a spent quota does the same.
+    scheduler.pause(rate_limit_pause({"X-RateLimit-Requests-Remaining": "0", "X-RateLimit-Requests-Reset": "2592000"}))
+    assert scheduler.exhausted
@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import serve
+from app.refresh import error_day_payload
+from app.rows import EarningsRow
+from app.utils import now_sgt
+
+START = date(2025, 10, 17)
+QUOTE = {"price": 10.0, "eps": 1.0, "revenue": None}
+
+
+def _day(day: date, symbol: str) -> dict:
+    return {"day": day.isoformat(), "url": "", "count": 1, "rows": [EarningsRow(symbol=symbol)], "error": None}
+
+
+@pytest.fixture
+def daemon(monkeypatch, tmp_path):
+    state = {"days": [_day(START, "AXP"), _day(START + timedelta(days=1), "MSFT")], "fail_writes": 0}
+    state["quote_calls"], state["writes"] = [], []
+
+    def fetch_quotes(symbols, api_key, **kwargs):
+        state["quote_calls"].append(list(symbols))
+        return {symbol: dict(QUOTE) for symbol in symbols}
+
+    def write_json(payload, start, end):
+        if state["fail_writes"]:
+            state["fail_writes"] -= 1
+            raise OSError("disk full")
+        state["writes"].append(payload)
+        return tmp_path / "earnings_data.json"
+
+    monkeypatch.setattr(serve, "load_latest_enrichment", lambda: None)
+    monkeypatch.setattr(serve, "default_start_date", lambda: START)
+    monkeypatch.setattr(serve, "us_market_open", lambda: True)
+    monkeypatch.setattr(serve, "fetch_window", lambda *args, **kwargs: list(state["days"]))
+    monkeypatch.setattr(serve, "fetch_quotes", fetch_quotes)
+    monkeypatch.setattr(serve, "write_json", write_json)
+    monkeypatch.setattr(serve, "write_cache", lambda path, payload: None)
+    monkeypatch.setattr(serve, "update_data_client", lambda *args, **kwargs: None)
+    daemon = serve.EarningsDaemon("key", days=2, quotes_interval=timedelta(minutes=5))
+    daemon.state = state
+    yield daemon
+    daemon.session.close()
+
+
+def _poll(daemon):
+    daemon.next_calendar = daemon.next_quotes = 0.0
+    daemon.run_once()
+
+
+def test_run_once_skips_unchanged_payloads_and_keeps_failed_days(daemon):
+    state = daemon.state
+    _poll(daemon)
+    assert len(state["writes"]) == 1
+    assert state["writes"][0]["days"][0]["rows"][0].stockPrice == 10.0
+
+    _poll(daemon)
+    assert len(state["writes"]) == 1
+
+    state["days"] = [state["days"][0], error_day_payload(START + timedelta(days=1), "boom")]
+    _poll(daemon)
+    assert len(state["writes"]) == 1
+    assert [row.symbol for row in daemon.calendar["days"][1]["rows"]] == ["MSFT"]
+
+
+def test_run_once_refetches_only_quotes_older_than_the_ttl(daemon):
+    state = daemon.state
+    _poll(daemon)
+    _poll(daemon)
+    assert state["quote_calls"] == [["AXP", "MSFT"]]
+
+    daemon.ticker_map["AXP"]["fetched_at"] = (now_sgt() - timedelta(minutes=5)).isoformat()
+    _poll(daemon)
+    assert state["quote_calls"] == [["AXP", "MSFT"], ["AXP"]]
+
+
+def test_run_once_publishes_a_change_whose_write_failed(daemon):
+    state = daemon.state
+    state["fail_writes"] = 1
+    with pytest.raises(OSError):
+        _poll(daemon)
+    assert state["writes"] == []
+
+    _poll(daemon)
+    assert len(state["writes"]) == 1
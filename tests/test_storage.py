@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from app.storage import JsonBackend, SqliteBackend, import_json_cache
+
+
+def _calendar(day: str, symbols: list[str]) -> dict:
+    return {"days": [{"day": day, "rows": [{"symbol": s, "company": s.title()} for s in symbols], "error": None}]}
+
+
+def test_sqlite_backend_indexes_calendar_and_enrichment(tmp_path: Path):
+    backend = SqliteBackend(tmp_path)
+
+    backend.write(tmp_path / "yahoo_earnings_20251017_20251017.json", _calendar("2025-10-17", ["AXP", "TRV"]))
+    backend.write(tmp_path / "yahoo_earnings_20251018_20251018.json", _calendar("2025-10-18", ["SLB"]))
+    backend.write(
+        tmp_path / "yahoo_enriched_2025-10-16.json",
+        {"updated_at": "2025-10-16T09:00:00+08:00", "tickers": {"AXP": {"price": 300.0}}},
+    )
+    backend.write(
+        tmp_path / "yahoo_enriched_2025-10-17.json",
+        {"tickers": {"AXP": {"price": 312.5, "fetched_at": "2025-10-17T09:00:00+08:00"}}},
+    )
+
+    assert (tmp_path / "yahoo_earnings_20251017_20251017.json").exists()
+    assert [row["symbol"] for row in backend.calendar_between("2025-10-17", "2025-10-18")] == ["AXP", "TRV", "SLB"]
+    assert backend.calendar_between("2025-10-01", "2025-10-31", symbol="trv")[0]["day"] == "2025-10-17"
+    assert backend.latest_quote("AXP")["price"] == 312.5
+    assert backend.latest_enrichment_path() == tmp_path / "yahoo_enriched_2025-10-17.json"
+
+
+def test_import_json_cache_prefers_newest_document_per_day(tmp_path: Path):
+    older = tmp_path / "yahoo_earnings_20251017_20251017.json"
+    newer = tmp_path / "earnings_data_2025-10-17.json"
+    older.write_text(json.dumps(_calendar("2025-10-17", ["AXP"])), encoding="utf-8")
+    newer.write_text(json.dumps(_calendar("2025-10-17", ["AXP", "TRV"])), encoding="utf-8")
+    os.utime(older, (1_700_000_000, 1_700_000_000))
+
+    backend = SqliteBackend(tmp_path, db_path=tmp_path / "index.sqlite3")
+
+    assert import_json_cache(backend) == 2
+    assert [row["symbol"] for row in backend.calendar_between("2025-10-17", "2025-10-17")] == ["AXP", "TRV"]
+    assert backend.load(older) == _calendar("2025-10-17", ["AXP"])
+
+
+def test_sqlite_backend_load_follows_the_file(tmp_path: Path):
+    backend = SqliteBackend(tmp_path)
+    path = tmp_path / "yahoo_earnings_20251017_20251017.json"
+    backend.write(path, _calendar("2025-10-17", ["AXP"]))
+    snapshot = tmp_path / "yahoo_enriched_2025-10-17.json"
+    backend.write(snapshot, {"tickers": {}})
+
+    path.write_text(json.dumps(_calendar("2025-10-17", ["TRV"])), encoding="utf-8")
+    assert backend.load(path) == _calendar("2025-10-17", ["TRV"])
+
+    path.unlink()
+    snapshot.unlink()
+    assert backend.load(path) is None
+    assert backend.latest_enrichment_path() is None
+
+
+def test_latest_quotes_serves_the_newest_successful_quote_per_symbol(tmp_path: Path):
+    backend = SqliteBackend(tmp_path)
+    backend.write(
+        tmp_path / "yahoo_enriched_2025-10-16.json",
+        {"updated_at": "2025-10-16T09:00:00+08:00", "tickers": {"AXP": {"price": 300.0}, "MSFT": {"price": 400.0}}},
+    )
+    backend.write(
+        tmp_path / "yahoo_enriched_2025-10-17.json",
+        {"updated_at": "2025-10-17T09:00:00+08:00", "tickers": {"AXP": {"price": 312.5}, "MSFT": {"price": None}}},
+    )
+
+    assert backend.latest_quotes(["AXP", "MSFT", "NVDA"]) == {
+        "AXP": {"price": 312.5, "fetched_at": "2025-10-17T09:00:00+08:00"},
+        "MSFT": {"price": 400.0, "fetched_at": "2025-10-16T09:00:00+08:00"},
+    }
+    assert JsonBackend(tmp_path).latest_quotes(["AXP", "MSFT"]) == {
+        "AXP": {"price": 312.5, "fetched_at": "2025-10-17T09:00:00+08:00"},
+    }
+
+
+def test_sqlite_backend_drops_stored_document_bodies(tmp_path: Path):
+    db_path = tmp_path / "index.sqlite3"
+    with closing(sqlite3.connect(db_path)) as conn, conn:
+        conn.execute("CREATE TABLE documents (name TEXT PRIMARY KEY, kind TEXT NOT NULL, written_at TEXT NOT NULL, body TEXT NOT NULL)")
+        conn.execute("INSERT INTO documents VALUES ('yahoo_enriched_2025-10-17.json', 'enrichment', '', '{}')")
+
+    backend = SqliteBackend(tmp_path, db_path=db_path)
+    backend.write(tmp_path / "yahoo_enriched_2025-10-18.json", {"tickers": {}})
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        assert [column[1] for column in conn.execute("PRAGMA table_info(documents)")] == ["name", "kind", "written_at"]
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone() == (2,)
@@ -0,0 +1,36 @@
+import json
+
+from app.stream import RowStream, walk_rows
+
+
+def _chunks(text, size):
+    data = text.encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def test_row_stream_matches_walk_rows_across_chunk_sizes():
+    document = {
+        "time": 1760659200,
+        "body": {
+            "data": [
+                {"symbol": "AAPL", "eps_estimate": "1.44", "name": "Äpple"},
+                {"ticker": "MSFT", "details": {"symbol": "nested"}},
+                {"symbol": "WRAP", "earnings": [{"symbol": "INNER", "stock_price": 12.5e-1}]},
+                {"symbol": "", "ok": True, "none": None},
+            ]
+        },
+    }
+    text = json.dumps(document, ensure_ascii=False)
+    expected = list(walk_rows(document))
+    assert [row["symbol"] if "symbol" in row else row["ticker"] for row in expected] == ["AAPL", "MSFT", "INNER"]
+    for size in (1, 3, 7, 64, len(text)):
+        for window in (8, 1 << 16):
+            stream = RowStream(_chunks(text, size), window=window)
+            assert list(stream) == expected
+            assert stream.root == {"time": 1760659200}
+
+
+def test_row_stream_of_wraps_decoded_document():
+    stream = RowStream.of({"time": 5, "data": [{"symbol": "A"}]})
+    assert list(stream) == [{"symbol": "A"}]
+    assert stream.root == {"time": 5}
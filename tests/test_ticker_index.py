@@ -0,0 +1,35 @@
+import json
+from datetime import date
+from pathlib import Path
+
+from app.ticker_index import TickerIndex
+from app.utils import DateWindow
+
+
+def _write_calendar(path: Path, days: dict) -> None:
+    payload = {"days": [{"day": day, "rows": [{"symbol": s} for s in symbols]} for day, symbols in days.items()]}
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_ticker_index_reparses_only_changed_files(tmp_path: Path):
+    first = tmp_path / "yahoo_earnings_20251017_20251017.json"
+    second = tmp_path / "yahoo_earnings_20251020_20251021.json"
+    _write_calendar(first, {"2025-10-17": ["axp", "TRV"]})
+    _write_calendar(second, {"2025-10-20": ["CLF"], "2025-10-21": ["GE", "AXP"]})
+
+    index = TickerIndex(tmp_path / "index.json")
+    assert index.update([first, second]) == 2
+    index.save()
+
+    reloaded = TickerIndex.load(tmp_path / "index.json")
+    assert reloaded.update([first, second]) == 0
+    assert reloaded.tickers() == {"AXP", "TRV", "CLF", "GE"}
+    assert reloaded.dates_for("AXP") == ["2025-10-17", "2025-10-21"]
+    assert reloaded.sources_for("CLF") == [str(second)]
+
+    window = DateWindow.from_start_and_days(date(2025, 10, 20), 1)
+    assert reloaded.tickers(window) == {"CLF"}
+
+    _write_calendar(first, {"2025-10-17": ["AXP", "TRV", "NFLX"]})
+    assert reloaded.update([first]) == 1
+    assert reloaded.tickers() == {"AXP", "TRV", "NFLX"}
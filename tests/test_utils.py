@@ -1,4 +1,6 @@
-from app.utils import parse_number
+from datetime import datetime
+
+from app.utils import US_EASTERN_TZ, RateLimiter, parse_number, us_market_open
 
 
 def test_parse_number():
@@ -8,3 +10,23 @@ def test_parse_number():
     assert parse_number("12,345") == 12345
     assert parse_number(None) is None
     assert parse_number("invalid") is None
+
+
+def test_rate_limiter_spaces_requests():
+    now = [0.0]
+    slept = []
+    limiter = RateLimiter(rate=2.0, clock=lambda: now[0], sleep=slept.append)
+
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire() == 0.5
+    assert limiter.acquire() == 1.0
+
+    now[0] = 10.0
+    assert limiter.acquire() == 0.0
+    assert slept == [0.5, 1.0]
+
+
+def test_us_market_open():
+    assert us_market_open(datetime(2025, 10, 17, 10, 0, tzinfo=US_EASTERN_TZ))
+    assert not us_market_open(datetime(2025, 10, 17, 16, 0, tzinfo=US_EASTERN_TZ))
+    assert not us_market_open(datetime(2025, 10, 18, 11, 0, tzinfo=US_EASTERN_TZ))